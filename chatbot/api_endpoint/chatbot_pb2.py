@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: chatbot.proto
+# Protobuf Python Version: 6.31.1
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    6,
+    31,
+    1,
+    '',
+    'chatbot.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rchatbot.proto\x12\x07\x63hatbot\"\x1d\n\nAddRequest\x12\x0f\n\x07request\x18\x01 \x01(\t\"/\n\rResponseModel\x12\x10\n\x08response\x18\x01 \x01(\t\x12\x0c\n\x04path\x18\x02 \x01(\t\",\n\rResponseChunk\x12\r\n\x05\x64\x65lta\x18\x01 \x01(\t\x12\x0c\n\x04path\x18\x02 \x01(\t\" \n\x0c\x42\x61tchRequest\x12\x10\n\x08requests\x18\x01 \x03(\t\":\n\tBatchItem\x12\x10\n\x08response\x18\x01 \x01(\t\x12\r\n\x05\x65rror\x18\x02 \x01(\t\x12\x0c\n\x04path\x18\x03 \x01(\t\"6\n\rBatchResponse\x12%\n\tresponses\x18\x01 \x03(\x0b\x32\x12.chatbot.BatchItem\"A\n\x0eSessionRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\n\n\x02id\x18\x02 \x01(\x04\x12\x0f\n\x07request\x18\x03 \x01(\t\"x\n\x0cSessionChunk\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\n\n\x02id\x18\x02 \x01(\x04\x12\r\n\x05\x64\x65lta\x18\x03 \x01(\t\x12\x0c\n\x04path\x18\x04 \x01(\t\x12\x0c\n\x04\x64one\x18\x05 \x01(\x08\x12\x0e\n\x06\x66\x61q_id\x18\x06 \x01(\x03\x12\r\n\x05\x65rror\x18\x07 \x01(\t2\x9a\x02\n\x0f\x63hatbot_service\x12=\n\x0e\x41\x64\x64\x43hatRequest\x12\x13.chatbot.AddRequest\x1a\x16.chatbot.ResponseModel\x12\x42\n\x11StreamChatRequest\x12\x13.chatbot.AddRequest\x1a\x16.chatbot.ResponseChunk0\x01\x12\x41\n\x10\x42\x61tchChatRequest\x12\x15.chatbot.BatchRequest\x1a\x16.chatbot.BatchResponse\x12\x41\n\x0b\x43hatSession\x12\x17.chatbot.SessionRequest\x1a\x15.chatbot.SessionChunk(\x01\x30\x01\x62\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'chatbot_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_ADDREQUEST']._serialized_start=26
+  _globals['_ADDREQUEST']._serialized_end=55
+  _globals['_RESPONSEMODEL']._serialized_start=57
+  _globals['_RESPONSEMODEL']._serialized_end=104
+  _globals['_RESPONSECHUNK']._serialized_start=106
+  _globals['_RESPONSECHUNK']._serialized_end=150
+  _globals['_BATCHREQUEST']._serialized_start=152
+  _globals['_BATCHREQUEST']._serialized_end=184
+  _globals['_BATCHITEM']._serialized_start=186
+  _globals['_BATCHITEM']._serialized_end=244
+  _globals['_BATCHRESPONSE']._serialized_start=246
+  _globals['_BATCHRESPONSE']._serialized_end=300
+  _globals['_SESSIONREQUEST']._serialized_start=302
+  _globals['_SESSIONREQUEST']._serialized_end=367
+  _globals['_SESSIONCHUNK']._serialized_start=369
+  _globals['_SESSIONCHUNK']._serialized_end=489
+  _globals['_CHATBOT_SERVICE']._serialized_start=492
+  _globals['_CHATBOT_SERVICE']._serialized_end=774
+# @@protoc_insertion_point(module_scope)
@@ -1,15 +1,14 @@
 import os
 
-import nltk
 import psycopg2
 from dotenv import load_dotenv
-from gensim.models.doc2vec import Doc2Vec, TaggedDocument
-from nltk.tokenize import word_tokenize
-
-nltk.download("punkt")
+from utils.index_build import tokenize
+from utils.vector_cache import vector_cache
 
 load_dotenv()
 
+NO_ANSWER = "There is no exact answer for that question"
+
 
 class RetrieveData:
     def __init__(self):
@@ -50,36 +49,49 @@ class RetrieveData:
         final_db = dict(zip(sg_q, sg_a))
         return final_db
 
-    def preprocessing_doc(self):
-        """Tokenize the data"""
+    def preprocessing_doc(self, model, search, k=1):
+        """Tokenize the data and take the top-k FAQ documents from ``search``"""
         # tokenized_data = [word_tokenize(document.lower()) for document in final_db]
         # tagged_data = [TaggedDocument(words=words, tags=[str(idx)])
         #       for idx, words in enumerate(tokenized_data)]
-        model = Doc2Vec.load("utils/doc2vec_model.model")
-        inferred_vector = model.infer_vector(word_tokenize(self.user_input.lower()))
-        similar_documents = model.dv.most_similar([inferred_vector], topn=len(model.dv))
+        inferred_vector = self.infer_vector(model)
+        similar_documents = search.search(inferred_vector, k=k)
         return similar_documents
 
-    def most_sim(self, final_db, similar_documents):
-        """Take most similarity data"""
-        threshold = 0.8
-        questions = list(final_db.keys())
+    def infer_vector(self, model):
+        """Infer the Doc2Vec vector of the user input (cached by tokens)"""
+        return vector_cache.infer(model, tokenize(self.user_input))
+
+    def most_sim(self, answers, similar_documents, threshold=0.8):
+        """Take most similarity data
+
+        ``answers`` maps document tags to FAQ answers: a list in tag order
+        such as ``FAQStore.answers`` or ``list(final_db.values())``, or
+        ``FAQStore.by_id`` for indexes whose tags are FAQ ids.
+        """
+        result_data = NO_ANSWER
 
         for index, score in similar_documents:
             index = int(index)
-
-            if score < threshold:
-                result_data = "There is no exact answer for that question"
+            try:
+                answer = answers[index]
+            except (IndexError, KeyError):
+                # The index knows a row the table no longer has.
+                answer = None
+
+            if score < threshold or answer is None:
+                result_data = NO_ANSWER
                 break
             else:
-                question = questions[index]
-                result_data = final_db[question]
+                result_data = answer
                 break
 
         return result_data
 
 
 if __name__ == "__main__":
+    from utils.model_registry import registry
+
     db = RetrieveData()
     db.connect()
     db.user_input = "what is programming"
@@ -87,6 +99,6 @@ if __name__ == "__main__":
     ans_ret = db.retrieve_answers()
     db.close()
     concat_qa = db.concat(ques_ret, ans_ret)
-    pre_dc = db.preprocessing_doc()
-    take_sim = db.most_sim(concat_qa, pre_dc)
+    pre_dc = db.preprocessing_doc(registry.load(), registry.search())
+    take_sim = db.most_sim(list(concat_qa.values()), pre_dc)
     print(take_sim)
@@ -0,0 +1,360 @@
+"""The chatbot gRPC service on ``grpc.aio``, sharing the REST app's engine.
+
+The servicer answers with the same functions and components as the routes
+in ``main.py``: the Doc2Vec index, query and vector caches, database pool,
+FAQ and rephrase stores, admission control and telemetry in ``main.model``.
+Nothing is loaded per RPC.
+
+With ``GRPC_PORT`` set, the FastAPI lifespan serves it from the same
+process and event loop as the REST routes. ``python grpc_service.py``
+builds the engine the same way and serves gRPC only.
+"""
+
+import asyncio
+import os
+import traceback
+from collections import Counter
+
+import chatbot_pb2
+import chatbot_pb2_grpc
+import grpc
+import main
+from schema import BATCH_MAX_SIZE
+from utils.admission import Overloaded
+from utils.deadline import Deadline
+from utils.session_store import SessionStore
+from utils.telemetry import Record
+
+GRPC_PORT = int(os.getenv("GRPC_PORT") or "50051")
+# HTTP/2 streams (concurrent RPCs) one client connection may open.
+GRPC_MAX_CONCURRENT_STREAMS = int(os.getenv("GRPC_MAX_CONCURRENT_STREAMS", "100"))
+# RPCs in the whole server; 0 sizes it to the admission limit and queue.
+GRPC_MAX_CONCURRENT_RPCS = int(os.getenv("GRPC_MAX_CONCURRENT_RPCS", "0"))
+GRPC_KEEPALIVE_TIME_MS = int(os.getenv("GRPC_KEEPALIVE_TIME_MS", "30000"))
+GRPC_KEEPALIVE_TIMEOUT_MS = int(os.getenv("GRPC_KEEPALIVE_TIMEOUT_MS", "10000"))
+GRPC_MIN_PING_INTERVAL_MS = int(os.getenv("GRPC_MIN_PING_INTERVAL_MS", "10000"))
+GRPC_GRACE_SECONDS = float(os.getenv("GRPC_GRACE_SECONDS", "5"))
+# Questions of one ChatSession stream answered at the same time.
+SESSION_PIPELINE = int(os.getenv("SESSION_PIPELINE", "4"))
+
+
+def server_options(
+    max_concurrent_streams=GRPC_MAX_CONCURRENT_STREAMS,
+    keepalive_time_ms=GRPC_KEEPALIVE_TIME_MS,
+    keepalive_timeout_ms=GRPC_KEEPALIVE_TIMEOUT_MS,
+    min_ping_interval_ms=GRPC_MIN_PING_INTERVAL_MS,
+):
+    """Channel arguments of the server.
+
+    The server pings idle connections every ``keepalive_time_ms`` and drops
+    them when no ack comes within ``keepalive_timeout_ms``, so load
+    balancers do not silently cut long-lived channels. Clients may ping as
+    well, even without calls in flight, down to ``min_ping_interval_ms``.
+    """
+    return [
+        ("grpc.max_concurrent_streams", max_concurrent_streams),
+        ("grpc.keepalive_time_ms", keepalive_time_ms),
+        ("grpc.keepalive_timeout_ms", keepalive_timeout_ms),
+        ("grpc.keepalive_permit_without_calls", 1),
+        ("grpc.http2.min_ping_interval_without_data_ms", min_ping_interval_ms),
+        ("grpc.http2.max_pings_without_data", 0),
+    ]
+
+
+class ChatbotService(chatbot_pb2_grpc.chatbot_serviceServicer):
+    """RPC handlers over the components in ``main.model``."""
+
+    def __init__(self, sessions=None):
+        self.rpcs = Counter()
+        self.sessions = SessionStore() if sessions is None else sessions
+        self.open_sessions = 0
+
+    async def _admit(self, context):
+        """A slot for this RPC, or abort it with RESOURCE_EXHAUSTED."""
+        try:
+            return await main.model["Admission"].acquire_async()
+        except Overloaded as e:
+            context.set_trailing_metadata(
+                (
+                    ("retry-after", str(e.retry_after)),
+                    ("grpc-retry-pushback-ms", str(e.retry_after * 1000)),
+                )
+            )
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+
+    async def AddChatRequest(self, request, context):
+        self.rpcs["AddChatRequest"] += 1
+        deadline = Deadline.for_rpc(context)
+        record = Record("ask", input_query=request.request, transport="grpc")
+        with record.stage("admission"):
+            ticket = await self._admit(context)
+        try:
+            with record.stage("match"):
+                take_sim = await main.match_answer(request.request, deadline, record)
+            with record.stage("llm"):
+                result_work, path, error = await main.rephrase_or_fallback(
+                    take_sim, deadline
+                )
+            record.set(model_output=result_work, path=path)
+            if error is not None:
+                record.set(fallback_reason=repr(error))
+            return chatbot_pb2.ResponseModel(response=result_work, path=path)
+        except Exception:
+            record.set(error=traceback.format_exc())
+            raise
+        finally:
+            main.model["Admission"].release(ticket)
+            main.model["Telemetry"].submit(record)
+
+    async def StreamChatRequest(self, request, context):
+        self.rpcs["StreamChatRequest"] += 1
+        deadline = Deadline.for_rpc(context)
+        record = Record("stream", input_query=request.request, transport="grpc")
+        with record.stage("admission"):
+            ticket = await self._admit(context)
+        parts = []
+        try:
+            with record.stage("match"):
+                take_sim = await main.match_answer(request.request, deadline, record)
+            path = "llm"
+            try:
+                # A client that goes away cancels this task, which closes
+                # the LLM stream as well.
+                stream = main.model["RefactorModel"].astream_work(take_sim, deadline)
+                async for delta in stream:
+                    if not parts:
+                        record.mark("first_delta")
+                    parts.append(delta)
+                    yield chatbot_pb2.ResponseChunk(delta=delta, path="llm")
+            except Exception:
+                if parts:
+                    raise
+                # Nothing sent yet: the FAQ answer as is instead.
+                parts, path = [take_sim], "fallback"
+                yield chatbot_pb2.ResponseChunk(delta=take_sim, path=path)
+            record.set(model_output="".join(parts), path=path)
+        except Exception:
+            record.set(error=traceback.format_exc())
+            raise
+        finally:
+            main.model["Admission"].release(ticket)
+            main.model["Telemetry"].submit(record)
+
+    async def BatchChatRequest(self, request, context):
+        """Answer many questions with one search; errors are per item.
+
+        The batch takes one admission slot and a deadline scaled to its size.
+        """
+        self.rpcs["BatchChatRequest"] += 1
+        queries = list(request.requests)
+        if len(queries) > BATCH_MAX_SIZE:
+            await context.abort(
+                grpc.StatusCode.INVALID_ARGUMENT,
+                f"at most {BATCH_MAX_SIZE} requests per batch",
+            )
+        deadline = Deadline.for_batch(len(queries), context)
+        record = Record("batch", batch_size=len(queries), transport="grpc")
+        with record.stage("admission"):
+            ticket = await self._admit(context)
+        try:
+            with record.stage("match"):
+                matched = await main.match_batch(queries, deadline)
+            with record.stage("llm"):
+                results = await main.rephrase_batch(matched, deadline)
+        except Exception:
+            record.set(error=traceback.format_exc())
+            raise
+        finally:
+            main.model["Admission"].release(ticket)
+            main.model["Telemetry"].submit(record)
+
+        items = [
+            (
+                chatbot_pb2.BatchItem(error=str(r))
+                if isinstance(r, Exception)
+                else chatbot_pb2.BatchItem(response=r[0], path=r[1])
+            )
+            for r in results
+        ]
+        return chatbot_pb2.BatchResponse(responses=items)
+
+    async def ChatSession(self, request_iterator, context):
+        """Answer the questions of one session as each answer is ready.
+
+        Up to ``SESSION_PIPELINE`` questions are answered at once, so the
+        chunks of consecutive questions may interleave; each carries the
+        ``id`` of its question, and the last one has ``done`` set.
+        """
+        self.rpcs["ChatSession"] += 1
+        self.open_sessions += 1
+        chunks = asyncio.Queue()
+        slots = asyncio.Semaphore(SESSION_PIPELINE)
+        answering = set()
+
+        async def read():
+            session = None
+            try:
+                async for request in request_iterator:
+                    if session is None:
+                        session = self.sessions.open(request.session_id)
+                    else:
+                        self.sessions.touch(session)
+                    # Stop reading while the pipeline is full.
+                    await slots.acquire()
+                    task = asyncio.ensure_future(
+                        self._answer_turn(session, request, context, chunks)
+                    )
+                    answering.add(task)
+                    task.add_done_callback(answering.discard)
+                    task.add_done_callback(lambda _: slots.release())
+                if answering:
+                    await asyncio.wait(answering)
+            finally:
+                chunks.put_nowait(None)
+
+        reader = asyncio.ensure_future(read())
+        try:
+            while (chunk := await chunks.get()) is not None:
+                yield chunk
+            await reader
+        finally:
+            # The client went away or the stream failed: stop every answer.
+            reader.cancel()
+            for task in list(answering):
+                task.cancel()
+            self.open_sessions -= 1
+
+    async def _answer_turn(self, session, request, context, chunks):
+        """Put the answer to one session question into ``chunks``."""
+
+        def send(**fields):
+            chunks.put_nowait(
+                chatbot_pb2.SessionChunk(session_id=session.id, id=request.id, **fields)
+            )
+
+        deadline = Deadline.for_rpc(context)
+        record = Record(
+            "session",
+            input_query=request.request,
+            transport="grpc",
+            session_id=session.id,
+        )
+        admission = main.model["Admission"]
+        try:
+            with record.stage("admission"):
+                ticket = await admission.acquire_async()
+        except Overloaded as e:
+            # Only this question is refused; the session stays open.
+            send(done=True, error=str(e))
+            return
+        try:
+            with record.stage("match"):
+                # Read before the index: a swap in between only makes the
+                # result look stale, never the other way round.
+                generation = main.model["QueryCache"].generation
+                index = main.model["Index"]
+                pre_dc = session.search_result(request.request, generation)
+                if pre_dc is None:
+                    pre_dc = await main.search_query(
+                        request.request, index, deadline, record
+                    )
+                    session.remember(request.request, generation, pre_dc)
+                else:
+                    record.set(session_hit=True)
+                take_sim = await main.answer_matches(index, pre_dc, deadline, record)
+            session.matched(pre_dc)
+            record.set(turn=session.questions)
+
+            parts, path = [], "llm"
+            try:
+                stream = main.model["RefactorModel"].astream_work(take_sim, deadline)
+                async for delta in stream:
+                    if not parts:
+                        record.mark("first_delta")
+                    parts.append(delta)
+                    send(delta=delta, path=path)
+            except Exception:
+                if parts:
+                    raise
+                # Nothing sent yet: the FAQ answer as is instead.
+                parts, path = [take_sim], "fallback"
+                send(delta=take_sim, path=path)
+            send(done=True, path=path, faq_id=int(pre_dc[0][0]) if pre_dc else 0)
+            record.set(model_output="".join(parts), path=path)
+        except Exception as e:
+            record.set(error=traceback.format_exc())
+            send(done=True, error=str(e))
+        finally:
+            admission.release(ticket)
+            main.model["Telemetry"].submit(record)
+
+
+class GrpcServer:
+    """A ``grpc.aio`` server of ``ChatbotService`` on the running loop."""
+
+    def __init__(
+        self,
+        port=GRPC_PORT,
+        max_concurrent_rpcs=GRPC_MAX_CONCURRENT_RPCS,
+        options=None,
+    ):
+        self.port = port
+        self.max_concurrent_rpcs = max_concurrent_rpcs
+        self.options = server_options() if options is None else options
+        self.servicer = ChatbotService()
+        self._server = None
+
+    async def start(self):
+        """Listen on ``port`` (``0`` picks a free one, stored in ``port``)."""
+        if not self.max_concurrent_rpcs:
+            # Admitted and queued RPCs; gRPC refuses more with
+            # RESOURCE_EXHAUSTED before they wait unseen.
+            admission = main.model["Admission"]
+            self.max_concurrent_rpcs = admission.max_limit + admission.queue_size
+        self._server = grpc.aio.server(
+            options=self.options, maximum_concurrent_rpcs=self.max_concurrent_rpcs
+        )
+        chatbot_pb2_grpc.add_chatbot_serviceServicer_to_server(
+            self.servicer, self._server
+        )
+        self.port = self._server.add_insecure_port(f"[::]:{self.port}")
+        await self._server.start()
+
+    async def wait_for_termination(self):
+        await self._server.wait_for_termination()
+
+    async def stop(self, grace=GRPC_GRACE_SECONDS):
+        """Refuse new RPCs and give running ones ``grace`` seconds."""
+        if self._server is not None:
+            server, self._server = self._server, None
+            await server.stop(grace)
+
+    def stats(self):
+        """gRPC server metrics for the /metrics endpoint."""
+        return {
+            "port": self.port,
+            "serving": self._server is not None,
+            "max_concurrent_rpcs": self.max_concurrent_rpcs,
+            "options": dict(self.options),
+            "rpcs": dict(self.servicer.rpcs),
+            "open_sessions": self.servicer.open_sessions,
+            "sessions": self.servicer.sessions.stats(),
+        }
+
+
+async def serve(port=GRPC_PORT):
+    """Build the engine like the REST app does and serve it over gRPC only."""
+    async with main.lifespan(main.app):
+        # With GRPC_PORT set the lifespan started one already.
+        server = main.model.get("GrpcServer")
+        if server is None:
+            server = GrpcServer(port)
+            await server.start()
+        try:
+            await server.wait_for_termination()
+        finally:
+            await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(serve())
@@ -1,44 +1,196 @@
+import asyncio
+import json
 import os
+import time
 import traceback
 from contextlib import asynccontextmanager
+from functools import partial
 
-import dagshub
-import mlflow
+import anyio
+import numpy as np
 import uvicorn
 from db_access import RetrieveData
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from schema import textRequest
-from utils import chat_model_work
+from fastapi.responses import JSONResponse, StreamingResponse
+from schema import batchRequest, textRequest
+from starlette.background import BackgroundTask
+from utils import chat_model_work, index_build
+from utils.admission import AdmissionController, Overloaded
+from utils.ann_index import ANN_INDEX_PATH, IVFIndex
+from utils.db_pool import DatabasePool
+from utils.deadline import Deadline
+from utils.faq_store import FAQ_STORE, FAQStore
+from utils.index_build import INDEX_DIR, IndexWatcher, ServingIndex, tokenize
+from utils.inference_pool import INFERENCE_WORKERS, InferencePool
+from utils.inference_workers import INFERENCE_PROCESSES, InferenceWorkers
+from utils.lexical_index import MatchPaths
+from utils.live_index import IndexUpdater
+from utils.model_registry import registry
+from utils.query_cache import QueryCache, normalize_text
+from utils.rephrase_store import RephraseStore
+from utils.telemetry import MlflowExporter, Record, Telemetry
+from utils.vector_cache import vector_cache
 
 load_dotenv()
 
 model = {}
 
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "64"))
+# Also serve gRPC on this port, from this process and event loop.
+GRPC_PORT = os.getenv("GRPC_PORT", "")
+
 DAGSHUB_REPO_OWNER = os.getenv("DAGSHUB_REPO_OWNER", "Ye-Bhone-Lin")
 DAGSHUB_REPO_NAME = os.getenv("DAGSHUB_REPO_NAME", "ai-banking-app-backend")
 
-dagshub.init(repo_owner=DAGSHUB_REPO_OWNER, repo_name=DAGSHUB_REPO_NAME, mlflow=True)
 
-mlflow.set_tracking_uri(os.getenv("MLFLOW_TRACKING_URI_v1"))
+def init_tracking():
+    """Point MLflow at DagsHub; runs on the telemetry thread, not at import."""
+    import dagshub
+    import mlflow
+
+    dagshub.init(
+        repo_owner=DAGSHUB_REPO_OWNER, repo_name=DAGSHUB_REPO_NAME, mlflow=True
+    )
+    mlflow.set_tracking_uri(os.getenv("MLFLOW_TRACKING_URI_v1"))
 
-mlflow.set_experiment(os.getenv("MLFLOW_EXPERIMENT_NAME"))
 
-mlflow.autolog(log_models=False)
+def warm_up(index):
+    """Run one question through every stage that is slow the first time.
 
-mlflow.set_tag("repo", f"{DAGSHUB_REPO_OWNER}/{DAGSHUB_REPO_NAME}")
+    Imports NLTK and reads its data and pages in the memory-mapped model
+    and search matrix.
+    """
+    start = time.perf_counter()
+    vector = index.model.infer_vector(tokenize("how do i log in"))
+    index.search.search(vector, k=1)
+    return {
+        "tokenizer": index_build.TOKENIZER,
+        "warm_up_ms": (time.perf_counter() - start) * 1000,
+    }
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize the Refactor model on startup and clean up on shutdown."""
-    model_work = chat_model_work.RefactorModel()  # RefactorModel
+    db_pool = DatabasePool()
+    await db_pool.open()
+    model["DatabasePool"] = db_pool
+    # Awaited on the pool; the table is created by the job, not here.
+    rephrase_store = RephraseStore(chat_model_work.PROMPT_VERSION)
+    await rephrase_store.load_async(db_pool)
+    rephrase_store.start()
+    model["RephraseStore"] = rephrase_store
+    model_work = chat_model_work.RefactorModel(rephrase_store)  # RefactorModel
     model["RefactorModel"] = model_work
+    if INDEX_DIR:
+        # Versioned builds from utils/index_build.py, swapped while serving.
+        index = ServingIndex.load_current(INDEX_DIR)
+    else:
+        if ANN_INDEX_PATH:
+            # Large knowledge bases: approximate search over a prebuilt IVF.
+            search = IVFIndex.load(ANN_INDEX_PATH)
+        else:
+            search = registry.search()
+        # The notebook model is tagged by row position: pin them to ids once.
+        rows = await db_pool.fetch("faq_questions")
+        index = ServingIndex.from_rows(
+            registry.load(), search, [(row["id"], row["question"]) for row in rows]
+        )
+    model["Index"] = index
+    query_cache = QueryCache()
+    query_cache.load()
+    model["QueryCache"] = query_cache
+    loop = asyncio.get_running_loop()
+
+    def faq_rows():
+        """The whole table as ``(id, question)``, read off the event loop."""
+        if faq_store is not None:
+            return faq_store.rows()
+        fetch = asyncio.run_coroutine_threadsafe(db_pool.fetch("faq_all"), loop)
+        return [(row["id"], row["question"]) for row in fetch.result()]
+
+    # Rows changed since the build get vectors now, later ones as they come.
+    index_updater = IndexUpdater(index, tokenize, on_change=query_cache.clear)
+    model["IndexUpdater"] = index_updater
+    faq_store = None
+    if FAQ_STORE:
+        faq_store = FAQStore()
+        await faq_store.load_async(db_pool)
+        index_updater.update(faq_store.rows(), full=True)
+        faq_store.on_change = index_updater.update
+        faq_store.start()
+        model["FAQStore"] = faq_store
+    else:
+        await anyio.to_thread.run_sync(
+            partial(index_updater.update, faq_rows(), full=True)
+        )
+        index_updater.start(faq_rows)
+    if INFERENCE_PROCESSES:
+        vector_cache.workers = InferenceWorkers()
+    model["Admission"] = AdmissionController()
+    model["MatchPaths"] = MatchPaths()
+    # Threads only wait on the worker processes then, keep one per process.
+    model["InferencePool"] = InferencePool(max(INFERENCE_WORKERS, INFERENCE_PROCESSES))
+    index_watcher = IndexWatcher(
+        INDEX_DIR,
+        lambda new: index_updater.swap(new, faq_rows, install_index),
+        index.version,
+    )
+    if INDEX_DIR:
+        index_watcher.start()
+    model["IndexWatcher"] = index_watcher
+    # Request records reach MLflow in batches, from a background thread.
+    telemetry = Telemetry(
+        MlflowExporter(
+            os.getenv("MLFLOW_EXPERIMENT_NAME"),
+            tags={"repo": f"{DAGSHUB_REPO_OWNER}/{DAGSHUB_REPO_NAME}"},
+            setup=init_tracking,
+        )
+    )
+    telemetry.start()
+    model["Telemetry"] = telemetry
+    # /ready turns 200 once this is done; requests are served meanwhile.
+    readiness = model["Readiness"] = {"ready": False, "error": None}
+
+    async def warm():
+        try:
+            # The async LLM clients belong to this loop, so they are built here.
+            chat_model_work.llm.warm()
+            readiness.update(await model["InferencePool"].run(warm_up, index))
+            readiness["ready"] = True
+        except Exception as e:
+            readiness["error"] = repr(e)
+
+    warming = asyncio.ensure_future(warm())
+    grpc_server = None
+    if GRPC_PORT:
+        # Imported here so that the REST-only app never loads gRPC.
+        from grpc_service import GrpcServer
+
+        grpc_server = model["GrpcServer"] = GrpcServer(int(GRPC_PORT))
+        await grpc_server.start()
     yield
 
+    if grpc_server is not None:
+        await grpc_server.stop()
+    warming.cancel()
+    telemetry.stop()
+    index_watcher.stop()
+    index_updater.stop()
+    query_cache.save()
+    model["InferencePool"].shutdown()
+    if vector_cache.workers is not None:
+        vector_cache.workers.shutdown()
+        vector_cache.workers = None
+    if faq_store is not None:
+        faq_store.stop()
+    rephrase_store.stop()
+    await db_pool.close()
     model.clear()
+    registry.clear()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -57,39 +209,462 @@ app.add_middleware(
 )
 
 
-@app.post("/ask")
-@mlflow.trace
-def request_text(textRequest: textRequest) -> str:
-    """Request Model"""
-    db = RetrieveData()
-    db.connect()
-    db.user_input = textRequest.SQL_QUERY
+@app.exception_handler(Overloaded)
+async def overloaded(request, exc):
+    """Shed the request at once, with a hint of when to come back."""
+    return JSONResponse(
+        status_code=503,
+        content={"error": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+def install_index(index):
+    """Serve ``index`` from now on; requests already running keep theirs.
+
+    Called by the index updater once ``index`` has the FAQ rows changed
+    since it was built.
+    """
+    model["Index"] = index
+    # Cached search results carry the old version's tags, and cached
+    # vectors its model.
+    model["QueryCache"].clear()
+    vector_cache.clear()
+
+
+def cache_result(index, query, vector, pre_dc):
+    """Cache a search result unless its index was swapped out meanwhile."""
+    if model["Index"] is index:
+        model["QueryCache"].put(query, vector, pre_dc)
+
+
+async def faq_answers(index, results, deadline=None):
+    """Answers for the documents in ``results``, keyed like ``index`` tags them.
+
+    ``results`` are search results, lists of ``(tag, score)``. With the
+    in-process store the answers are already in memory; without it only
+    the matched rows are read, by primary key, in one round trip.
+    """
+    store = model.get("FAQStore")
+    if store is not None:
+        return store.by_id if index.by_id else store.answers
+    ids = list({int(tag) for pre_dc in results for tag, _ in pre_dc})
+    if not ids:
+        return {}
+    timeout = None if deadline is None else deadline.timeout("database")
+    rows = await model["DatabasePool"].fetch("faq_by_ids", ids, timeout=timeout)
+    return {row["id"]: row["answer"] for row in rows}
 
-    with mlflow.start_run(run_name="API_Request_Run", nested=True):
-        mlflow.log_param("input_query", textRequest.SQL_QUERY)
+
+async def match_answer(query: str, deadline=None, record=None) -> str:
+    """Return the FAQ answer closest to ``query``, within ``deadline``.
+
+    The matched FAQ id, its score and the match path go into the telemetry
+    ``record``.
+    """
+    index = model["Index"]
+    pre_dc = await search_query(query, index, deadline, record)
+    return await answer_matches(index, pre_dc, deadline, record)
+
+
+async def search_query(query: str, index, deadline=None, record=None):
+    """The search result for ``query`` on ``index``.
+
+    Cached, matched exactly or lexically against the FAQ questions (see
+    ``utils/lexical_index.py``) without leaving the event loop, or else
+    inferred. The path taken goes into ``record`` and ``MatchPaths``.
+    """
+    start = time.perf_counter()
+    path = "cache"
+    pre_dc = model["QueryCache"].get(query)
+    if pre_dc is None and index.lexical is not None:
+        matched = index.lexical.match(query)
+        if matched is not None:
+            path, pre_dc = matched
+    if pre_dc is None:
+        path = "vector"
+        db = RetrieveData()
+        db.user_input = query
+        inference = model["InferencePool"].run(retrieve, db, index)
+        if deadline is not None:
+            inference = deadline.run("inference", inference)
+        pre_dc = await inference
+    if record is not None:
+        record.set(match_path=path)
+    if "MatchPaths" in model:
+        model["MatchPaths"].observe(path, (time.perf_counter() - start) * 1000)
+    return pre_dc
+
+
+async def answer_matches(index, pre_dc, deadline=None, record=None) -> str:
+    """The FAQ answer of the best match in ``pre_dc``, a search result."""
+    if record is not None and pre_dc:
+        record.set(faq_id=int(pre_dc[0][0]), score=float(pre_dc[0][1]))
+    answers = await faq_answers(index, [pre_dc], deadline)
+    return RetrieveData().most_sim(answers, pre_dc)
+
+
+def retrieve(db, index):
+    """Infer and search, reusing the result of a near-identical cached query."""
+    vector = db.infer_vector(index.model)
+    pre_dc = model["QueryCache"].get_similar(vector)
+    if pre_dc is None:
+        found = index.search.search(vector, k=rerank_width(index))
+        pre_dc = top_match(index, db.user_input, found)
+        cache_result(index, db.user_input, vector, pre_dc)
+    return pre_dc
+
+
+def rerank_width(index):
+    """How many vector search results ``top_match`` chooses from."""
+    return 1 if index.lexical is None else index.lexical.rerank_k
+
+
+def top_match(index, query, found):
+    """The best of the vector search results ``found``, as a one-item list.
+
+    Near ties are broken by the lexical index.
+    """
+    if index.lexical is not None:
+        found = index.lexical.rerank(query, found)
+    return found[:1]
+
+
+def infer_batch(queries, index):
+    """Infer one vector per query; a failed query gets its exception instead.
+
+    Cache misses are inferred together, over the worker processes when
+    ``INFERENCE_PROCESSES`` is set.
+    """
+    vectors = [None] * len(queries)
+    tokens = {}
+    for i, query in enumerate(queries):
         try:
-            ques_ret = db.retrieve_questions()
-            ans_ret = db.retrieve_answers()
-            concat_qa = db.concat(ques_ret, ans_ret)
-            pre_dc = db.preprocessing_doc()
-            take_sim = db.most_sim(concat_qa, pre_dc)
+            tokens[i] = tokenize(query)
+        except Exception as e:
+            vectors[i] = e
+    inferred = vector_cache.infer_many(index.model, list(tokens.values()))
+    for i, vector in zip(tokens, inferred):
+        vectors[i] = vector
+    return vectors
+
+
+def search_batch(queries, vectors, index):
+    """Vector-tier lookups, then one matrix search for the remaining queries."""
+    query_cache = model["QueryCache"]
+    results = [query_cache.get_similar(vector) for vector in vectors]
+    pending = [i for i, pre_dc in enumerate(results) if pre_dc is None]
+    if pending:
+        matrix = np.stack([vectors[i] for i in pending])
+        found = index.search.search_batch(matrix, k=rerank_width(index))
+        for i, pairs in zip(pending, found):
+            pre_dc = top_match(index, queries[i], pairs)
+            cache_result(index, queries[i], vectors[i], pre_dc)
+            results[i] = pre_dc
+    return results
 
-            result_work = model["RefactorModel"].model_work(take_sim)
 
-            mlflow.log_param("model_output", result_work)
+def infer_and_search(queries, index):
+    """``infer_batch`` then ``search_batch``, in one call on the executor.
 
-            return JSONResponse(content={"answer": result_work})
+    A query that failed to infer keeps its exception.
+    """
+    results = infer_batch(queries, index)
+    inferred = [i for i, v in enumerate(results) if not isinstance(v, Exception)]
+    if inferred:
+        found = search_batch(
+            [queries[i] for i in inferred], [results[i] for i in inferred], index
+        )
+        for i, pre_dc in zip(inferred, found):
+            results[i] = pre_dc
+    return results
 
+
+async def match_batch(queries, deadline=None):
+    """FAQ answers for ``queries`` in input order, within ``deadline``.
+
+    Cached and exactly or lexically matched queries skip inference. The
+    rest is spread over the executor in chunks; each chunk is searched and
+    answered as soon as it is inferred, so chunks finished before the
+    deadline keep their answers. A query that fails, or whose chunk runs
+    out of time, gets its exception in place of an answer.
+    """
+    index = model["Index"]
+    # Repeats within the batch (same normalized text) are looked up once.
+    keys = [normalize_text(query) for query in queries]
+    firsts = {}
+    for key, query in zip(keys, queries):
+        firsts.setdefault(key, query)
+    distinct = list(firsts.values())
+
+    query_cache = model["QueryCache"]
+    results = [query_cache.get(query) for query in distinct]
+    if index.lexical is not None:
+        for i, query in enumerate(distinct):
+            matched = None if results[i] else index.lexical.match(query)
+            if matched is not None:
+                results[i] = matched[1]
+    todo = [i for i, pre_dc in enumerate(results) if pre_dc is None]
+
+    def within_deadline(awaitable):
+        if deadline is None:
+            return awaitable
+        return deadline.run("inference", awaitable)
+
+    async def answer(searched):
+        """Answers for search results; exceptions stay in place."""
+        try:
+            answers = await faq_answers(
+                index,
+                [pre_dc for pre_dc in searched if not isinstance(pre_dc, Exception)],
+                deadline,
+            )
         except Exception as e:
+            return [e] * len(searched)
+        return [
+            pre_dc if isinstance(pre_dc, Exception) else db.most_sim(answers, pre_dc)
+            for pre_dc in searched
+        ]
+
+    async def match_chunk(chunk):
+        """Infer, search and answer one chunk of ``todo``."""
+        try:
+            searched = await within_deadline(
+                model["InferencePool"].run(
+                    infer_and_search, [distinct[i] for i in chunk], index
+                )
+            )
+        except Exception as e:
+            searched = [e] * len(chunk)
+        return await answer(searched)
+
+    db = RetrieveData()
+    pending = set(todo)
+    known = [i for i in range(len(distinct)) if i not in pending]
+    chunks = [
+        todo[start : start + BATCH_CHUNK_SIZE]
+        for start in range(0, len(todo), BATCH_CHUNK_SIZE)
+    ]
+    answered = await asyncio.gather(
+        answer([results[i] for i in known]), *map(match_chunk, chunks)
+    )
+    for indices, chunk_answers in zip([known] + chunks, answered):
+        for i, answer_text in zip(indices, chunk_answers):
+            results[i] = answer_text
+    matched = dict(zip(firsts, results))
+    return [matched[key] for key in keys]
+
+
+async def rephrase_batch(matched, deadline=None):
+    """``(text, path)`` for each answer in ``matched``, exceptions kept as is.
+
+    Each distinct answer goes through ``rephrase_or_fallback`` once,
+    ``BATCH_CONCURRENCY`` at a time, so answers the LLM could not rephrase
+    before ``deadline`` come back as they are.
+    """
+    unique = list(dict.fromkeys(m for m in matched if isinstance(m, str)))
+    slots = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def rephrase(answer):
+        async with slots:
+            text, path, _ = await rephrase_or_fallback(answer, deadline)
+            return text, path
+
+    rephrased = dict(zip(unique, await asyncio.gather(*map(rephrase, unique))))
+    return [rephrased[m] if isinstance(m, str) else m for m in matched]
+
+
+async def rephrase_or_fallback(answer, deadline=None):
+    """``(text, path, error)`` for ``answer``.
+
+    ``path`` is ``"llm"`` for the rephrased answer. It is ``"fallback"``,
+    with ``answer`` as is, when the LLM fails, its circuit is open or
+    ``deadline`` runs out first.
+    """
+    try:
+        return await model["RefactorModel"].amodel_work(answer, deadline), "llm", None
+    except Exception as e:
+        return answer, "fallback", e
+
 
-            error_trace = traceback.format_exc()
+def sse(data, event=None) -> str:
+    """Format one server-sent event."""
+    head = f"event: {event}\n" if event else ""
+    return f"{head}data: {json.dumps(data)}\n\n"
 
-            mlflow.log_param("error_type", error_trace)
 
-            return JSONResponse(content={"error": str(e)})
+@app.post("/ask")
+async def request_text(textRequest: textRequest) -> str:
+    """Request Model"""
+    query = textRequest.SQL_QUERY
+    # Every stage below waits at most what is left of this.
+    deadline = Deadline()
+    record = Record("ask", input_query=query)
+    # Overloaded is raised before any work and answered with a 503.
+    admission = model["Admission"]
+    with record.stage("admission"):
+        ticket = await admission.acquire_async()
+    try:
+        with record.stage("match"):
+            take_sim = await match_answer(query, deadline, record)
+
+        with record.stage("llm"):
+            result_work, path, error = await rephrase_or_fallback(take_sim, deadline)
+        record.set(model_output=result_work, path=path)
+        if error is not None:
+            record.set(fallback_reason=repr(error))
+
+        return JSONResponse(content={"answer": result_work, "path": path})
+
+    except Exception as e:
+
+        record.set(error=traceback.format_exc())
+
+        return JSONResponse(content={"error": str(e)})
+    finally:
+        admission.release(ticket)
+        # Only queued here; a background thread sends it to MLflow.
+        model["Telemetry"].submit(record)
+
+
+@app.post("/ask/stream")
+async def request_text_stream(textRequest: textRequest):
+    """Stream the answer as server-sent events while the LLM generates it.
+
+    Each ``data`` event carries ``{"delta": ...}``; the stream ends with a
+    ``done`` event holding the full answer, or an ``error`` event.
+    """
+    query = textRequest.SQL_QUERY
+    deadline = Deadline()
+    record = Record("stream", input_query=query)
+    # The slot is held until the stream ends; Overloaded becomes a 503.
+    admission = model["Admission"]
+    with record.stage("admission"):
+        ticket = await admission.acquire_async()
+    try:
+        with record.stage("match"):
+            take_sim = await match_answer(query, deadline, record)
+    except Exception as e:
+        admission.release(ticket)
+        record.set(error=traceback.format_exc())
+        model["Telemetry"].submit(record)
+        return JSONResponse(content={"error": str(e)})
 
+    async def events():
+        parts = []
+        try:
+            path = "llm"
+            try:
+                stream = model["RefactorModel"].astream_work(take_sim, deadline)
+                async for delta in stream:
+                    if not parts:
+                        record.mark("first_delta")
+                    parts.append(delta)
+                    yield sse({"delta": delta})
+            except Exception:
+                if parts:
+                    raise
+                # Nothing sent yet: stream the FAQ answer as is instead.
+                parts, path = [take_sim], "fallback"
+                yield sse({"delta": take_sim})
+            result_work = "".join(parts)
+            yield sse({"answer": result_work, "path": path}, event="done")
+            record.set(model_output=result_work, path=path)
+        except Exception as e:
+            record.set(error=traceback.format_exc())
+            yield sse({"error": str(e)}, event="error")
         finally:
-            db.close()
+            admission.release(ticket)
+            model["Telemetry"].submit(record)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Also after a disconnect before the first event (releasing twice is
+        # harmless).
+        background=BackgroundTask(admission.release, ticket),
+    )
+
+
+@app.post("/ask/batch")
+async def request_text_batch(batchRequest: batchRequest):
+    """Answer many questions at once.
+
+    The batch takes one admission slot and a deadline scaled to its size
+    (``Deadline.for_batch``). ``results``
+    follows the input order; each item is ``{"answer": ..., "path": ...}``
+    like /ask, or ``{"error": ...}`` for a question that failed on its own.
+    """
+    queries = batchRequest.SQL_QUERIES
+    deadline = Deadline.for_batch(len(queries))
+    record = Record("batch", batch_size=len(queries))
+    admission = model["Admission"]
+    with record.stage("admission"):
+        ticket = await admission.acquire_async()
+    try:
+        with record.stage("match"):
+            matched = await match_batch(queries, deadline)
+        with record.stage("llm"):
+            results = await rephrase_batch(matched, deadline)
+        items = [
+            (
+                {"error": str(r)}
+                if isinstance(r, Exception)
+                else {"answer": r[0], "path": r[1]}
+            )
+            for r in results
+        ]
+        record.set(
+            unique_answers=len(set(r for r in matched if isinstance(r, str))),
+            item_errors=sum("error" in item for item in items),
+            fallbacks=sum(item.get("path") == "fallback" for item in items),
+        )
+        return JSONResponse(content={"results": items})
+    except Exception as e:
+        record.set(error=traceback.format_exc())
+        return JSONResponse(content={"error": str(e)})
+    finally:
+        admission.release(ticket)
+        model["Telemetry"].submit(record)
+
+
+@app.get("/ready")
+def ready():
+    """Readiness probe: 200 once the model and index are warm, else 503."""
+    readiness = model.get("Readiness", {"ready": False})
+    index = model.get("Index")
+    return JSONResponse(
+        status_code=200 if readiness["ready"] else 503,
+        content={**readiness, "index": index.version if index else None},
+    )
+
+
+@app.get("/metrics")
+def metrics():
+    """Runtime metrics of the shared components."""
+    return {
+        "admission": model["Admission"].stats(),
+        "db_pool": model["DatabasePool"].stats(),
+        "faq_store": model["FAQStore"].stats() if "FAQStore" in model else None,
+        "grpc": model["GrpcServer"].stats() if "GrpcServer" in model else None,
+        "index": model["IndexWatcher"].stats(),
+        "index_updates": model["IndexUpdater"].stats(),
+        "inference_pool": model["InferencePool"].stats(),
+        "inference_workers": (
+            vector_cache.workers.stats() if vector_cache.workers else None
+        ),
+        "lexical_index": (
+            model["Index"].lexical.stats() if model["Index"].lexical else None
+        ),
+        "llm": chat_model_work.llm.stats(),
+        "llm_single_flight": chat_model_work.llm_flights.stats(),
+        "match_paths": model["MatchPaths"].stats(),
+        "query_cache": model["QueryCache"].stats(),
+        "rephrase_store": model["RephraseStore"].stats(),
+        "telemetry": model["Telemetry"].stats(),
+        "vector_cache": vector_cache.stats(),
+    }
 
 
 if __name__ == "__main__":
@@ -1,7 +1,17 @@
-from pydantic import BaseModel
+import os
+
+from pydantic import BaseModel, Field
+
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "5000"))
 
 
 class textRequest(BaseModel):
     """Text Request Model"""
 
     SQL_QUERY: str
+
+
+class batchRequest(BaseModel):
+    """Batch Text Request Model"""
+
+    SQL_QUERIES: list[str] = Field(max_length=BATCH_MAX_SIZE)
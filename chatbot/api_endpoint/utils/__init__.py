@@ -1,3 +1 @@
 __all__ = ["chat_model_work", "lm_stu_work"]
-
-from . import chat_model_work, lm_stu_work
@@ -0,0 +1,251 @@
+"""Admission control for the LLM-bound request handlers.
+
+When the LLM slows down, every request holds on for longer and new ones
+keep arriving, so work piles up until clients time out. The controller
+admits at most ``limit`` requests at a time and queues at most
+``ADMISSION_QUEUE_SIZE`` more, each for at most ``ADMISSION_QUEUE_TIMEOUT``
+seconds; anything beyond is refused at once with ``Overloaded``, which the
+servers turn into 503 / ``RESOURCE_EXHAUSTED`` with a retry hint.
+
+The limit adapts to latency. Every ``ADMISSION_WINDOW`` requests, if their
+median latency is over ``ADMISSION_LATENCY_FACTOR`` times the baseline (the
+best median seen, which creeps up 5% a window so a lasting slowdown becomes
+the new normal), the limit drops by 10%; otherwise, if the limit was
+reached, it grows by one. ``ADMISSION_LIMIT=0`` admits everything.
+"""
+
+import asyncio
+import math
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+from utils.db_pool import percentile
+
+ADMISSION_LIMIT = int(os.getenv("ADMISSION_LIMIT", "32"))
+ADMISSION_MIN_LIMIT = int(os.getenv("ADMISSION_MIN_LIMIT", "4"))
+ADMISSION_MAX_LIMIT = int(os.getenv("ADMISSION_MAX_LIMIT", "64"))
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "32"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "2"))
+ADMISSION_LATENCY_FACTOR = float(os.getenv("ADMISSION_LATENCY_FACTOR", "2"))
+ADMISSION_WINDOW = int(os.getenv("ADMISSION_WINDOW", "20"))
+
+
+class Overloaded(Exception):
+    """The request was not admitted; retry after ``retry_after`` seconds."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Server overloaded, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("since", "wake", "granted")
+
+    def __init__(self, wake):
+        self.since = time.monotonic()
+        self.wake = wake
+        self.granted = False
+
+
+class _Ticket:
+    __slots__ = ("start", "released")
+
+    def __init__(self):
+        self.start = time.monotonic()
+        self.released = False
+
+
+class AdmissionController:
+    """Adaptive concurrency limit with a bounded FIFO queue.
+
+    Usable from threads (``admit``) and from an event loop
+    (``admit_async``); ``acquire``/``release`` are for a slot that outlives
+    one block, such as a streamed response.
+    """
+
+    def __init__(
+        self,
+        limit=ADMISSION_LIMIT,
+        min_limit=ADMISSION_MIN_LIMIT,
+        max_limit=ADMISSION_MAX_LIMIT,
+        queue_size=ADMISSION_QUEUE_SIZE,
+        queue_timeout=ADMISSION_QUEUE_TIMEOUT,
+        latency_factor=ADMISSION_LATENCY_FACTOR,
+        window=ADMISSION_WINDOW,
+    ):
+        self.enabled = limit > 0
+        self.min_limit = min(min_limit, limit) if self.enabled else 0
+        self.max_limit = max(max_limit, limit)
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.latency_factor = latency_factor
+        self.window = window
+        self.baseline_ms = None
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._lock = threading.Lock()
+        self._queue = deque()
+        self._saturated = False
+        self._recent_ms = []
+        self._latency_ms = deque(maxlen=1024)
+        self._queue_ms = deque(maxlen=1024)
+
+    def acquire(self):
+        """Wait for a slot on this thread; returns the ticket for ``release``."""
+        if not self.enabled:
+            return None
+        event = threading.Event()
+        waiter = self._enter(event.set)
+        if waiter is not None and not event.wait(self.queue_timeout):
+            self._leave_queue(waiter, timed_out=True)
+        return _Ticket()
+
+    async def acquire_async(self):
+        """Wait for a slot without blocking the loop; see ``acquire``."""
+        if not self.enabled:
+            return None
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(_resolve, granted)
+
+        waiter = self._enter(wake)
+        if waiter is not None:
+            try:
+                await asyncio.wait_for(granted, self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._leave_queue(waiter, timed_out=True)
+            except asyncio.CancelledError:
+                # The client went away while queued.
+                self._leave_queue(waiter, timed_out=False)
+                raise
+        return _Ticket()
+
+    def release(self, ticket):
+        """Free the slot of ``ticket`` and time its request; again is a no-op."""
+        if ticket is None or ticket.released:
+            return
+        ticket.released = True
+        with self._lock:
+            self._observe((time.monotonic() - ticket.start) * 1000)
+            self.in_flight -= 1
+            self._grant()
+
+    @contextmanager
+    def admit(self):
+        """Hold a slot for the block, or raise ``Overloaded``."""
+        ticket = self.acquire()
+        try:
+            yield
+        finally:
+            self.release(ticket)
+
+    @asynccontextmanager
+    async def admit_async(self):
+        """``admit`` for coroutines."""
+        ticket = await self.acquire_async()
+        try:
+            yield
+        finally:
+            self.release(ticket)
+
+    def _enter(self, wake):
+        """Take a free slot (returns None) or queue a waiter."""
+        with self._lock:
+            if self.in_flight < self.limit and not self._queue:
+                self.in_flight += 1
+                self.admitted += 1
+                self._queue_ms.append(0.0)
+                return None
+            if len(self._queue) >= self.queue_size:
+                self.rejected += 1
+                raise Overloaded(self._retry_after())
+            waiter = _Waiter(wake)
+            self._queue.append(waiter)
+            return waiter
+
+    def _leave_queue(self, waiter, timed_out):
+        """Give up on ``waiter``; if it was granted meanwhile, keep (or free) it."""
+        with self._lock:
+            if waiter.granted:
+                if timed_out:
+                    return
+                self.in_flight -= 1
+                self._grant()
+                return
+            self._queue.remove(waiter)
+            if timed_out:
+                self.rejected += 1
+                self.timed_out += 1
+                raise Overloaded(self._retry_after())
+
+    def _grant(self):
+        """Hand free slots to the oldest waiters, in order."""
+        while self._queue and self.in_flight < self.limit:
+            waiter = self._queue.popleft()
+            waiter.granted = True
+            self.in_flight += 1
+            self.admitted += 1
+            self._queue_ms.append((time.monotonic() - waiter.since) * 1000)
+            waiter.wake()
+
+    def _observe(self, ms):
+        """Record one request's latency; adjust the limit every window."""
+        self._latency_ms.append(ms)
+        self._recent_ms.append(ms)
+        if self.in_flight >= self.limit:
+            self._saturated = True
+        if len(self._recent_ms) < self.window:
+            return
+        median = statistics.median(self._recent_ms)
+        self._recent_ms.clear()
+        if self.baseline_ms is None:
+            self.baseline_ms = median
+        else:
+            self.baseline_ms = min(median, self.baseline_ms * 1.05)
+        if median > self.latency_factor * self.baseline_ms:
+            self.limit = max(self.min_limit, int(self.limit * 0.9))
+        elif self._saturated:
+            self.limit = min(self.max_limit, self.limit + 1)
+        self._saturated = False
+
+    def _retry_after(self):
+        """Seconds until the queue ahead has likely drained, at least one."""
+        latency = percentile(list(self._latency_ms), 0.5) / 1000
+        ahead = (len(self._queue) + 1) / max(self.limit, 1)
+        return max(1, math.ceil(ahead * latency))
+
+    def stats(self):
+        """Admission metrics for the /metrics endpoint."""
+        now = time.monotonic()
+        with self._lock:
+            oldest = (now - self._queue[0].since) * 1000 if self._queue else 0.0
+            queued = len(self._queue)
+        waits = list(self._queue_ms)
+        latencies = list(self._latency_ms)
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queued": queued,
+            "queue_age_ms": oldest,
+            "queue_ms_p50": percentile(waits, 0.5),
+            "queue_ms_p99": percentile(waits, 0.99),
+            "latency_ms_p50": percentile(latencies, 0.5),
+            "baseline_ms": self.baseline_ms,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
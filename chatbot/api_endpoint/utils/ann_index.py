@@ -0,0 +1,271 @@
+"""Inverted-file (IVF) approximate nearest-neighbour index over document vectors.
+
+Build an index from the serving model, then check recall against exact search:
+
+    python -m utils.ann_index build --out ann_index --nlist 1024
+    python -m utils.ann_index evaluate --index ann_index --nprobe 1 4 16 64
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+from utils.vector_search import normalize
+
+ANN_INDEX_PATH = os.getenv("ANN_INDEX_PATH", "")
+ANN_NPROBE = int(os.getenv("ANN_NPROBE", "8"))
+FORMAT_VERSION = 1
+CURRENT = "CURRENT"
+
+
+def kmeans(matrix, nlist, iterations=20, sample=None, seed=0):
+    """Spherical k-means; returns ``nlist`` unit-length centroids."""
+    rng = np.random.default_rng(seed)
+    sample = sample or min(len(matrix), nlist * 64)
+    points = matrix[rng.choice(len(matrix), size=sample, replace=False)]
+    centroids = points[rng.choice(len(points), size=nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(points @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, points)
+        empty = np.bincount(assign, minlength=nlist) == 0
+        # Re-seed empty lists so every centroid keeps pulling its share.
+        sums[empty] = points[rng.choice(len(points), size=int(empty.sum()))]
+        centroids = normalize(sums)
+    return centroids
+
+
+def assign_lists(matrix, centroids, chunk=65536):
+    """Return the nearest centroid of every row, computed in chunks."""
+    assign = np.empty(len(matrix), dtype=np.int64)
+    for start in range(0, len(matrix), chunk):
+        block = np.asarray(matrix[start : start + chunk])
+        assign[start : start + chunk] = np.argmax(block @ centroids.T, axis=1)
+    return assign
+
+
+def saved_versions(path):
+    """Numbers of the ``v<n>`` versions under an index directory, ascending."""
+    return sorted(
+        int(name[1:])
+        for name in os.listdir(path)
+        if name[:1] == "v" and name[1:].isdigit()
+    )
+
+
+class IVFIndex:
+    """Search only the ``nprobe`` inverted lists closest to each query.
+
+    Vectors are stored grouped by list so each probe reads one contiguous
+    slice. ``nlist`` (build time) and ``nprobe`` (query time) trade recall
+    for latency; ``search`` has the same signature as ``VectorSearch``.
+    """
+
+    def __init__(self, centroids, vectors, tags, offsets, nprobe=ANN_NPROBE):
+        self.centroids = centroids
+        self.vectors = vectors
+        self.tags = tags
+        self.offsets = offsets
+        self.nprobe = nprobe
+
+    def __len__(self):
+        return len(self.tags)
+
+    @property
+    def nlist(self):
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, matrix, tags, nlist=None, iterations=20, seed=0):
+        """Cluster a normalized ``matrix`` into ``nlist`` inverted lists."""
+        nlist = nlist or max(1, int(np.sqrt(len(matrix))))
+        nlist = min(nlist, len(matrix))
+        centroids = kmeans(matrix, nlist, iterations=iterations, seed=seed)
+        assign = assign_lists(matrix, centroids)
+        order = np.argsort(assign, kind="stable")
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assign, minlength=nlist), out=offsets[1:])
+        vectors = np.ascontiguousarray(np.asarray(matrix)[order], dtype=np.float32)
+        return cls(centroids, vectors, np.asarray(tags)[order], offsets)
+
+    def save(self, path):
+        """Write the index as a new version under ``path`` and point at it.
+
+        Each save fills ``<path>/v<n>`` and then renames ``<path>/CURRENT``
+        over to name it, so a crash at any point leaves the previous version
+        served. Older versions are removed afterwards; servers that already
+        mapped them keep reading the unlinked files.
+        """
+        os.makedirs(path, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=".ann-", dir=path)
+        try:
+            for name in ("centroids", "vectors", "tags", "offsets"):
+                np.save(os.path.join(tmp, f"{name}.npy"), getattr(self, name))
+            meta = {
+                "format": FORMAT_VERSION,
+                "count": len(self),
+                "dim": int(self.vectors.shape[1]),
+                "nlist": self.nlist,
+                "metric": "cosine",
+            }
+            with open(os.path.join(tmp, "meta.json"), "w") as f:
+                json.dump(meta, f, indent=2)
+            versions = saved_versions(path)
+            version = f"v{versions[-1] + 1 if versions else 1}"
+            os.replace(tmp, os.path.join(path, version))
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        pointer = os.path.join(path, f".{CURRENT}.{os.getpid()}")
+        with open(pointer, "w") as f:
+            f.write(version + "\n")
+        os.replace(pointer, os.path.join(path, CURRENT))
+        for old in versions:
+            shutil.rmtree(os.path.join(path, f"v{old}"), ignore_errors=True)
+
+    @classmethod
+    def load(cls, path, nprobe=ANN_NPROBE):
+        """Open a saved index with the vectors memory-mapped read-only.
+
+        ``path`` is the directory ``save`` wrote; the version ``CURRENT``
+        names is opened, or ``path`` itself for indexes saved before
+        versioning.
+        """
+        try:
+            with open(os.path.join(path, CURRENT)) as f:
+                path = os.path.join(path, f.read().strip())
+        except FileNotFoundError:
+            pass
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported ANN index format in {path}: {meta}")
+        return cls(
+            np.load(os.path.join(path, "centroids.npy")),
+            np.load(os.path.join(path, "vectors.npy"), mmap_mode="r"),
+            np.load(os.path.join(path, "tags.npy"), mmap_mode="r"),
+            np.load(os.path.join(path, "offsets.npy")),
+            nprobe=nprobe,
+        )
+
+    def search_batch(self, queries, k=1, threshold=None, nprobe=None, exclude=None):
+        """Return the top-``k`` ``(tag, score)`` pairs for each query vector.
+
+        Rows set in the boolean mask ``exclude`` are never returned.
+        """
+        queries = normalize(queries)
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        probes = np.argpartition(-(queries @ self.centroids.T), nprobe - 1, axis=1)
+        results = []
+        for query, lists in zip(queries, probes[:, :nprobe]):
+            rows = np.concatenate(
+                [np.arange(self.offsets[i], self.offsets[i + 1]) for i in lists]
+            )
+            if exclude is not None:
+                rows = rows[~exclude[rows]]
+            if len(rows) == 0:
+                results.append([])
+                continue
+            scores = self.vectors[rows] @ query
+            top = min(k, len(rows))
+            best = np.argpartition(-scores, top - 1)[:top]
+            best = best[np.argsort(-scores[best], kind="stable")]
+            pairs = [
+                (int(self.tags[rows[i]]), float(scores[i]))
+                for i in best
+                if threshold is None or scores[i] >= threshold
+            ]
+            results.append(pairs)
+        return results
+
+    def search(self, query, k=1, threshold=None, nprobe=None, exclude=None):
+        """Return the top-``k`` ``(tag, score)`` pairs for one query vector."""
+        return self.search_batch(
+            np.asarray(query)[None, :], k, threshold, nprobe, exclude
+        )[0]
+
+
+def recall_at_k(index, exact, queries, k=10, nprobe=None):
+    """Fraction of the exact top-``k`` tags that the index also returns."""
+    approx = index.search_batch(queries, k=k, nprobe=nprobe)
+    truth = exact.search_batch(queries, k=k)
+    hits = sum(
+        len({tag for tag, _ in a} & {tag for tag, _ in t})
+        for a, t in zip(approx, truth)
+    )
+    return hits / max(1, sum(len(t) for t in truth))
+
+
+def evaluate(index, exact, queries, k=10, nprobes=(1, 4, 16, 64)):
+    """Measure recall@k and per-query latency for each ``nprobe`` setting."""
+    rows = []
+    for nprobe in nprobes:
+        start = time.perf_counter()
+        for query in queries:
+            index.search(query, k=k, nprobe=nprobe)
+        elapsed = (time.perf_counter() - start) * 1000 / len(queries)
+        rows.append(
+            {
+                "nprobe": nprobe,
+                "recall": recall_at_k(index, exact, queries, k, nprobe),
+                "ms_per_query": elapsed,
+            }
+        )
+    start = time.perf_counter()
+    for query in queries:
+        exact.search(query, k=k)
+    rows.append(
+        {
+            "nprobe": "exact",
+            "recall": 1.0,
+            "ms_per_query": (time.perf_counter() - start) * 1000 / len(queries),
+        }
+    )
+    return rows
+
+
+def main():
+    from utils.model_registry import MODEL_PATH, registry
+
+    parser = argparse.ArgumentParser(description="Build or evaluate an IVF index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build")
+    build.add_argument("--model", default=MODEL_PATH)
+    build.add_argument("--out", default=ANN_INDEX_PATH or "ann_index")
+    build.add_argument("--nlist", type=int, default=None)
+    build.add_argument("--iterations", type=int, default=20)
+    check = sub.add_parser("evaluate")
+    check.add_argument("--model", default=MODEL_PATH)
+    check.add_argument("--index", default=ANN_INDEX_PATH or "ann_index")
+    check.add_argument("--k", type=int, default=10)
+    check.add_argument("--queries", type=int, default=200)
+    check.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 16, 64])
+    args = parser.parse_args()
+
+    exact = registry.search(args.model)
+    if args.command == "build":
+        index = IVFIndex.build(
+            exact.matrix, exact.tags, nlist=args.nlist, iterations=args.iterations
+        )
+        index.save(args.out)
+        print(f"wrote {args.out}: {len(index)} vectors in {index.nlist} lists")
+        return
+
+    index = IVFIndex.load(args.index)
+    # Perturbed documents stand in for user queries phrased like the FAQ.
+    rng = np.random.default_rng(0)
+    picks = rng.choice(len(exact), size=min(args.queries, len(exact)), replace=False)
+    queries = np.asarray(exact.matrix[picks])
+    queries = queries + rng.normal(scale=0.05, size=queries.shape)
+    for row in evaluate(index, exact, queries, args.k, args.nprobe):
+        print(
+            f"nprobe={row['nprobe']!s:>5} recall@{args.k}={row['recall']:.3f} "
+            f"{row['ms_per_query']:.3f}ms/query"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,46 +1,136 @@
-import os
+import hashlib
 
 from db_access import RetrieveData
 from dotenv import load_dotenv
-from groq import Groq
+from utils.llm_provider import Router
+from utils.single_flight import SingleFlight
 
 load_dotenv()
 
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+# Groq by default, pooled and optionally hedged; see utils/llm_provider.py.
+llm = Router.from_env()
 
-client = Groq(api_key=GROQ_API_KEY)
+# Concurrent requests for the same answer share one completion.
+llm_flights = SingleFlight()
 
-
-class RefactorModel:
-    def __init__(self):
-        pass
-
-    def model_work(self, result_data: str):
-        """Refactor Model work on db access"""
-
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {
-                    "role": "system",
-                    "content": """
+SYSTEM_PROMPT = """
                 - The tone is polite, professional, and grammatically correct.
                 - The original meaning and context remain accurate.
-                - If the text sounds too casual or emotional, rephrase it into a neutral and refined style.""",
-                },
-                {"role": "user", "content": result_data},
-            ],
-            temperature=1,
-            max_completion_tokens=8192,
-            top_p=1,
-            # reasoning_effort="medium",
-            # stream=True,
-            # stop=None
-        )
+                - If the text sounds too casual or emotional, rephrase it into a neutral and refined style."""
+
+# Changes whenever the model or prompt does, so stored rephrasings go stale.
+_prompt = f"{llm.primary.model}\n{SYSTEM_PROMPT}".encode()
+PROMPT_VERSION = hashlib.sha256(_prompt).hexdigest()[:12]
+
+
+def build_messages(result_data: str) -> list:
+    """Chat messages that restyle ``result_data``."""
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": result_data},
+    ]
+
+
+class RefactorModel:
+    def __init__(self, store=None):
+        self.store = store
+
+    def model_work(self, result_data: str, deadline=None):
+        """Refactor Model work on db access
+
+        Served from the precomputed ``RephraseStore`` when it has this
+        answer; the live LLM is only called on a miss, within ``deadline``.
+        """
+        if self.store is not None:
+            cached = self.store.get(result_data)
+            if cached is not None:
+                return cached
+
+        result = self.rephrase(result_data, deadline)
+
+        if self.store is not None:
+            self.store.remember(result_data, result)
+        return result
+
+    def stream_work(self, result_data: str, deadline=None):
+        """Yield the rephrased answer in pieces as the LLM produces them.
 
-        result = completion
+        A stored rephrasing is yielded in one piece; otherwise the LLM
+        deltas are forwarded as they arrive and the full text is remembered.
+        """
+        if self.store is not None:
+            cached = self.store.get(result_data)
+            if cached is not None:
+                yield cached
+                return
 
-        return result.choices[0].message.content
+        parts = []
+        for delta in self.rephrase_stream(result_data, deadline):
+            parts.append(delta)
+            yield delta
+
+        if self.store is not None:
+            self.store.remember(result_data, "".join(parts))
+
+    async def amodel_work(self, result_data: str, deadline=None):
+        """Async ``model_work`` for the event loop; uses the pooled client."""
+        if self.store is not None:
+            cached = self.store.get(result_data)
+            if cached is not None:
+                return cached
+
+        result = await self.arephrase(result_data, deadline)
+
+        if self.store is not None:
+            self.store.remember(result_data, result)
+        return result
+
+    async def astream_work(self, result_data: str, deadline=None):
+        """Async ``stream_work``: yield the rephrased answer in pieces."""
+        if self.store is not None:
+            cached = self.store.get(result_data)
+            if cached is not None:
+                yield cached
+                return
+
+        parts = []
+        async for delta in self.arephrase_stream(result_data, deadline):
+            parts.append(delta)
+            yield delta
+
+        if self.store is not None:
+            self.store.remember(result_data, "".join(parts))
+
+    def rephrase_stream(self, result_data: str, deadline=None):
+        """Ask the LLM to restyle ``result_data`` and yield content deltas."""
+        yield from llm.stream(build_messages(result_data), deadline)
+
+    async def arephrase_stream(self, result_data: str, deadline=None):
+        """Async ``rephrase_stream``."""
+        async for delta in llm.astream(build_messages(result_data), deadline):
+            yield delta
+
+    def rephrase(self, result_data: str, deadline=None):
+        """Ask the LLM to restyle ``result_data``.
+
+        Identical calls already in flight are joined instead of repeated.
+        The call is bounded by the provider's timeout and what is left of
+        ``deadline``; while its circuit is open it raises CircuitOpen.
+        """
+        messages = build_messages(result_data)
+        return llm_flights.do(
+            llm.key(messages), lambda: llm.complete(messages, deadline)
+        )
+
+    async def arephrase(self, result_data: str, deadline=None):
+        """Async ``rephrase``; joined calls also stop waiting at ``deadline``."""
+        messages = build_messages(result_data)
+        flight = llm_flights.do_async(
+            llm.key(messages), lambda: llm.acomplete(messages, deadline)
+        )
+        if deadline is None:
+            return await flight
+        return await deadline.run("llm", flight)
 
 
 # if __name__ == "__main__":
@@ -0,0 +1,108 @@
+"""Circuit breaker for the LLM clients.
+
+After ``CIRCUIT_FAILURES`` calls in a row fail (errors and timeouts alike)
+the circuit opens: for ``CIRCUIT_RESET_SECONDS`` every call fails at once
+with ``CircuitOpen`` instead of waiting on a provider that is down, and the
+handlers answer with the FAQ answer as is. Then one trial call is let
+through; its success closes the circuit, its failure opens it again.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+CIRCUIT_FAILURES = int(os.getenv("CIRCUIT_FAILURES", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpen(Exception):
+    """The provider failed repeatedly; calls are refused for a while."""
+
+    def __init__(self, name):
+        super().__init__(f"Circuit for {name} is open")
+        self.name = name
+
+
+class CircuitBreaker:
+    """Closed, open or half-open state of one upstream provider.
+
+    Wrap each upstream call in ``guard``. Thread safe, and usable around
+    awaits: the state only changes on entering and leaving the block.
+    """
+
+    def __init__(self, name, failures=CIRCUIT_FAILURES, reset=CIRCUIT_RESET_SECONDS):
+        self.name = name
+        self.failures = failures
+        self.reset = reset
+        self.state = CLOSED
+        self.consecutive = 0
+        self.opened = 0
+        self.refused = 0
+        self._opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def guard(self):
+        """Run the block as one call, or raise ``CircuitOpen`` without it.
+
+        An exception from the block counts as a failure; a cancelled call
+        (``BaseException``, e.g. the client went away) counts as neither.
+        """
+        trial = self._enter()
+        outcome = None
+        try:
+            yield
+            outcome = True
+        except Exception:
+            outcome = False
+            raise
+        finally:
+            self._leave(trial, outcome)
+
+    def _enter(self):
+        """Admit one call; True if it is the half-open trial."""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.reset:
+                    self.refused += 1
+                    raise CircuitOpen(self.name)
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN:
+                if self._trial:
+                    self.refused += 1
+                    raise CircuitOpen(self.name)
+                self._trial = True
+                return True
+            return False
+
+    def _leave(self, trial, outcome):
+        with self._lock:
+            if trial:
+                self._trial = False
+            if outcome is None:
+                return
+            if outcome:
+                self.consecutive = 0
+                self.state = CLOSED
+                return
+            self.consecutive += 1
+            if trial or self.consecutive >= self.failures:
+                if self.state != OPEN:
+                    self.opened += 1
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+
+    def stats(self):
+        """Breaker metrics for the /metrics endpoint."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive,
+            "opened": self.opened,
+            "refused": self.refused,
+        }
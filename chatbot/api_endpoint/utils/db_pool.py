@@ -0,0 +1,183 @@
+"""Shared asyncpg connection pool for the chatbot, with sizing metrics."""
+
+import asyncio
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+import asyncpg
+
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+DB_ACQUIRE_TIMEOUT = float(os.getenv("DB_ACQUIRE_TIMEOUT", "2"))
+DB_COMMAND_TIMEOUT = float(os.getenv("DB_COMMAND_TIMEOUT", "5"))
+DB_HEALTH_CHECK_SECONDS = float(os.getenv("DB_HEALTH_CHECK_SECONDS", "30"))
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+
+# Named queries; asyncpg prepares each one on first use per connection and
+# keeps it in the connection's statement cache.
+STATEMENTS = {
+    "faq_all": "SELECT id, question, answer FROM faq ORDER BY id",
+    "faq_questions": "SELECT id, question FROM faq ORDER BY id",
+    "faq_by_ids": "SELECT id, answer FROM faq WHERE id = ANY($1::bigint[])",
+    "rephrased": (
+        "SELECT answer_hash, rephrased FROM faq_rephrased WHERE prompt_version = $1"
+    ),
+}
+
+
+def percentile(samples, q):
+    """Return the ``q`` quantile (0-1) of ``samples``, or 0.0 when empty."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class DatabasePool:
+    """One connection pool per process, shared by REST and gRPC handlers."""
+
+    def __init__(
+        self,
+        dsn=None,
+        min_size=DB_POOL_MIN_SIZE,
+        max_size=DB_POOL_MAX_SIZE,
+        acquire_timeout=DB_ACQUIRE_TIMEOUT,
+        command_timeout=DB_COMMAND_TIMEOUT,
+        health_check_seconds=DB_HEALTH_CHECK_SECONDS,
+        statement_cache_size=DB_STATEMENT_CACHE_SIZE,
+    ):
+        self.dsn = dsn or os.getenv("DB_URI")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.command_timeout = command_timeout
+        self.health_check_seconds = health_check_seconds
+        self.statement_cache_size = statement_cache_size
+        self._pool = None
+        self._health_task = None
+
+        self.in_use = 0
+        self.waiters = 0
+        self.acquired = 0
+        self.timeouts = 0
+        self.healthy = False
+        self.health_failures = 0
+        self._acquire_ms = deque(maxlen=1024)
+        self._acquire_ms_max = 0.0
+
+    async def open(self):
+        """Create the pool and start the background health check."""
+        self._pool = await asyncpg.create_pool(
+            self.dsn,
+            min_size=self.min_size,
+            max_size=self.max_size,
+            command_timeout=self.command_timeout,
+            statement_cache_size=self.statement_cache_size,
+        )
+        self.healthy = True
+        if self.health_check_seconds:
+            self._health_task = asyncio.create_task(self._health_check())
+
+    async def close(self):
+        """Stop the health check and close every connection."""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    @asynccontextmanager
+    async def acquire(self, timeout=None):
+        """Borrow a connection, waiting at most ``acquire_timeout`` seconds.
+
+        ``timeout`` shortens the wait, e.g. to what is left of a deadline.
+        """
+        if timeout is not None:
+            timeout = min(timeout, self.acquire_timeout)
+        else:
+            timeout = self.acquire_timeout
+        self.waiters += 1
+        start = time.perf_counter()
+        try:
+            conn = await self._pool.acquire(timeout=timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.waiters -= 1
+
+        elapsed = (time.perf_counter() - start) * 1000
+        self._acquire_ms.append(elapsed)
+        self._acquire_ms_max = max(self._acquire_ms_max, elapsed)
+        self.acquired += 1
+        self.in_use += 1
+        try:
+            yield conn
+        finally:
+            self.in_use -= 1
+            await self._pool.release(conn)
+
+    async def fetch(self, name, *args, timeout=None):
+        """Run the prepared statement ``name`` and return all rows.
+
+        ``timeout`` bounds the acquire and the query together, within
+        their own limits.
+        """
+        expires = None if timeout is None else time.monotonic() + timeout
+        async with self.acquire(timeout) as conn:
+            return await conn.fetch(
+                STATEMENTS[name], *args, timeout=self._query_timeout(expires)
+            )
+
+    async def fetchval(self, name, *args, timeout=None):
+        """Run the prepared statement ``name`` and return the first value."""
+        expires = None if timeout is None else time.monotonic() + timeout
+        async with self.acquire(timeout) as conn:
+            return await conn.fetchval(
+                STATEMENTS[name], *args, timeout=self._query_timeout(expires)
+            )
+
+    def _query_timeout(self, expires):
+        """``command_timeout``, or less if ``expires`` comes sooner."""
+        if expires is None:
+            return None
+        left = max(expires - time.monotonic(), 0.001)
+        return left if self.command_timeout is None else min(left, self.command_timeout)
+
+    async def _health_check(self):
+        while True:
+            await asyncio.sleep(self.health_check_seconds)
+            try:
+                async with self.acquire() as conn:
+                    await conn.fetchval("SELECT 1")
+                self.healthy = True
+            except Exception:
+                self.healthy = False
+                self.health_failures += 1
+                # Drop connections that may have been cut by a failover.
+                self._pool.expire_connections()
+
+    def stats(self):
+        """Pool sizing metrics for the /metrics endpoint."""
+        samples = list(self._acquire_ms)
+        return {
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "size": self._pool.get_size() if self._pool else 0,
+            "idle": self._pool.get_idle_size() if self._pool else 0,
+            "in_use": self.in_use,
+            "waiters": self.waiters,
+            "acquired": self.acquired,
+            "timeouts": self.timeouts,
+            "acquire_ms": {
+                "avg": sum(samples) / len(samples) if samples else 0.0,
+                "p50": percentile(samples, 0.50),
+                "p95": percentile(samples, 0.95),
+                "max": self._acquire_ms_max,
+            },
+            "healthy": self.healthy,
+            "health_failures": self.health_failures,
+        }
@@ -0,0 +1,76 @@
+"""Per-request latency budget shared by every stage of a request.
+
+A request gets one ``Deadline`` when it arrives (``REQUEST_DEADLINE``
+seconds, or less when a gRPC client set its own). Each stage then waits at
+most what is left: the database acquire and query, inference, and the LLM
+call, which is capped by ``LLM_TIMEOUT`` as well. When the LLM stage
+cannot finish in time the handlers answer with the FAQ answer as is.
+A batch gets ``BATCH_QUERY_SECONDS`` more per question, up to
+``BATCH_DEADLINE`` seconds.
+"""
+
+import asyncio
+import os
+import time
+
+REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE", "10"))
+BATCH_QUERY_SECONDS = float(os.getenv("BATCH_QUERY_SECONDS", "0.2"))
+BATCH_DEADLINE = float(os.getenv("BATCH_DEADLINE", "600"))
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's budget ran out before ``stage`` finished."""
+
+    def __init__(self, stage):
+        super().__init__(f"Deadline exceeded during {stage}")
+        self.stage = stage
+
+
+class Deadline:
+    """The instant a request must be answered by."""
+
+    def __init__(self, seconds=REQUEST_DEADLINE):
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds
+
+    @classmethod
+    def for_rpc(cls, context, seconds=REQUEST_DEADLINE):
+        """The budget of an RPC: ours, or the client's deadline if sooner."""
+        remaining = context.time_remaining()
+        if remaining is not None:
+            seconds = min(seconds, remaining)
+        return cls(seconds)
+
+    @classmethod
+    def for_batch(cls, size, context=None):
+        """The budget of a batch of ``size`` questions, over REST or gRPC."""
+        seconds = min(BATCH_DEADLINE, REQUEST_DEADLINE + size * BATCH_QUERY_SECONDS)
+        if context is not None:
+            return cls.for_rpc(context, seconds)
+        return cls(seconds)
+
+    def remaining(self):
+        """Seconds left, never negative."""
+        return max(0.0, self.expires - time.monotonic())
+
+    def timeout(self, stage, cap=None):
+        """Seconds ``stage`` may take: what is left, at most ``cap``."""
+        left = self.expires - time.monotonic()
+        if left <= 0:
+            raise DeadlineExceeded(stage)
+        return left if cap is None else min(cap, left)
+
+    async def run(self, stage, awaitable, cap=None):
+        """Await ``awaitable`` within the budget, or raise DeadlineExceeded."""
+        try:
+            timeout = self.timeout(stage, cap)
+        except DeadlineExceeded:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise
+        try:
+            return await asyncio.wait_for(awaitable, timeout)
+        except asyncio.TimeoutError as e:
+            if isinstance(e, DeadlineExceeded):
+                raise
+            raise DeadlineExceeded(stage) from e
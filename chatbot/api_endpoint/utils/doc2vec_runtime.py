@@ -0,0 +1,308 @@
+"""NumPy-only Doc2Vec inference, so serving processes never import gensim.
+
+Export a trained model once (this step needs gensim):
+
+    python -m utils.doc2vec_runtime export --model utils/doc2vec_model.model \
+        --out utils/doc2vec_model.runtime
+
+``DOC2VEC_MODEL_PATH`` defaults to that directory; re-run the export after
+retraining in the notebook. It holds the word vectors, the negative-sampling
+output layer, the sampling tables and the document vectors as ``.npy``
+files, memory-mapped read-only on load, plus ``runtime.json`` with the
+hyperparameters, vocabulary and document tags. Index versions written by
+``utils/index_build.py`` carry their own export.
+
+``Doc2VecRuntime.infer_vector`` is a port of gensim's PV-DM inference with
+negative sampling (``train_document_dm``): the same subsampling, shrunken
+windows, negative draws, sigmoid table and learning-rate schedule. Unlike
+gensim it is seeded from the words themselves, so a question always gets
+the same vector, in every process.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import zlib
+from bisect import bisect_left
+
+import numpy as np
+from utils.vector_search import VectorSearch
+
+FORMAT_VERSION = 1
+META_FILE = "runtime.json"
+ARRAYS = ("word_vectors", "syn1neg", "cum_table", "sample_int", "doc_vectors")
+# The normalized search matrix, exported with the model for the registry.
+SEARCH_PREFIX = "dv_normed"
+
+# gensim's sigmoid table (word2vec_inner.pyx), float32 like its REAL_t.
+MAX_EXP = 6
+EXP_TABLE_SIZE = 1000
+_EXP = np.exp(
+    (np.arange(EXP_TABLE_SIZE, dtype=np.float32) / np.float32(EXP_TABLE_SIZE) * 2 - 1)
+    * MAX_EXP
+).astype(np.float32)
+EXP_TABLE = (_EXP / (_EXP + 1)).tolist()
+# EXP_TABLE_SIZE / MAX_EXP / 2 in C integer arithmetic.
+EXP_SCALE = EXP_TABLE_SIZE // MAX_EXP // 2
+
+# gensim's linear congruential generator for subsampling and negatives.
+LCG_MULTIPLIER = 25214903917
+LCG_MASK = (1 << 48) - 1
+
+
+def is_runtime(path):
+    """Whether ``path`` is a directory written by ``export``."""
+    return os.path.isfile(os.path.join(path, META_FILE))
+
+
+def seed_of(doc_words):
+    """A stable 32-bit seed for a document (``hash`` is salted per process)."""
+    return zlib.crc32(" ".join(doc_words).encode("utf-8"))
+
+
+def initial_vector(size, seed):
+    """The small random starting vector, drawn the way gensim draws it."""
+    once = np.random.Generator(np.random.SFC64(seed))
+    return (once.random(size).astype(np.float32) - 0.5) / size
+
+
+class DocVectors:
+    """The part of gensim's ``model.dv`` the serving code uses."""
+
+    def __init__(self, vectors, index_to_key):
+        self.vectors = vectors
+        self.index_to_key = index_to_key
+        self.key_to_index = {key: i for i, key in enumerate(index_to_key)}
+
+    def __len__(self):
+        return len(self.index_to_key)
+
+    def __getitem__(self, key):
+        return self.vectors[self.key_to_index[str(key)]]
+
+
+class Doc2VecRuntime:
+    """Inference and document vectors of an exported PV-DM Doc2Vec model."""
+
+    def __init__(self, config, vocab, doctags, arrays):
+        self.config = config
+        self.vector_size = config["vector_size"]
+        self.epochs = config["epochs"]
+        self.alpha = config["alpha"]
+        self.min_alpha = config["min_alpha"]
+        self.window = config["window"]
+        self.negative = config["negative"]
+        self.sample = config["sample"]
+        self.cbow_mean = config["cbow_mean"]
+        self.shrink_windows = config["shrink_windows"]
+        self.index_to_key = vocab
+        self.key_to_index = {word: i for i, word in enumerate(vocab)}
+        self.word_vectors = arrays["word_vectors"]
+        self.syn1neg = arrays["syn1neg"]
+        self.cum_table = arrays["cum_table"].tolist()
+        self.sample_int = arrays["sample_int"].tolist()
+        self.dv = DocVectors(arrays["doc_vectors"], doctags)
+        # Set by ``load``: where worker processes open the same arrays.
+        self.path = None
+
+    @classmethod
+    def from_model(cls, model):
+        """Copy what inference needs out of a trained gensim ``Doc2Vec``."""
+        if not model.dm or model.dm_concat or model.hs or not model.negative:
+            raise ValueError(
+                "only PV-DM models with negative sampling (dm=1, dm_concat=0, "
+                "hs=0, negative>0) can be exported"
+            )
+        config = {
+            "format": FORMAT_VERSION,
+            "vector_size": int(model.vector_size),
+            "epochs": int(model.epochs),
+            "alpha": float(model.alpha),
+            "min_alpha": float(model.min_alpha),
+            "window": int(model.window),
+            "negative": int(model.negative),
+            "sample": float(model.sample),
+            "cbow_mean": bool(model.cbow_mean),
+            "shrink_windows": bool(getattr(model, "shrink_windows", True)),
+        }
+        arrays = {
+            "word_vectors": model.wv.vectors,
+            "syn1neg": model.syn1neg,
+            "cum_table": model.cum_table,
+            "sample_int": model.wv.expandos["sample_int"],
+            "doc_vectors": model.dv.vectors,
+        }
+        arrays = {name: np.asarray(array) for name, array in arrays.items()}
+        vocab = [str(word) for word in model.wv.index_to_key]
+        doctags = [str(tag) for tag in model.dv.index_to_key]
+        return cls(config, vocab, doctags, arrays)
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        """Open an exported model, its arrays memory-mapped read-only."""
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+        if meta["config"].get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported runtime format in {path}")
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in ARRAYS
+        }
+        runtime = cls(meta["config"], meta["vocab"], meta["doctags"], arrays)
+        runtime.path = os.path.abspath(path)
+        return runtime
+
+    def save(self, out, search=False):
+        """Write the model to directory ``out`` (temp dir, then rename).
+
+        With ``search`` the normalized document vectors are written too, as
+        the ``SEARCH_PREFIX`` matrix the registry serves.
+        """
+        parent = os.path.dirname(os.path.abspath(out))
+        os.makedirs(parent, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=".runtime-", dir=parent)
+        try:
+            arrays = {
+                "word_vectors": self.word_vectors,
+                "syn1neg": self.syn1neg,
+                "cum_table": np.asarray(self.cum_table, dtype=np.uint32),
+                "sample_int": np.asarray(self.sample_int, dtype=np.uint32),
+                "doc_vectors": self.dv.vectors,
+            }
+            for name, array in arrays.items():
+                np.save(os.path.join(tmp, f"{name}.npy"), array)
+            meta = {
+                "config": self.config,
+                "vocab": self.index_to_key,
+                "doctags": self.dv.index_to_key,
+            }
+            with open(os.path.join(tmp, META_FILE), "w") as f:
+                json.dump(meta, f)
+            if search:
+                VectorSearch.from_model(self).save(os.path.join(tmp, SEARCH_PREFIX))
+            shutil.rmtree(out, ignore_errors=True)
+            os.replace(tmp, out)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        return out
+
+    def infer_vector(
+        self, doc_words, alpha=None, min_alpha=None, epochs=None, rng=None, init=None
+    ):
+        """Infer the vector of a tokenized document, like gensim's ``infer_vector``.
+
+        ``rng`` (a ``numpy.random.RandomState``) and ``init`` default to
+        values seeded from ``doc_words``; passing gensim's ``model.random``
+        draws and starting vector reproduces its result.
+        """
+        if isinstance(doc_words, str):
+            raise TypeError("doc_words must be a list of strings, not a string")
+        alpha = alpha or self.alpha
+        min_alpha = min_alpha or self.min_alpha
+        epochs = epochs or self.epochs
+        if rng is None or init is None:
+            seed = seed_of(doc_words)
+            rng = np.random.RandomState(seed) if rng is None else rng
+            init = initial_vector(self.vector_size, seed) if init is None else init
+        doc = np.array(init, dtype=np.float32).reshape(self.vector_size)
+
+        known = [self.key_to_index.get(word) for word in doc_words]
+        known = [index for index in known if index is not None]
+        contexts = {}
+        alpha_delta = (alpha - min_alpha) / max(epochs - 1, 1)
+        for _ in range(epochs):
+            self._train_epoch(doc, known, np.float32(alpha), rng, contexts)
+            alpha -= alpha_delta
+        return doc
+
+    def _train_epoch(self, doc, known, alpha, rng, contexts):
+        """One pass of ``train_document_dm`` with frozen words and weights.
+
+        ``contexts`` caches the summed word vectors of each context window
+        seen so far; the words never change during inference.
+        """
+        next_random = (2**24) * rng.randint(0, 2**24) + rng.randint(0, 2**24)
+        words = []
+        for index in known:
+            if self.sample:
+                draw = next_random >> 16
+                next_random = (next_random * LCG_MULTIPLIER + 11) & LCG_MASK
+                if self.sample_int[index] < draw:
+                    continue
+            words.append(index)
+        length = len(words)
+        if not length:
+            # gensim's randint of size 0 draws nothing either.
+            return
+        if self.shrink_windows:
+            reduced = rng.randint(0, self.window, length).tolist()
+        else:
+            reduced = [0] * length
+
+        cum_table = self.cum_table
+        cum_total = cum_table[-1]
+        for i, word in enumerate(words):
+            start = max(i - self.window + reduced[i], 0)
+            end = min(i + self.window + 1 - reduced[i], length)
+            context = tuple(words[start:i] + words[i + 1 : end])
+            if context not in contexts:
+                contexts[context] = self.word_vectors[list(context)].sum(axis=0)
+            neu1 = contexts[context] + doc
+            inv_count = np.float32(1.0 / (len(context) + 1))
+            if self.cbow_mean:
+                neu1 *= inv_count
+
+            targets, labels = [word], [1.0]
+            for _ in range(self.negative):
+                target = bisect_left(cum_table, (next_random >> 16) % cum_total)
+                next_random = (next_random * LCG_MULTIPLIER + 11) & LCG_MASK
+                if target != word:
+                    targets.append(target)
+                    labels.append(0.0)
+
+            rows = self.syn1neg[targets]
+            gradients = []
+            for label, f_dot in zip(labels, (rows @ neu1).tolist()):
+                if -MAX_EXP < f_dot < MAX_EXP:
+                    f = EXP_TABLE[int((f_dot + MAX_EXP) * EXP_SCALE)]
+                    gradients.append((label - f) * alpha)
+                else:
+                    gradients.append(0.0)
+            work = np.asarray(gradients, dtype=np.float32) @ rows
+            if not self.cbow_mean:
+                work *= inv_count
+            doc += work
+
+
+def export(model, out, search=True):
+    """Write ``model`` (gensim ``Doc2Vec`` or a runtime) to directory ``out``.
+
+    ``search`` also writes its search matrix; index builds keep their own.
+    """
+    if not isinstance(model, Doc2VecRuntime):
+        model = Doc2VecRuntime.from_model(model)
+    return model.save(out, search=search)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export Doc2Vec for serving.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("export", help="write a gensim model as a runtime")
+    run.add_argument("--model", required=True, help="gensim Doc2Vec model file")
+    run.add_argument("--out", required=True, help="directory to write")
+    args = parser.parse_args()
+
+    from gensim.models.doc2vec import Doc2Vec
+
+    runtime = Doc2VecRuntime.from_model(Doc2Vec.load(args.model))
+    export(runtime, args.out)
+    print(
+        f"exported {len(runtime.index_to_key)} words and {len(runtime.dv)} "
+        f"documents to {args.out}"
+    )
+
+
+if __name__ == "__main__":
+    main()
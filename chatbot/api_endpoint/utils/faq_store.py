@@ -0,0 +1,310 @@
+"""Process-level copy of the faq table, refreshed in the background."""
+
+import json
+import os
+import select
+import sys
+import threading
+import time
+
+import numpy as np
+import psycopg2
+
+FAQ_REFRESH_SECONDS = float(os.getenv("FAQ_REFRESH_SECONDS", "60"))
+FAQ_NOTIFY_CHANNEL = os.getenv("FAQ_NOTIFY_CHANNEL", "faq_changed")
+FAQ_VERSION_COLUMN = os.getenv("FAQ_VERSION_COLUMN", "")
+# Off for tables too large to hold in memory: answers are then read by id.
+FAQ_STORE = os.getenv("FAQ_STORE", "1") != "0"
+
+# Without a version column the fingerprint digests the rows themselves, so
+# polling also sees edits. SQLite has no md5 or ordered string_agg.
+CONTENT_DIGEST = {
+    "%s": (
+        "md5(string_agg(concat_ws('|', id, question, answer), chr(10) "
+        "ORDER BY id)) FROM faq"
+    ),
+    "?": (
+        "group_concat(id || '|' || ifnull(question, '') || '|' || "
+        "ifnull(answer, ''), char(10)) FROM (SELECT * FROM faq ORDER BY id)"
+    ),
+}
+
+
+def connect_db():
+    """Open a connection to the database configured in ``DB_URI``."""
+    return psycopg2.connect(os.getenv("DB_URI"))
+
+
+def placeholder(conn):
+    """Return the DB-API parameter marker for ``conn`` (psycopg2 or sqlite3)."""
+    driver = sys.modules[type(conn).__module__.split(".")[0]]
+    return "?" if driver.paramstyle == "qmark" else "%s"
+
+
+class FAQStore:
+    """Keep the faq table in memory so /ask never scans it per request.
+
+    Rows are held in ``id`` order, which is the order the Doc2Vec tags were
+    trained on. ``answers[i]`` is the answer for document tag ``i``; rows
+    deleted since the last full load are tombstoned as ``None`` so the
+    remaining positions keep lining up with the model. ``by_id`` maps FAQ
+    ids to answers for indexes built by ``utils/index_build.py``.
+
+    ``on_change(rows, deleted, full)`` is called after every change that was
+    applied, outside the lock: ``rows`` are the upserted rows (the whole
+    table when ``full``) and ``deleted`` the tombstoned ids.
+    """
+
+    def __init__(self, connect=connect_db, version_column=FAQ_VERSION_COLUMN):
+        self._connect = connect
+        self.version_column = version_column
+        self.ids = np.empty(0, dtype=np.int64)
+        self.questions = []
+        self.answers = []
+        self.by_id = {}
+        self._positions = {}
+        self._fingerprint = None
+        self._version = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.refreshes = 0
+        self.on_change = None
+
+    def __len__(self):
+        return len(self.answers)
+
+    def _columns(self):
+        columns = "id, question, answer"
+        if self.version_column:
+            columns += f", {self.version_column}"
+        return columns
+
+    def _fingerprint_query(self, marker="%s"):
+        """``(row count, max version)``, or ``(row count, content digest)``."""
+        if self.version_column:
+            return f"SELECT count(*), max({self.version_column}) FROM faq;"
+        return f"SELECT count(*), {CONTENT_DIGEST[marker]};"
+
+    def _read_fingerprint(self, cur):
+        cur.execute(self._fingerprint_query(placeholder(cur.connection)))
+        return tuple(cur.fetchone())
+
+    def load(self):
+        """Read the whole table once and replace the in-memory arrays."""
+        conn = self._connect()
+        try:
+            cur = conn.cursor()
+            cur.execute(f"SELECT {self._columns()} FROM faq ORDER BY id;")
+            rows = cur.fetchall()
+            fingerprint = self._read_fingerprint(cur)
+            cur.close()
+        finally:
+            conn.close()
+        self._replace(rows, fingerprint)
+
+    async def load_async(self, pool):
+        """Like ``load`` but reads through the shared ``DatabasePool``."""
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(f"SELECT {self._columns()} FROM faq ORDER BY id;")
+            fingerprint = tuple(await conn.fetchrow(self._fingerprint_query()))
+        self._replace(rows, fingerprint)
+
+    def _replace(self, rows, fingerprint):
+        with self._lock:
+            self.ids = np.array([row[0] for row in rows], dtype=np.int64)
+            self.questions = [row[1] for row in rows]
+            self.answers = [row[2] for row in rows]
+            self.by_id = {int(row[0]): row[2] for row in rows}
+            self._positions = {int(row[0]): i for i, row in enumerate(rows)}
+            self._fingerprint = fingerprint
+            self._version = fingerprint[1] if self.version_column else None
+            self.refreshes += 1
+        self._changed(rows, (), True)
+
+    def _upsert(self, rows):
+        """Replace changed rows in place and append new ones."""
+        with self._lock:
+            new_ids = []
+            for row in rows:
+                faq_id, question, answer = int(row[0]), row[1], row[2]
+                self.by_id[faq_id] = answer
+                position = self._positions.get(faq_id)
+                if position is None:
+                    self._positions[faq_id] = len(self.answers)
+                    self.questions.append(question)
+                    self.answers.append(answer)
+                    new_ids.append(faq_id)
+                else:
+                    self.questions[position] = question
+                    self.answers[position] = answer
+            if new_ids:
+                self.ids = np.concatenate([self.ids, np.array(new_ids, np.int64)])
+        self._changed(rows, (), False)
+
+    def _tombstone(self, faq_id):
+        with self._lock:
+            self.by_id.pop(faq_id, None)
+            position = self._positions.get(faq_id)
+            if position is not None:
+                self.answers[position] = None
+        self._changed((), (faq_id,), False)
+
+    def _changed(self, rows, deleted, full):
+        if self.on_change is not None and (rows or deleted or full):
+            self.on_change(rows, deleted, full)
+
+    def rows(self):
+        """Snapshot of the live ``(id, question)`` rows."""
+        with self._lock:
+            return [
+                (int(faq_id), question)
+                for faq_id, question, answer in zip(
+                    self.ids, self.questions, self.answers
+                )
+                if answer is not None
+            ]
+
+    def refresh(self):
+        """Apply changes made since the last load; return True if any were found.
+
+        With ``version_column`` set (e.g. ``updated_at``) only rows newer than
+        the last seen version are fetched. Without it any insert, edit or
+        delete changes the content digest and the table is reloaded in full,
+        as it is when the row count shows deletes.
+        """
+        conn = self._connect()
+        try:
+            cur = conn.cursor()
+            fingerprint = self._read_fingerprint(cur)
+            if fingerprint == self._fingerprint:
+                cur.close()
+                return False
+
+            if not self.version_column or self._version is None:
+                cur.close()
+                conn.close()
+                conn = None
+                self.load()
+                return True
+
+            cur.execute(
+                f"SELECT {self._columns()} FROM faq "
+                f"WHERE {self.version_column} > {placeholder(conn)} ORDER BY id;",
+                (self._version,),
+            )
+            rows = cur.fetchall()
+            cur.close()
+        finally:
+            if conn is not None:
+                conn.close()
+
+        self._upsert(rows)
+        live = sum(answer is not None for answer in self.answers)
+        with self._lock:
+            self._fingerprint = fingerprint
+            self._version = fingerprint[1]
+            self.refreshes += 1
+        if live != fingerprint[0]:
+            # Rows were deleted; only a full load can notice which ones.
+            self.load()
+        return True
+
+    def apply_notification(self, conn, payload):
+        """Apply one ``pg_notify`` payload such as ``{"op": "UPDATE", "id": 3}``."""
+        try:
+            event = json.loads(payload)
+            op, faq_id = event["op"].upper(), int(event["id"])
+        except (ValueError, KeyError, TypeError):
+            self.refresh()
+            return
+
+        cur = conn.cursor()
+        # Read before the row: a change committed in between moves the
+        # table past this fingerprint, so the next poll still sees it.
+        fingerprint = self._read_fingerprint(cur)
+        if op == "DELETE":
+            cur.close()
+            self._tombstone(faq_id)
+        else:
+            cur.execute(
+                f"SELECT {self._columns()} FROM faq WHERE id = {placeholder(conn)};",
+                (faq_id,),
+            )
+            rows = cur.fetchall()
+            cur.close()
+            self._upsert(rows)
+        # Otherwise the next poll sees a changed table and reloads it all.
+        with self._lock:
+            self._fingerprint = fingerprint
+            if self.version_column:
+                self._version = fingerprint[1]
+
+    def stats(self):
+        """Store metrics for the /metrics endpoint."""
+        return {
+            "rows": len(self.answers),
+            "tombstones": sum(answer is None for answer in self.answers),
+            "refreshes": self.refreshes,
+        }
+
+    def _poll(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.refresh()
+            except Exception:
+                # A transient DB error must not kill the refresher thread.
+                time.sleep(min(interval, 5))
+
+    def _listen(self, channel, interval):
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = self._connect()
+                conn.autocommit = True
+                cur = conn.cursor()
+                cur.execute(f"LISTEN {channel};")
+                # Catch anything that changed while we were not listening.
+                self.refresh()
+                last_refresh = time.monotonic()
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 1) == ([], [], []):
+                        if time.monotonic() - last_refresh >= interval:
+                            self.refresh()
+                            last_refresh = time.monotonic()
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        self.apply_notification(conn, notify.payload)
+            except Exception:
+                time.sleep(min(interval, 5))
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def start(self, interval=FAQ_REFRESH_SECONDS, channel=FAQ_NOTIFY_CHANNEL):
+        """Keep the store fresh from a daemon thread.
+
+        With a ``channel`` the thread LISTENs for the notifications sent by
+        ``chatbot/sql/faq_notify.sql`` and polls every ``interval`` seconds as
+        a safety net; without one it only polls.
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        if channel:
+            target, args = self._listen, (channel, interval)
+        else:
+            target, args = self._poll, (interval,)
+        self._thread = threading.Thread(
+            target=target, args=args, name="faq-store", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background refresher."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
@@ -0,0 +1,550 @@
+"""Versioned offline builds of the FAQ index, hot-swapped by running servers.
+
+Build a version from the faq table, check it, and roll back if needed:
+
+    python -m utils.index_build build --out index            # existing model
+    python -m utils.index_build build --out index --train    # retrain Doc2Vec
+    python -m utils.index_build compact --index index        # fold in changes
+    python -m utils.index_build verify --index index
+    python -m utils.index_build publish --index index --version <version>
+
+Each version is a directory ``<out>/<version>/`` holding the Doc2Vec model
+(gensim's file and the NumPy runtime export servers load, ``runtime/``),
+the normalized document vectors (``vectors.npy``), the FAQ id of every row
+(``ids.npy``), a digest of every question (``hashes.npy``) and ``meta.json``
+with a checksum of those files. Search tags are FAQ ids rather than row
+positions, so a version stays valid however the table is reordered.
+``<out>/CURRENT`` names the live version; servers started with ``INDEX_DIR``
+poll it and swap to a new version in place. Between builds, servers apply
+row changes themselves (``utils/live_index.py``); ``compact`` writes them
+into a new version, inferring only the rows whose question changed.
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+from utils.doc2vec_runtime import Doc2VecRuntime, export
+from utils.lexical_index import LEXICAL_INDEX, LexicalIndex, answering_id
+from utils.live_index import LiveIndex, question_hash
+from utils.vector_search import VectorSearch, normalize
+
+INDEX_DIR = os.getenv("INDEX_DIR", "")
+INDEX_POLL_SECONDS = float(os.getenv("INDEX_POLL_SECONDS", "10"))
+INDEX_KEEP = int(os.getenv("INDEX_KEEP", "3"))
+FORMAT_VERSION = 1
+CURRENT = "CURRENT"
+MODEL_FILE = "doc2vec.model"
+RUNTIME_DIR = "runtime"
+ANN_DIR = "ann"
+
+# Hyperparameters of utils/model_training.ipynb.
+TRAIN_ARGS = {"vector_size": 100, "window": 2, "min_count": 1, "epochs": 1000}
+
+
+# NLTK is imported, and its data read, by the first tokenize() call.
+word_tokenize = None
+TOKENIZER = None
+
+
+def load_tokenizer():
+    """Pick NLTK's tokenizer, without downloading anything.
+
+    The model was trained with ``word_tokenize``, which splits sentences
+    with the punkt data installed in the image (see the Dockerfile). Where
+    that data is missing the same word tokenizer runs on the whole text
+    instead of failing; it only differs on multi-sentence questions.
+    """
+    global word_tokenize, TOKENIZER
+    from functools import partial
+
+    from nltk.tokenize import word_tokenize as nltk_word_tokenize
+
+    try:
+        nltk_word_tokenize("punkt. check")
+    except LookupError:
+        TOKENIZER = "treebank"
+        word_tokenize = partial(nltk_word_tokenize, preserve_line=True)
+    else:
+        TOKENIZER = "punkt"
+        word_tokenize = nltk_word_tokenize
+    return TOKENIZER
+
+
+def tokenize(text):
+    """Tokenize a question the way the model was trained."""
+    if word_tokenize is None:
+        load_tokenizer()
+    return word_tokenize(text.lower())
+
+
+def read_faq(conn):
+    """Return ``(id, question)`` rows of the faq table in id order."""
+    cur = conn.cursor()
+    cur.execute("SELECT id, question FROM faq ORDER BY id;")
+    rows = [(int(row[0]), row[1]) for row in cur.fetchall()]
+    cur.close()
+    return rows
+
+
+def train_model(rows, tokenize=tokenize, workers=4, **train_args):
+    """Train a Doc2Vec model whose document tags are the FAQ ids."""
+    from gensim.models.doc2vec import Doc2Vec, TaggedDocument
+
+    documents = [
+        TaggedDocument(words=tokenize(question), tags=[str(faq_id)])
+        for faq_id, question in rows
+    ]
+    model = Doc2Vec(workers=workers, **{**TRAIN_ARGS, **train_args})
+    model.build_vocab(documents)
+    model.train(documents, total_examples=model.corpus_count, epochs=model.epochs)
+    return model
+
+
+def checksum(path):
+    """sha256 over the names and bytes of every file of a version but meta.json."""
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            full = os.path.join(root, name)
+            rel = os.path.relpath(full, path)
+            if rel == "meta.json":
+                continue
+            digest.update(rel.encode() + b"\0")
+            with open(full, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+    return digest.hexdigest()
+
+
+def reuse_vectors(previous, ids, hashes):
+    """Vectors of ``previous`` for rows whose question is unchanged.
+
+    Returns ``{row: vector}`` keyed by position in ``ids``.
+    """
+    if not os.path.exists(os.path.join(previous, "hashes.npy")):
+        return {}
+    old_ids = np.load(os.path.join(previous, "ids.npy"))
+    old_hashes = np.load(os.path.join(previous, "hashes.npy"))
+    old_vectors = np.load(os.path.join(previous, "vectors.npy"), mmap_mode="r")
+    old_rows = {(i, h): row for row, (i, h) in enumerate(zip(old_ids, old_hashes))}
+    reused = {}
+    for row, key in enumerate(zip(ids.tolist(), hashes.tolist())):
+        old_row = old_rows.get(key)
+        if old_row is not None:
+            reused[row] = old_vectors[old_row]
+    return reused
+
+
+def build(
+    rows,
+    out,
+    model=None,
+    tokenize=tokenize,
+    nlist=None,
+    previous=None,
+    **train_args,
+):
+    """Write a new index version for ``rows`` under ``out``; return its name.
+
+    With a ``model`` the question vectors are inferred with it; without one
+    a new model is trained and its document vectors are used. ``previous``
+    is a version built with the same ``model`` whose vectors are reused for
+    unchanged questions, so only new and edited rows are inferred. The
+    version is written to a temp directory and renamed into place, and is
+    not served until ``publish`` points ``CURRENT`` at it.
+    """
+    if not rows:
+        raise ValueError("the faq table is empty")
+    ids = np.array([faq_id for faq_id, _ in rows], dtype=np.int64)
+    hashes = np.array([question_hash(q) for _, q in rows], dtype=np.uint64)
+    inferred = len(rows)
+    if model is None:
+        mode = "train"
+        model = train_model(rows, tokenize=tokenize, **train_args)
+        vectors = np.stack([model.dv[str(faq_id)] for faq_id in ids])
+    else:
+        mode = "infer"
+        reused = reuse_vectors(previous, ids, hashes) if previous else {}
+        inferred -= len(reused)
+        vectors = np.stack(
+            [
+                reused[row] if row in reused else model.infer_vector(tokenize(q))
+                for row, (_, q) in enumerate(rows)
+            ]
+        )
+    search = VectorSearch(normalize(vectors), ids)
+
+    os.makedirs(out, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=".build-", dir=out)
+    try:
+        if not isinstance(model, Doc2VecRuntime):
+            model.save(os.path.join(tmp, MODEL_FILE), sep_limit=0)
+        export(model, os.path.join(tmp, RUNTIME_DIR), search=False)
+        np.save(os.path.join(tmp, "vectors.npy"), search.matrix)
+        np.save(os.path.join(tmp, "ids.npy"), ids)
+        np.save(os.path.join(tmp, "hashes.npy"), hashes)
+        if nlist:
+            from utils.ann_index import IVFIndex
+
+            IVFIndex.build(search.matrix, ids, nlist=nlist).save(
+                os.path.join(tmp, ANN_DIR)
+            )
+        digest = checksum(tmp)
+        version = f"{time.strftime('%Y%m%dT%H%M%S')}-{digest[:8]}"
+        meta = {
+            "format": FORMAT_VERSION,
+            "version": version,
+            "created": time.time(),
+            "mode": mode,
+            "count": len(ids),
+            "inferred": inferred,
+            "dim": int(search.matrix.shape[1]),
+            "keys": "faq_id",
+            "nlist": nlist,
+            "checksum": digest,
+        }
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+        try:
+            os.replace(tmp, os.path.join(out, version))
+        except OSError:
+            # Same content built within the same second: already there.
+            if not os.path.isdir(os.path.join(out, version)):
+                raise
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return version
+
+
+def load_model(path):
+    """The model of a version: its NumPy runtime, or gensim for older builds."""
+    runtime = os.path.join(path, RUNTIME_DIR)
+    if os.path.isdir(runtime):
+        return Doc2VecRuntime.load(runtime)
+    from gensim.models.doc2vec import Doc2Vec
+
+    return Doc2Vec.load(os.path.join(path, MODEL_FILE), mmap="r")
+
+
+def publish(out, version):
+    """Point ``<out>/CURRENT`` at ``version`` with an atomic rename."""
+    if not os.path.isdir(os.path.join(out, version)):
+        raise FileNotFoundError(f"no index version {version} in {out}")
+    tmp = os.path.join(out, f".{CURRENT}.{os.getpid()}")
+    with open(tmp, "w") as f:
+        f.write(version + "\n")
+    os.replace(tmp, os.path.join(out, CURRENT))
+
+
+def current_version(out):
+    """Name of the published version, or None."""
+    try:
+        with open(os.path.join(out, CURRENT)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def prune(out, keep=INDEX_KEEP):
+    """Remove all but the newest ``keep`` versions; never the current one."""
+    current = current_version(out)
+    versions = sorted(
+        name
+        for name in os.listdir(out)
+        if not name.startswith(".")
+        and os.path.isfile(os.path.join(out, name, "meta.json"))
+    )
+    for name in versions[:-keep] if keep else versions:
+        if name != current:
+            shutil.rmtree(os.path.join(out, name), ignore_errors=True)
+
+
+class ServingIndex:
+    """One consistent model, search matrix and tag meaning, swapped as a unit.
+
+    Requests take a single reference to the current ``ServingIndex`` and use
+    it throughout, so a swap never mixes two versions within a request and
+    the old version stays alive until its last request finishes. ``by_id``
+    tells whether search tags are FAQ ids or row positions (the committed
+    notebook model). Indexes served by id also get an empty ``lexical``
+    index of the questions, which the ``IndexUpdater`` fills.
+    """
+
+    def __init__(self, model, search, version, by_id=False, meta=None):
+        self.model = model
+        self.search = search
+        self.version = version
+        self.by_id = by_id
+        self.meta = meta or {}
+        self.lexical = LexicalIndex() if by_id and LEXICAL_INDEX else None
+
+    @classmethod
+    def from_positions(cls, model, search, ids, version="model", hashes=None):
+        """Serve a positionally tagged model, like the notebook's, by FAQ id.
+
+        ``ids[i]`` is the FAQ id of document tag ``i``, read once at startup;
+        from then on answers are looked up by id, so later deletes and
+        reorders cannot shift them. Tags past the end of ``ids`` map to -1,
+        which has no answer. ``hashes[i]`` is the ``question_hash`` of that
+        row's question; the search is wrapped in a ``LiveIndex`` so rows
+        changed since, or without a hash, are applied while serving.
+        """
+        lookup = np.append(np.asarray(ids, dtype=np.int64), -1)
+        tags = np.asarray(search.tags)
+        search = copy.copy(search)
+        search.tags = lookup[np.where(tags < len(ids), tags, -1)]
+        known = np.unique(tags[tags < len(ids)])
+        if hashes is not None:
+            hashes = np.asarray(hashes, dtype=np.uint64)[known]
+        search = LiveIndex(search, lookup[known], hashes)
+        return cls(model, search, version, by_id=True)
+
+    @classmethod
+    def from_rows(cls, model, search, rows, version="model"):
+        """``from_positions`` for the notebook model, from ``(id, question)`` rows.
+
+        The notebook trains on ``dict(zip(questions, answers))``: tag ``i`` is
+        the ``i``-th distinct question in id order, and a repeated question
+        answers with its last row (``answering_id``). ``rows`` must be in id
+        order.
+        """
+        repeats = {}
+        for faq_id, question in rows:
+            repeats.setdefault(question, []).append(int(faq_id))
+        return cls.from_positions(
+            model,
+            search,
+            [answering_id(ids) for ids in repeats.values()],
+            version,
+            hashes=[question_hash(question) for question in repeats],
+        )
+
+    @classmethod
+    def load(cls, path, verify=True):
+        """Open a built version, memory-mapped read-only.
+
+        The search is wrapped in a ``LiveIndex`` so rows changed after the
+        build can be applied while serving.
+        """
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported index format in {path}: {meta}")
+        if verify and checksum(path) != meta["checksum"]:
+            raise ValueError(f"Checksum mismatch in {path}")
+        if os.path.isdir(os.path.join(path, ANN_DIR)):
+            from utils.ann_index import IVFIndex
+
+            search = IVFIndex.load(os.path.join(path, ANN_DIR))
+        else:
+            search = VectorSearch(
+                np.load(os.path.join(path, "vectors.npy"), mmap_mode="r"),
+                np.load(os.path.join(path, "ids.npy")),
+            )
+        ids = np.load(os.path.join(path, "ids.npy"))
+        hashes = None
+        if os.path.exists(os.path.join(path, "hashes.npy")):
+            hashes = np.load(os.path.join(path, "hashes.npy"))
+        model = load_model(path)
+        search = LiveIndex(search, ids, hashes)
+        return cls(model, search, meta["version"], by_id=True, meta=meta)
+
+    @classmethod
+    def load_current(cls, out, verify=True):
+        """Open the version ``<out>/CURRENT`` points at."""
+        version = current_version(out)
+        if version is None:
+            raise FileNotFoundError(f"no published index in {out}")
+        return cls.load(os.path.join(out, version), verify=verify)
+
+
+class IndexWatcher:
+    """Poll ``<directory>/CURRENT`` and hand new versions to ``on_swap``.
+
+    Loading and checksum verification happen on the watcher thread; a
+    version that fails to load is reported in ``stats`` and skipped, and
+    the server keeps serving the version it has.
+    """
+
+    def __init__(self, directory, on_swap, version=None):
+        self.directory = directory
+        self.on_swap = on_swap
+        self.version = version
+        self.swaps = 0
+        self.failures = 0
+        self.error = None
+        self._failed = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def check(self):
+        """Swap to the published version if it changed; return True on a swap."""
+        version = current_version(self.directory)
+        if version is None or version in (self.version, self._failed):
+            return False
+        try:
+            index = ServingIndex.load(os.path.join(self.directory, version))
+        except Exception as e:
+            self._failed = version
+            self.failures += 1
+            self.error = f"{version}: {e}"
+            return False
+        self.on_swap(index)
+        self.version = version
+        self.swaps += 1
+        return True
+
+    def _poll(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.check()
+            except Exception:
+                # A transient filesystem error must not kill the watcher.
+                pass
+
+    def start(self, interval=INDEX_POLL_SECONDS):
+        """Keep checking from a daemon thread every ``interval`` seconds."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._poll, args=(interval,), name="index-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background watcher."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self):
+        """Index metrics for the /metrics endpoint."""
+        return {
+            "version": self.version,
+            "swaps": self.swaps,
+            "failures": self.failures,
+            "error": self.error,
+        }
+
+
+def compact(out, connect, keep=INDEX_KEEP, tokenize=tokenize):
+    """Build and publish a version from the live version plus table changes.
+
+    Uses the live version's model and reuses its vectors, so the cost is
+    one inference per new or edited row plus a copy of the matrix.
+    """
+    current = current_version(out)
+    if current is None:
+        raise FileNotFoundError(f"no published index in {out}")
+    previous = os.path.join(out, current)
+    conn = connect()
+    try:
+        rows = read_faq(conn)
+    finally:
+        conn.close()
+    start = time.perf_counter()
+    model = load_model(previous)
+    with open(os.path.join(previous, "meta.json")) as f:
+        nlist = json.load(f).get("nlist")
+    version = build(
+        rows, out, model=model, tokenize=tokenize, nlist=nlist, previous=previous
+    )
+    with open(os.path.join(out, version, "meta.json")) as f:
+        inferred = json.load(f)["inferred"]
+    publish(out, version)
+    prune(out, keep)
+    print(
+        f"compacted {current} into {version}: {len(rows)} rows, "
+        f"{inferred} inferred in {time.perf_counter() - start:.1f}s"
+    )
+    return version
+
+
+def main():
+    from utils.faq_store import connect_db
+    from utils.model_registry import MODEL_PATH, prepare, registry
+
+    parser = argparse.ArgumentParser(description="Build or publish FAQ indexes.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    make = sub.add_parser("build")
+    make.add_argument("--out", default=INDEX_DIR or "index")
+    make.add_argument("--model", default=MODEL_PATH, help="model to infer with")
+    make.add_argument("--train", action="store_true", help="retrain Doc2Vec")
+    make.add_argument("--epochs", type=int, default=TRAIN_ARGS["epochs"])
+    make.add_argument("--vector-size", type=int, default=TRAIN_ARGS["vector_size"])
+    make.add_argument("--nlist", type=int, default=None, help="also build an IVF")
+    make.add_argument("--keep", type=int, default=INDEX_KEEP)
+    make.add_argument("--no-publish", action="store_true")
+    check = sub.add_parser("verify")
+    check.add_argument("--index", default=INDEX_DIR or "index")
+    check.add_argument("--version", default=None)
+    fold = sub.add_parser("compact")
+    fold.add_argument("--index", default=INDEX_DIR or "index")
+    fold.add_argument("--keep", type=int, default=INDEX_KEEP)
+    fold.add_argument("--every", type=float, default=0, help="repeat every N s")
+    point = sub.add_parser("publish")
+    point.add_argument("--index", default=INDEX_DIR or "index")
+    point.add_argument("--version", required=True)
+    ready = sub.add_parser("prepare", help="write a model's memory-mapped files")
+    ready.add_argument("--model", default=MODEL_PATH)
+    args = parser.parse_args()
+
+    if args.command == "prepare":
+        print(f"search matrix at {prepare(args.model)}")
+        return
+
+    if args.command == "verify":
+        version = args.version or current_version(args.index)
+        index = ServingIndex.load(os.path.join(args.index, version))
+        print(f"{version}: ok, {index.meta['count']} vectors ({index.meta['mode']})")
+        return
+    if args.command == "publish":
+        publish(args.index, args.version)
+        print(f"published {args.version}")
+        return
+
+    if args.command == "compact":
+        while True:
+            compact(args.index, connect_db, args.keep)
+            if not args.every:
+                return
+            time.sleep(args.every)
+
+    conn = connect_db()
+    try:
+        rows = read_faq(conn)
+    finally:
+        conn.close()
+    start = time.perf_counter()
+    if args.train:
+        version = build(
+            rows,
+            args.out,
+            nlist=args.nlist,
+            epochs=args.epochs,
+            vector_size=args.vector_size,
+        )
+    else:
+        version = build(
+            rows, args.out, model=registry.load(args.model), nlist=args.nlist
+        )
+    print(f"built {version}: {len(rows)} rows in {time.perf_counter() - start:.1f}s")
+    if not args.no_publish:
+        publish(args.out, version)
+        prune(args.out, args.keep)
+        print(f"published {version}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Bounded executor for the CPU-bound part of a request.
+
+Doc2Vec inference and vector search run here, off the event loop, while
+waiting on the database or the LLM holds no thread at all; the number of
+requests in flight is no longer tied to the number of threads.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.db_pool import percentile
+
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", str(os.cpu_count() or 1)))
+
+
+class InferencePool:
+    """Run blocking calls on ``workers`` threads and await their results."""
+
+    def __init__(self, workers=INFERENCE_WORKERS):
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="inference"
+        )
+        self.pending = 0
+        self.completed = 0
+        self._queue_ms = deque(maxlen=1024)
+
+    async def run(self, fn, *args):
+        """Call ``fn(*args)`` on a worker thread without blocking the loop."""
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter()
+
+        def call():
+            self._queue_ms.append((time.perf_counter() - submitted) * 1000)
+            return fn(*args)
+
+        self.pending += 1
+        try:
+            return await loop.run_in_executor(self._executor, call)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def shutdown(self):
+        """Stop the workers; queued calls that have not started are dropped."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        """Executor metrics for the /metrics endpoint."""
+        samples = list(self._queue_ms)
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "completed": self.completed,
+            "queue_ms_p50": percentile(samples, 0.5),
+            "queue_ms_p99": percentile(samples, 0.99),
+        }
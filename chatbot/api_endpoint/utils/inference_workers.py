@@ -0,0 +1,141 @@
+"""Doc2Vec inference in worker processes.
+
+The NumPy runtime's inference is a Python loop over small array ops, so
+threads serialize on the GIL and one process tops out at one core. With
+``INFERENCE_PROCESSES`` set, ``vector_cache`` sends its misses here: a
+batch is split over the worker processes, and the calling thread waits
+for the vectors without holding the GIL.
+
+Workers open the model by its runtime directory. The arrays there (and
+the document-vector matrix the parent searches) are read-only memory
+maps, so the page cache holds one copy that every process shares; no
+worker copies the model and nothing but tokens and vectors is pickled.
+Search stays in the parent, where live FAQ changes are applied, and is
+one BLAS call that already releases the GIL.
+
+A worker that dies (e.g. OOM-killed) breaks the whole pool. The pool is
+then rebuilt once and the batch retried; if that fails too, the batch is
+inferred in the calling thread.
+
+``chatbot/benchmarks/bench_inference_scaling.py`` measures throughput by
+process count.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.doc2vec_runtime import Doc2VecRuntime
+
+INFERENCE_PROCESSES = int(os.getenv("INFERENCE_PROCESSES", "0"))
+
+# Worker side: the model of the last runtime directory seen.
+_models = {}
+
+
+def _ready():
+    pass
+
+
+def _infer(path, token_lists, settings):
+    model = _models.get(path)
+    if model is None:
+        # Index versions are swapped, not served side by side.
+        _models.clear()
+        model = _models[path] = Doc2VecRuntime.load(path)
+    return infer_all(model, token_lists, settings)
+
+
+def infer_all(model, token_lists, settings):
+    """Infer each token list in turn; a failed one gets its exception."""
+    vectors = []
+    for tokens in token_lists:
+        try:
+            vectors.append(model.infer_vector(list(tokens), **settings))
+        except Exception as e:
+            vectors.append(e)
+    return vectors
+
+
+class InferenceWorkers:
+    """A pool of ``processes`` inference workers shared by all request threads.
+
+    Workers are forked from a clean fork server, not from the serving
+    process and its threads, and are all started up front. Models not
+    loaded from a runtime directory (gensim, or built in memory) have no
+    path to open and are inferred in the calling thread.
+    """
+
+    def __init__(self, processes=INFERENCE_PROCESSES):
+        self.processes = processes
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.batches = 0
+        self.local = 0
+        self.restarts = 0
+        self._executor = self._start()
+
+    def _start(self):
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        executor = ProcessPoolExecutor(max_workers=self.processes, mp_context=context)
+        # Start the workers now rather than on the first request.
+        for job in [executor.submit(_ready) for _ in range(self.processes)]:
+            job.result()
+        return executor
+
+    def _restart(self, broken):
+        """Replace the pool ``broken`` unless another thread already did."""
+        with self._lock:
+            if self._executor is broken:
+                self._executor = self._start()
+                self.restarts += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def infer_many(self, model, token_lists, settings):
+        """Vectors of ``token_lists`` in order; a failed one is its exception."""
+        path = getattr(model, "path", None)
+        if not token_lists:
+            return []
+        if path is None:
+            with self._lock:
+                self.local += len(token_lists)
+            return infer_all(model, token_lists, settings)
+        for retry in (True, False):
+            executor = self._executor
+            try:
+                return self._run(executor, path, token_lists, settings)
+            except BrokenProcessPool:
+                if retry:
+                    self._restart(executor)
+        with self._lock:
+            self.local += len(token_lists)
+        return infer_all(model, token_lists, settings)
+
+    def _run(self, executor, path, token_lists, settings):
+        # Contiguous slices, one per worker at most.
+        size = -(-len(token_lists) // self.processes)
+        jobs = [
+            executor.submit(_infer, path, token_lists[i : i + size], settings)
+            for i in range(0, len(token_lists), size)
+        ]
+        with self._lock:
+            self.submitted += len(token_lists)
+            self.batches += len(jobs)
+        return [vector for job in jobs for vector in job.result()]
+
+    def shutdown(self):
+        """Stop the workers once the calls in flight are answered."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self):
+        """Worker metrics for the /metrics endpoint."""
+        return {
+            "processes": self.processes,
+            "submitted": self.submitted,
+            "batches": self.batches,
+            "local": self.local,
+            "restarts": self.restarts,
+        }
@@ -0,0 +1,262 @@
+"""Exact and lexical matching of queries against the FAQ questions.
+
+Checked before Doc2Vec inference, in order:
+
+- exact: the normalized question text (``normalize_text``), a dict lookup;
+- lexical: BM25 over an inverted index of question terms. The best
+  question is taken when its IDF-weighted term overlap with the query is
+  at least ``LEXICAL_MIN_SCORE``, so a reworded or truncated copy of a row
+  is answered without inference.
+
+Both give results shaped like the vector search's, ``[(faq id, score)]``
+with the score in [0, 1], so answers go through ``most_sim`` unchanged.
+When neither is confident the vector search takes ``LEXICAL_RERANK_K``
+results and BM25, scoring only those, picks among the ones within
+``LEXICAL_RERANK_MARGIN`` cosine of the best.
+
+The index holds FAQ ids, so it belongs to indexes served by id; the
+``IndexUpdater`` keeps it in step with the faq table like the vectors.
+"""
+
+import math
+import os
+import threading
+from collections import Counter, deque
+
+from utils.db_pool import percentile
+from utils.query_cache import normalize_text
+
+# Off: every query is inferred, as before.
+LEXICAL_INDEX = os.getenv("LEXICAL_INDEX", "1") != "0"
+LEXICAL_MIN_SCORE = float(os.getenv("LEXICAL_MIN_SCORE", "0.8"))
+LEXICAL_RERANK_K = int(os.getenv("LEXICAL_RERANK_K", "3"))
+LEXICAL_RERANK_MARGIN = float(os.getenv("LEXICAL_RERANK_MARGIN", "0.02"))
+
+# Okapi BM25 parameters.
+K1 = 1.2
+B = 0.75
+
+
+def answering_id(ids):
+    """The FAQ id a question repeated over the rows ``ids`` answers with.
+
+    Its last row, as in the notebook's ``dict(zip(questions, answers))``;
+    ``ServingIndex.from_rows`` maps the vector tags the same way.
+    """
+    return max(ids)
+
+
+def terms(text):
+    """The terms of a question or query, as ``normalize_text`` splits it."""
+    return normalize_text(text).split()
+
+
+class LexicalIndex:
+    """Normalized-question table plus an inverted index of question terms.
+
+    ``match`` only walks the postings of the query's rarest terms: a row
+    missing terms worth more than ``1 - min_score`` of the query's IDF
+    cannot reach ``min_score``, so common words such as "how" never make
+    a row a candidate on their own.
+    """
+
+    def __init__(
+        self,
+        min_score=LEXICAL_MIN_SCORE,
+        rerank_k=LEXICAL_RERANK_K,
+        rerank_margin=LEXICAL_RERANK_MARGIN,
+    ):
+        self.min_score = min_score
+        self.rerank_k = max(1, rerank_k)
+        self.rerank_margin = rerank_margin
+        self._lock = threading.Lock()
+        self._keys = {}
+        self._exact = {}
+        self._terms = {}
+        self._postings = {}
+        self._total_length = 0
+        self.exact_hits = 0
+        self.lexical_hits = 0
+        self.misses = 0
+        self.reranked = 0
+
+    def __len__(self):
+        return len(self._keys)
+
+    def update(self, rows=(), deleted=(), full=False):
+        """Index ``(id, question, ...)`` rows and drop ``deleted`` ids.
+
+        With ``full=True`` the rows are the whole table and ids missing
+        from it are dropped. Returns how many rows changed.
+        """
+        changed = 0
+        with self._lock:
+            for row in rows:
+                faq_id, key = int(row[0]), normalize_text(row[1] or "")
+                if self._keys.get(faq_id) != key:
+                    self._remove(faq_id)
+                    self._add(faq_id, key)
+                    changed += 1
+            if full:
+                deleted = set(self._keys) - {int(row[0]) for row in rows}
+            for faq_id in deleted:
+                changed += self._remove(int(faq_id))
+        return changed
+
+    def _add(self, faq_id, key):
+        self._keys[faq_id] = key
+        self._exact.setdefault(key, set()).add(faq_id)
+        counts = Counter(key.split())
+        self._terms[faq_id] = counts
+        self._total_length += sum(counts.values())
+        for term, tf in counts.items():
+            self._postings.setdefault(term, {})[faq_id] = tf
+
+    def _remove(self, faq_id):
+        key = self._keys.pop(faq_id, None)
+        if key is None:
+            return False
+        same = self._exact[key]
+        same.discard(faq_id)
+        if not same:
+            del self._exact[key]
+        counts = self._terms.pop(faq_id)
+        self._total_length -= sum(counts.values())
+        for term in counts:
+            postings = self._postings[term]
+            del postings[faq_id]
+            if not postings:
+                del self._postings[term]
+        return True
+
+    def _idf(self, term):
+        df = len(self._postings.get(term, ()))
+        return math.log(1 + (len(self._keys) - df + 0.5) / (df + 0.5))
+
+    def _bm25(self, query, ids):
+        """BM25 of each row in ``ids`` for the ``query`` terms."""
+        average = self._total_length / len(self._keys)
+        weights = [(term, self._idf(term)) for term in query]
+        scores = {}
+        for faq_id in ids:
+            counts = self._terms.get(faq_id)
+            if counts is None:
+                continue
+            norm = K1 * (1 - B + B * sum(counts.values()) / average)
+            scores[faq_id] = sum(
+                idf * counts[term] * (K1 + 1) / (counts[term] + norm)
+                for term, idf in weights
+                if term in counts
+            )
+        return scores
+
+    def _overlap(self, query, faq_id):
+        """IDF-weighted Jaccard of the query terms and the row's, in [0, 1]."""
+        row = self._terms[faq_id].keys()
+        union = sum(self._idf(term) for term in query | row)
+        shared = sum(self._idf(term) for term in query & row)
+        return shared / union if union else 0.0
+
+    def _candidates(self, query):
+        """Rows holding one of the query's rarest terms (see the class doc)."""
+        weights = sorted(((self._idf(t), t) for t in query), reverse=True)
+        budget = (1 - self.min_score) * sum(idf for idf, _ in weights)
+        ids = set()
+        for idf, term in weights:
+            ids.update(self._postings.get(term, ()))
+            budget -= idf
+            if budget < 0:
+                break
+        return ids
+
+    def match(self, query):
+        """``(path, [(faq id, score)])`` for a confident match, else None.
+
+        ``path`` is ``"exact"`` or ``"lexical"``.
+        """
+        key = normalize_text(query)
+        with self._lock:
+            same = self._exact.get(key)
+            if same:
+                self.exact_hits += 1
+                return "exact", [(answering_id(same), 1.0)]
+            words = set(key.split())
+            if words and self._keys:
+                scores = self._bm25(words, self._candidates(words))
+                if scores:
+                    best = max(scores, key=lambda faq_id: (scores[faq_id], -faq_id))
+                    confidence = self._overlap(words, best)
+                    if confidence >= self.min_score:
+                        self.lexical_hits += 1
+                        return "lexical", [(best, confidence)]
+            self.misses += 1
+        return None
+
+    def rerank(self, query, pairs):
+        """Vector search ``pairs``, best first, with near ties broken by BM25.
+
+        Of the pairs within ``rerank_margin`` of the best score, the one
+        with the highest BM25 comes first; without any shared term the
+        order is kept.
+        """
+        if len(pairs) < 2:
+            return pairs
+        close = [p for p in pairs if p[1] >= pairs[0][1] - self.rerank_margin]
+        with self._lock:
+            if not self._keys:
+                return pairs
+            scores = self._bm25(set(terms(query)), [int(p[0]) for p in close])
+        best = max(close, key=lambda p: scores.get(int(p[0]), 0.0))
+        if scores.get(int(best[0]), 0.0) <= scores.get(int(pairs[0][0]), 0.0):
+            return pairs
+        self.reranked += 1
+        return [best] + [p for p in pairs if p is not best]
+
+    def stats(self):
+        """Lexical index metrics for the /metrics endpoint."""
+        lookups = self.exact_hits + self.lexical_hits + self.misses
+        return {
+            "rows": len(self._keys),
+            "terms": len(self._postings),
+            "exact_hits": self.exact_hits,
+            "lexical_hits": self.lexical_hits,
+            "misses": self.misses,
+            "hit_ratio": (
+                (self.exact_hits + self.lexical_hits) / lookups if lookups else 0.0
+            ),
+            "reranked": self.reranked,
+        }
+
+
+class MatchPaths:
+    """How each query got its search result, and how long that took.
+
+    Paths are ``cache`` (the query cache's exact tier), ``exact``,
+    ``lexical`` and ``vector`` (Doc2Vec inference, including its vector
+    cache tier).
+    """
+
+    PATHS = ("cache", "exact", "lexical", "vector")
+
+    def __init__(self, window=1024):
+        self.counts = Counter()
+        self._ms = {path: deque(maxlen=window) for path in self.PATHS}
+
+    def observe(self, path, ms):
+        """Count one query answered by ``path`` in ``ms`` milliseconds."""
+        self.counts[path] += 1
+        self._ms[path].append(ms)
+
+    def stats(self):
+        """Hit ratio and latency percentiles per path for /metrics."""
+        total = sum(self.counts.values())
+        stats = {}
+        for path in self.PATHS:
+            samples = list(self._ms[path])
+            stats[path] = {
+                "count": self.counts[path],
+                "ratio": self.counts[path] / total if total else 0.0,
+                "ms_p50": percentile(samples, 0.5),
+                "ms_p99": percentile(samples, 0.99),
+            }
+        return stats
@@ -0,0 +1,292 @@
+"""Apply FAQ changes to the served index without rebuilding it.
+
+A built version (``utils/index_build.py``) is read-only. Rows added or
+edited since then get a vector inferred with the version's own model and
+are appended to a small delta segment; deleted or superseded rows are
+tombstoned by FAQ id. Each change costs one inference and O(1) bookkeeping
+whatever the corpus size. ``python -m utils.index_build compact`` folds the
+changes into a new version, which resets the delta.
+"""
+
+import hashlib
+import os
+import threading
+import time
+
+import numpy as np
+from utils.vector_search import normalize
+
+INDEX_SYNC_SECONDS = float(os.getenv("INDEX_SYNC_SECONDS", "60"))
+
+
+def question_hash(text):
+    """64-bit digest of a question; a row whose digest changed needs a new vector."""
+    return int.from_bytes(hashlib.sha1(text.encode()).digest()[:8], "little")
+
+
+class LiveIndex:
+    """Search over a built version plus the rows that changed since.
+
+    ``base`` is the version's ``VectorSearch`` or ``IVFIndex``, tagged by FAQ
+    id. Tombstoned base rows are set in a mask the base search skips, so a
+    query costs the same however many rows were deleted; the results are
+    merged with an exact scan of the delta.
+    """
+
+    def __init__(self, base, ids, hashes=None):
+        self.base = base
+        if hashes is None:
+            # Versions without digests: every row reads as changed once.
+            hashes = [None] * len(ids)
+        else:
+            hashes = np.asarray(hashes).tolist()
+        self._hashes = dict(zip(np.asarray(ids).tolist(), hashes))
+        self._dead = set()
+        self._dead_rows = None
+        self._tag_order = None
+        self._delta_rows = {}
+        self._vectors = None
+        self._tags = np.empty(0, dtype=np.int64)
+        self._live = np.empty(0, dtype=bool)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._hashes)
+
+    @property
+    def tags(self):
+        """FAQ ids of the live rows."""
+        return np.fromiter(self._hashes, dtype=np.int64, count=len(self._hashes))
+
+    def hash_of(self, faq_id):
+        """Digest of the question the row's vector was inferred from."""
+        return self._hashes.get(faq_id)
+
+    def ids(self):
+        """Set of the FAQ ids currently searchable."""
+        return set(self._hashes)
+
+    def upsert(self, ids, vectors, hashes):
+        """Add rows or replace their vectors; old vectors are tombstoned."""
+        vectors = normalize(vectors)
+        with self._lock:
+            for faq_id, vector, digest in zip(ids, vectors, hashes):
+                faq_id = int(faq_id)
+                self._remove(faq_id)
+                row = self._append(faq_id, vector)
+                self._delta_rows[faq_id] = row
+                self._hashes[faq_id] = digest
+
+    def delete(self, ids):
+        """Stop returning these rows."""
+        with self._lock:
+            for faq_id in ids:
+                faq_id = int(faq_id)
+                self._remove(faq_id)
+                self._hashes.pop(faq_id, None)
+
+    def _remove(self, faq_id):
+        row = self._delta_rows.pop(faq_id, None)
+        if row is not None:
+            self._live[row] = False
+        elif faq_id in self._hashes and faq_id not in self._dead:
+            self._dead.add(faq_id)
+            self._mask_base_rows(faq_id)
+
+    def _mask_base_rows(self, faq_id):
+        """Set the base rows tagged ``faq_id`` in the mask searches skip."""
+        if self._tag_order is None:
+            # Built on the first tombstone; unchanged versions never pay it.
+            tags = np.asarray(self.base.tags)
+            order = np.argsort(tags, kind="stable")
+            self._tag_order = order, tags[order]
+            self._dead_rows = np.zeros(len(tags), dtype=bool)
+        order, sorted_tags = self._tag_order
+        start, stop = np.searchsorted(sorted_tags, [faq_id, faq_id + 1])
+        self._dead_rows[order[start:stop]] = True
+
+    def _append(self, faq_id, vector):
+        if self._vectors is None or self._count == len(self._vectors):
+            # Grow geometrically into new arrays; searches keep their views.
+            capacity = max(16, 2 * self._count)
+            vectors = np.zeros((capacity, len(vector)), dtype=np.float32)
+            tags = np.zeros(capacity, dtype=np.int64)
+            live = np.zeros(capacity, dtype=bool)
+            if self._count:
+                vectors[: self._count] = self._vectors[: self._count]
+                tags[: self._count] = self._tags[: self._count]
+                live[: self._count] = self._live[: self._count]
+            self._vectors, self._tags, self._live = vectors, tags, live
+        row = self._count
+        self._vectors[row] = vector
+        self._tags[row] = faq_id
+        self._live[row] = True
+        self._count += 1
+        return row
+
+    def search_batch(self, queries, k=1, threshold=None):
+        """Return the top-``k`` ``(faq id, score)`` pairs for each query vector."""
+        with self._lock:
+            count = self._count
+            live = self._live[:count].copy()
+            vectors = self._vectors[:count][live] if live.any() else None
+            tags = self._tags[:count][live]
+            dead = self._dead_rows
+
+        results = self.base.search_batch(
+            queries, k=k, threshold=threshold, exclude=dead
+        )
+        if vectors is None:
+            return [pairs[:k] for pairs in results]
+
+        scores = normalize(queries) @ vectors.T
+        merged = []
+        for pairs, row_scores in zip(results, scores):
+            delta = [
+                (int(tag), float(score))
+                for tag, score in zip(tags, row_scores)
+                if threshold is None or score >= threshold
+            ]
+            merged.append(sorted(pairs + delta, key=lambda p: -p[1])[:k])
+        return merged
+
+    def search(self, query, k=1, threshold=None):
+        """Return the top-``k`` ``(faq id, score)`` pairs for one query vector."""
+        return self.search_batch(np.asarray(query)[None, :], k, threshold)[0]
+
+    def stats(self):
+        """Delta metrics for the /metrics endpoint."""
+        return {
+            "rows": len(self._hashes),
+            "delta_rows": len(self._delta_rows),
+            "tombstones": len(self._dead) + self._count - len(self._delta_rows),
+        }
+
+
+class IndexUpdater:
+    """Keep the served index's ``LiveIndex`` in step with the faq table.
+
+    ``update`` takes changed rows (``(id, question, ...)``) and deleted ids;
+    only rows whose question digest differs from the indexed one are
+    re-inferred, so answer-only edits cost nothing. With ``full=True`` the
+    rows are the whole table and ids missing from it are deleted. The
+    index's ``lexical`` index, if any, gets the same changes.
+    ``on_change`` runs after any change was applied, e.g. to drop cached
+    search results.
+    """
+
+    def __init__(self, index, tokenize, on_change=None):
+        self.index = index
+        self.tokenize = tokenize
+        self.on_change = on_change
+        self.inferred = 0
+        self.deleted = 0
+        self.syncs = 0
+        self.errors = 0
+        self.error = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def update(self, rows=(), deleted=(), full=False):
+        """Apply changes to the current index."""
+        with self._lock:
+            self._apply(self.index, rows, deleted, full)
+
+    def swap(self, index, rows, install):
+        """Bring ``index`` up to date with ``rows()`` and ``install`` it.
+
+        Runs under the update lock, so no change lands on the old index
+        after the snapshot was taken.
+        """
+        with self._lock:
+            self._apply(index, rows(), (), True)
+            install(index)
+            self.index = index
+
+    def _apply(self, index, rows, deleted, full):
+        rows = list(rows)
+        relexed = 0
+        if index.lexical is not None:
+            filled = len(index.lexical) > 0
+            relexed = index.lexical.update(rows, deleted, full)
+            if not filled:
+                # The first fill changes no row already served, so the query
+                # cache persisted by the last run stays.
+                relexed = 0
+        live = index.search
+        if not isinstance(live, LiveIndex):
+            # Tagged by row position: new rows need a rebuild.
+            if relexed and self.on_change is not None:
+                self.on_change()
+            return
+        try:
+            changed = []
+            for row in rows:
+                faq_id, question = int(row[0]), row[1]
+                digest = question_hash(question)
+                if live.hash_of(faq_id) != digest:
+                    changed.append((faq_id, question, digest))
+            if full:
+                deleted = live.ids() - {int(row[0]) for row in rows}
+            vectors = [
+                index.model.infer_vector(self.tokenize(question))
+                for _, question, _ in changed
+            ]
+            if changed:
+                live.upsert(
+                    [faq_id for faq_id, _, _ in changed],
+                    vectors,
+                    [digest for _, _, digest in changed],
+                )
+            live.delete(deleted)
+        except Exception as e:
+            self.errors += 1
+            self.error = str(e)
+            raise
+        self.inferred += len(changed)
+        self.deleted += len(deleted)
+        self.syncs += full
+        if (changed or deleted or relexed) and self.on_change is not None:
+            self.on_change()
+
+    def _poll(self, rows, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.update(rows(), full=True)
+            except Exception:
+                time.sleep(min(interval, 5))
+
+    def start(self, rows, interval=INDEX_SYNC_SECONDS):
+        """Sync against ``rows()`` (the whole table) every ``interval`` seconds.
+
+        For servers without a ``FAQStore`` to push changes.
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._poll, args=(rows, interval), name="index-sync", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background sync."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self):
+        """Update metrics for the /metrics endpoint."""
+        stats = {
+            "inferred": self.inferred,
+            "deleted": self.deleted,
+            "syncs": self.syncs,
+            "errors": self.errors,
+            "error": self.error,
+        }
+        if isinstance(self.index.search, LiveIndex):
+            stats.update(self.index.search.stats())
+        return stats
@@ -0,0 +1,390 @@
+"""LLM providers behind one interface, with pooled clients and hedging.
+
+Each provider (Groq, LM Studio) is built once per process. It owns:
+- a sync client and, per event loop, an async client and connection
+  semaphore, created on first use, whose keep-alive connections are reused
+  by every request;
+- its own timeout, retry count and circuit breaker;
+- a window of recent completion latencies.
+
+A ``Router`` sends completions to the primary provider. When a hedge
+provider is set and the primary has not answered within its recent p95
+latency, the same request also goes to the hedge, and the first answer
+wins. Only about one request in twenty then costs two completions. A
+primary that fails outright is retried on the hedge at once. Streams
+always go to the primary.
+"""
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import httpx
+from utils.circuit_breaker import CircuitBreaker
+from utils.db_pool import percentile
+from utils.single_flight import request_key
+
+# Cap on one completion; a request's deadline can make it shorter.
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "20"))
+
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "groq")
+# Empty turns hedging off.
+LLM_HEDGE_PROVIDER = os.getenv("LLM_HEDGE_PROVIDER", "")
+# Quantile in 0-1, like every percentile in utils/db_pool.py.
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95"))
+# Hedge delay until the primary has enough latencies for a percentile.
+LLM_HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY", "2"))
+LLM_HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+
+
+def llm_timeout(deadline=None, cap=LLM_TIMEOUT):
+    """Seconds one completion may take within ``deadline``, if any."""
+    if deadline is None:
+        return cap
+    return deadline.timeout("llm", cap)
+
+
+def pool_limits():
+    return httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_KEEPALIVE,
+    )
+
+
+def groq_client(provider, asynchronous):
+    """Groq client; ``GROQ_BASE_URL`` overrides the endpoint."""
+    import groq
+
+    if asynchronous:
+        return groq.AsyncGroq(
+            api_key=os.getenv("GROQ_API_KEY"),
+            max_retries=provider.max_retries,
+            http_client=groq.DefaultAsyncHttpxClient(limits=pool_limits()),
+        )
+    return groq.Groq(
+        api_key=os.getenv("GROQ_API_KEY"),
+        max_retries=provider.max_retries,
+        http_client=groq.DefaultHttpxClient(limits=pool_limits()),
+    )
+
+
+def lm_studio_client(provider, asynchronous):
+    """OpenAI-compatible client for the LM Studio server at ``LM_STUDIO``."""
+    import openai
+
+    if asynchronous:
+        return openai.AsyncOpenAI(
+            base_url=os.getenv("LM_STUDIO"),
+            api_key="lm-studio",
+            max_retries=provider.max_retries,
+            http_client=openai.DefaultAsyncHttpxClient(limits=pool_limits()),
+        )
+    return openai.OpenAI(
+        base_url=os.getenv("LM_STUDIO"),
+        api_key="lm-studio",
+        max_retries=provider.max_retries,
+        http_client=openai.DefaultHttpxClient(limits=pool_limits()),
+    )
+
+
+class Provider:
+    """One chat completions backend and its pooled clients.
+
+    ``connect(provider, asynchronous)`` builds a client. ``<NAME>_TIMEOUT``
+    and ``<NAME>_MAX_RETRIES`` override ``LLM_TIMEOUT`` and
+    ``LLM_MAX_RETRIES`` for this provider, e.g. ``GROQ_TIMEOUT``.
+    """
+
+    def __init__(self, name, model, connect, params=None):
+        prefix = name.upper()
+        self.name = name
+        self.model = model
+        self.params = params or {}
+        self.timeout = float(os.getenv(f"{prefix}_TIMEOUT", LLM_TIMEOUT))
+        self.max_retries = int(os.getenv(f"{prefix}_MAX_RETRIES", LLM_MAX_RETRIES))
+        self.breaker = CircuitBreaker(name)
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.completions = 0
+        self._connect = connect
+        self._client = None
+        # Async connections belong to the loop they were opened on.
+        self._per_loop = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._connect(self, False)
+        return self._client
+
+    def _loop_state(self):
+        """``(async client, slots)`` of the running event loop."""
+        loop = asyncio.get_running_loop()
+        state = self._per_loop.get(loop)
+        if state is None:
+            with self._lock:
+                state = self._per_loop.get(loop)
+                if state is None:
+                    client = self._connect(self, True)
+                    # Waiters queue here rather than inside httpcore, whose
+                    # pool bookkeeping rescans every connection for every
+                    # queued request.
+                    slots = asyncio.Semaphore(LLM_MAX_CONNECTIONS)
+                    state = self._per_loop[loop] = client, slots
+        return state
+
+    @property
+    def async_client(self):
+        """The running loop's async client."""
+        return self._loop_state()[0]
+
+    @property
+    def slots(self):
+        """The running loop's cap on concurrent async completions."""
+        return self._loop_state()[1]
+
+    def warm(self):
+        """Build the running loop's async client ahead of the first request."""
+        self._loop_state()
+
+    def args(self, messages):
+        """Chat completion arguments for ``messages``."""
+        return {"model": self.model, "messages": messages, **self.params}
+
+    def complete(self, messages, deadline=None):
+        """Text of one completion, bounded by ``deadline`` and the timeout."""
+        timeout = llm_timeout(deadline, self.timeout)
+        start = time.perf_counter()
+        with self.breaker.guard():
+            completion = self.client.chat.completions.create(
+                **self.args(messages), timeout=timeout
+            )
+        self._observe(start)
+        return completion.choices[0].message.content
+
+    async def acomplete(self, messages, deadline=None):
+        """Async ``complete``."""
+        timeout = llm_timeout(deadline, self.timeout)
+        start = time.perf_counter()
+        client, slots = self._loop_state()
+        try:
+            with self.breaker.guard():
+                async with slots:
+                    completion = await client.chat.completions.create(
+                        **self.args(messages), timeout=timeout
+                    )
+        except asyncio.CancelledError:
+            # A hedge won or the caller left: it would have taken longer.
+            self._observe(start)
+            raise
+        self._observe(start)
+        return completion.choices[0].message.content
+
+    def stream(self, messages, deadline=None):
+        """Yield the completion's content deltas as they arrive."""
+        with self.breaker.guard():
+            stream = self.client.chat.completions.create(
+                **self.args(messages),
+                stream=True,
+                timeout=llm_timeout(deadline, self.timeout),
+            )
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+    async def astream(self, messages, deadline=None):
+        """Async ``stream``."""
+        client, slots = self._loop_state()
+        with self.breaker.guard():
+            async with slots:
+                stream = await client.chat.completions.create(
+                    **self.args(messages),
+                    stream=True,
+                    timeout=llm_timeout(deadline, self.timeout),
+                )
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+
+    def _observe(self, start):
+        with self._lock:
+            self.completions += 1
+            self.latencies.append(time.perf_counter() - start)
+
+    def latency(self, q):
+        """Recent completion latency in seconds at quantile ``q`` (0-1)."""
+        with self._lock:
+            samples = list(self.latencies)
+        return percentile(samples, q) if samples else None
+
+    def hedge_delay(self):
+        """Seconds to wait for this provider before hedging."""
+        if len(self.latencies) < LLM_HEDGE_MIN_SAMPLES:
+            return LLM_HEDGE_DELAY
+        return self.latency(LLM_HEDGE_PERCENTILE)
+
+    def stats(self):
+        p50, p95 = self.latency(0.5), self.latency(0.95)
+        return {
+            "model": self.model,
+            "timeout": self.timeout,
+            "max_retries": self.max_retries,
+            "completions": self.completions,
+            "latency_ms_p50": None if p50 is None else p50 * 1000,
+            "latency_ms_p95": None if p95 is None else p95 * 1000,
+            "circuit": self.breaker.stats(),
+        }
+
+
+PROVIDERS = {
+    "groq": Provider(
+        "groq",
+        "llama-3.3-70b-versatile",
+        groq_client,
+        {"temperature": 1, "max_completion_tokens": 8192, "top_p": 1},
+    ),
+    "lm_studio": Provider("lm_studio", "llama-3.2-3b-instruct", lm_studio_client),
+}
+
+
+def provider(name):
+    """The shared ``Provider`` called ``name``."""
+    try:
+        return PROVIDERS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown LLM provider {name!r}; expected one of {sorted(PROVIDERS)}"
+        ) from None
+
+
+class Router:
+    """Sends completions to ``primary``, hedged with ``hedge`` if given."""
+
+    def __init__(self, primary, hedge=None):
+        self.primary = primary
+        self.hedge = hedge
+        self.hedged = 0
+        self.failovers = 0
+        self.hedge_wins = 0
+        self._threads = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Router for ``LLM_PROVIDER``, hedged with ``LLM_HEDGE_PROVIDER``."""
+        hedge = provider(LLM_HEDGE_PROVIDER) if LLM_HEDGE_PROVIDER else None
+        return cls(provider(LLM_PROVIDER), hedge)
+
+    def warm(self):
+        """``Provider.warm`` for the primary and the hedge."""
+        for provider in (self.primary, self.hedge):
+            if provider is not None:
+                provider.warm()
+
+    def key(self, messages):
+        """Single-flight key of a completion of ``messages``."""
+        return request_key(**self.primary.args(messages))
+
+    def complete(self, messages, deadline=None):
+        """Text of one completion, from whichever provider answers first."""
+        if self.hedge is None:
+            return self.primary.complete(messages, deadline)
+
+        first = self._pool().submit(self.primary.complete, messages, deadline)
+        done, _ = wait([first], timeout=self.primary.hedge_delay())
+        if done and first.exception() is None:
+            return first.result()
+        self._count(failed=bool(done))
+        second = self._pool().submit(self.hedge.complete, messages, deadline)
+
+        # The loser's thread cannot be stopped; its answer is dropped.
+        pending, errors = {first, second}, {}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    self._won(future is second)
+                    return future.result()
+                errors[future] = future.exception()
+        raise errors[first]
+
+    async def acomplete(self, messages, deadline=None):
+        """Async ``complete``; the losing request is cancelled."""
+        if self.hedge is None:
+            return await self.primary.acomplete(messages, deadline)
+
+        first = asyncio.ensure_future(self.primary.acomplete(messages, deadline))
+        pending = {first}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self.primary.hedge_delay())
+            if done and first.exception() is None:
+                return first.result()
+            self._count(failed=bool(done))
+            second = asyncio.ensure_future(self.hedge.acomplete(messages, deadline))
+            pending.add(second)
+
+            errors = {}
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        self._won(task is second)
+                        return task.result()
+                    errors[task] = task.exception()
+            raise errors[first]
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stream(self, messages, deadline=None):
+        """Stream from the primary; text already sent cannot be swapped."""
+        return self.primary.stream(messages, deadline)
+
+    def astream(self, messages, deadline=None):
+        """Async ``stream``."""
+        return self.primary.astream(messages, deadline)
+
+    def _pool(self):
+        with self._lock:
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(
+                    LLM_MAX_CONNECTIONS, thread_name_prefix="llm-hedge"
+                )
+        return self._threads
+
+    def _count(self, failed):
+        with self._lock:
+            if failed:
+                self.failovers += 1
+            else:
+                self.hedged += 1
+
+    def _won(self, by_hedge):
+        if by_hedge:
+            with self._lock:
+                self.hedge_wins += 1
+
+    def stats(self):
+        """Provider and hedging metrics for the /metrics endpoint."""
+        providers = [self.primary] + ([self.hedge] if self.hedge else [])
+        return {
+            "primary": self.primary.name,
+            "hedge": self.hedge.name if self.hedge else None,
+            "hedge_delay_ms": self.primary.hedge_delay() * 1000,
+            "hedged": self.hedged,
+            "failovers": self.failovers,
+            "hedge_wins": self.hedge_wins,
+            "providers": {p.name: p.stats() for p in providers},
+        }
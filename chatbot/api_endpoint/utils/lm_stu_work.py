@@ -1,39 +1,38 @@
-import os
-
 from db_access import RetrieveData
-from openai import OpenAI
+from utils.chat_model_work import build_messages, llm_flights
+from utils.llm_provider import Router, provider
 
-base_url = os.getenv("LM_STUDIO")
+# Shares the pooled LM Studio clients with a hedged RefactorModel, and its
+# prompt and single-flight table, which /metrics reports.
+llm = Router(provider("lm_studio"))
 
 
 class LM_Stu_Model:
     def __init__(self):
         pass
 
-    def model_work(self, result_data: str):
-        client = OpenAI(base_url=base_url, api_key="lm-studio")
-
+    def model_work(self, result_data: str, deadline=None):
         print(result_data)
 
-        messages = [
-            {
-                "role": "system",
-                "content": """
-                - The tone is polite, professional, and grammatically correct.
-                - The original meaning and context remain accurate.
-                - If the text sounds too casual or emotional, rephrase it into a neutral and refined style.""",
-            },
-            {"role": "user", "content": result_data},
-        ]
-
-        response = client.chat.completions.create(
-            model="llama-3.2-3b-instruct", messages=messages
+        messages = build_messages(result_data)
+        return llm_flights.do(
+            llm.key(messages), lambda: llm.complete(messages, deadline)
         )
 
-        return response.choices[0].message.content
+    async def amodel_work(self, result_data: str, deadline=None):
+        """Async ``model_work`` for the event loop."""
+        messages = build_messages(result_data)
+        flight = llm_flights.do_async(
+            llm.key(messages), lambda: llm.acomplete(messages, deadline)
+        )
+        if deadline is None:
+            return await flight
+        return await deadline.run("llm", flight)
 
 
 if __name__ == "__main__":
+    from utils.model_registry import registry
+
     db = RetrieveData()
     db.connect()
     db.user_input = "How to login to banking account"
@@ -41,8 +40,8 @@ if __name__ == "__main__":
     ans_ret = db.retrieve_answers()
     db.close()
     concat_qa = db.concat(ques_ret, ans_ret)
-    pre_dc = db.preprocessing_doc()
-    take_sim = db.most_sim(concat_qa, pre_dc)
+    pre_dc = db.preprocessing_doc(registry.load(), registry.search())
+    take_sim = db.most_sim(list(concat_qa.values()), pre_dc)
 
     model = LM_Stu_Model()
     result_work = model.model_work(take_sim)
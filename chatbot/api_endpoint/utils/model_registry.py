@@ -0,0 +1,149 @@
+"""Process-wide registry that loads the Doc2Vec model once and memory-maps it.
+
+``DOC2VEC_MODEL_PATH`` is either a directory exported by
+``utils/doc2vec_runtime.py``, served by the NumPy runtime without importing
+gensim, or a gensim model file.
+
+Serving never writes next to the model, so it can ship in a read-only
+image: the runtime export includes the normalized search matrix, and a
+gensim file gets its memory-mappable layout from ``prepare`` at build time
+(``python -m utils.index_build prepare``). Without those files the model
+and matrix are loaded into process memory instead.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+
+from utils.doc2vec_runtime import SEARCH_PREFIX, Doc2VecRuntime, is_runtime
+from utils.vector_search import VectorSearch
+
+MODEL_PATH = os.getenv("DOC2VEC_MODEL_PATH", "utils/doc2vec_model.runtime")
+
+
+def layout_path(path: str) -> str:
+    """Where ``mmap_layout`` puts the re-saved copy of the gensim file ``path``."""
+    with open(path, "rb") as f:
+        digest = hashlib.sha1(f.read()).hexdigest()[:12]
+    return os.path.join(f"{path}.mmap-{digest}", os.path.basename(path))
+
+
+def mmap_layout(path: str) -> str:
+    """Return a copy of the model saved with every array in its own .npy file.
+
+    Gensim only memory-maps arrays that were saved separately, so the pickled
+    model is re-saved once into a directory keyed by its content hash. The
+    directory is written to a temp location and renamed into place, so
+    concurrent builds never publish a half-written copy.
+    """
+    target = layout_path(path)
+    target_dir = os.path.dirname(target)
+    if os.path.exists(target):
+        return target
+
+    from gensim.models.doc2vec import Doc2Vec
+
+    tmp_dir = tempfile.mkdtemp(prefix=".mmap-", dir=os.path.dirname(path) or ".")
+    try:
+        Doc2Vec.load(path).save(
+            os.path.join(tmp_dir, os.path.basename(path)), sep_limit=0
+        )
+        os.replace(tmp_dir, target_dir)
+    except OSError:
+        # Another build won the race and already published the layout.
+        if not os.path.exists(target):
+            raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return target
+
+
+def search_prefix(path: str) -> str:
+    """Prefix of the saved search matrix that belongs to the model ``path``."""
+    if is_runtime(path):
+        return os.path.join(path, SEARCH_PREFIX)
+    return os.path.join(os.path.dirname(layout_path(path)), SEARCH_PREFIX)
+
+
+def prepare(path: str = MODEL_PATH):
+    """Write the files ``ModelRegistry`` memory-maps for ``path``; build time only.
+
+    The mmap layout of a gensim file and the normalized search matrix, if
+    missing (runtimes exported before the matrix was part of the export).
+    """
+    if is_runtime(path):
+        model = Doc2VecRuntime.load(path)
+    else:
+        from gensim.models.doc2vec import Doc2Vec
+
+        model = Doc2Vec.load(mmap_layout(path), mmap="r")
+    prefix = search_prefix(path)
+    if not os.path.exists(f"{prefix}.tags.npy"):
+        VectorSearch.from_model(model).save(prefix)
+    return prefix
+
+
+class ModelRegistry:
+    """Hand every request the same read-only Doc2Vec model or runtime."""
+
+    def __init__(self):
+        self._models = {}
+        self._searches = {}
+        self._lock = threading.Lock()
+
+    def load(self, path: str = MODEL_PATH):
+        """Return the shared model for ``path``, loading it on first use.
+
+        The arrays are opened with ``mmap="r"`` so every worker process maps
+        the same page-cache pages instead of holding a private copy; a gensim
+        file without its ``prepare``-d layout is read into memory.
+        """
+        model = self._models.get(path)
+        if model is None:
+            with self._lock:
+                model = self._models.get(path)
+                if model is None:
+                    if is_runtime(path):
+                        model = Doc2VecRuntime.load(path, mmap_mode="r")
+                    else:
+                        from gensim.models.doc2vec import Doc2Vec
+
+                        layout = layout_path(path)
+                        if os.path.exists(layout):
+                            model = Doc2Vec.load(layout, mmap="r")
+                        else:
+                            model = Doc2Vec.load(path)
+                    self._models[path] = model
+        return model
+
+    def search(self, path: str = MODEL_PATH) -> VectorSearch:
+        """Return the shared ``VectorSearch`` over the model's document vectors.
+
+        The normalized matrix saved by the export or ``prepare`` is
+        memory-mapped like the model arrays; without it the matrix is built
+        in memory.
+        """
+        search = self._searches.get(path)
+        if search is None:
+            model = self.load(path)
+            with self._lock:
+                search = self._searches.get(path)
+                if search is None:
+                    prefix = search_prefix(path)
+                    if os.path.exists(f"{prefix}.tags.npy"):
+                        search = VectorSearch.load(prefix)
+                    else:
+                        search = VectorSearch.from_model(model)
+                    self._searches[path] = search
+        return search
+
+    def clear(self):
+        """Drop every loaded model."""
+        with self._lock:
+            self._models.clear()
+            self._searches.clear()
+
+
+registry = ModelRegistry()
@@ -0,0 +1,256 @@
+"""Semantic cache of retrieval results in front of Doc2Vec and vector search.
+
+Two tiers, checked in order:
+
+- exact: the normalized query text, which skips tokenizing, inference and
+  search altogether;
+- vector: the inferred query vector, which reuses the result of a cached
+  query within ``QUERY_CACHE_DISTANCE`` cosine distance and skips search.
+
+Cached values are the ``(tag, score)`` lists from the search, not answer
+text, so answers are always read from the live FAQ store.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "10000"))
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "3600"))
+QUERY_CACHE_MAX_BYTES = int(os.getenv("QUERY_CACHE_MAX_BYTES", str(32 * 2**20)))
+QUERY_CACHE_DISTANCE = float(os.getenv("QUERY_CACHE_DISTANCE", "0.05"))
+QUERY_CACHE_PATH = os.getenv("QUERY_CACHE_PATH", "")
+
+# Rough per-entry bookkeeping (dict slot, lists, small objects).
+ENTRY_OVERHEAD = 200
+
+
+class _Punctuation(dict):
+    """``str.translate`` table: punctuation and symbols become spaces.
+
+    Letters, digits and combining marks (Mn/Mc, e.g. Myanmar vowel signs)
+    are kept. Filled in per code point as they are seen.
+    """
+
+    def __missing__(self, code):
+        self[code] = 32 if unicodedata.category(chr(code))[0] in "PS" else code
+        return self[code]
+
+
+_PUNCTUATION = _Punctuation()
+
+
+def normalize_text(text: str) -> str:
+    """Case-, punctuation- and whitespace-insensitive form of a query."""
+    return " ".join(text.lower().translate(_PUNCTUATION).split())
+
+
+class _Entry:
+    __slots__ = ("value", "slot", "expires", "size")
+
+    def __init__(self, value, slot, expires, size):
+        self.value = value
+        self.slot = slot
+        self.expires = expires
+        self.size = size
+
+
+class QueryCache:
+    """Bounded LRU cache with TTL, a memory cap and an optional SQLite file.
+
+    Entries are evicted least recently used first when there are more than
+    ``size`` of them or they take more than ``max_bytes``. Vectors live in
+    one preallocated float32 matrix so the vector tier is a single product.
+    """
+
+    def __init__(
+        self,
+        size=QUERY_CACHE_SIZE,
+        ttl=QUERY_CACHE_TTL,
+        max_bytes=QUERY_CACHE_MAX_BYTES,
+        distance=QUERY_CACHE_DISTANCE,
+        path=QUERY_CACHE_PATH,
+        clock=time.time,
+    ):
+        self.size = size
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.distance = distance
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._vectors = None
+        self._expires = None
+        self._keys = []
+        self._free = []
+        self.bytes = 0
+        self.exact_hits = 0
+        self.vector_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Bumped by clear(): results cached elsewhere under an older
+        # generation are stale (index swapped or FAQ rows changed).
+        self.generation = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, text):
+        """Return the cached result for this query text, or None."""
+        key = normalize_text(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires <= self._clock():
+                self._evict(key)
+                return None
+            self._entries.move_to_end(key)
+            self.exact_hits += 1
+            return entry.value
+
+    def get_similar(self, vector):
+        """Return the result of the closest cached query vector, or None.
+
+        Counts a miss when neither tier had the query.
+        """
+        with self._lock:
+            if self._entries and self.distance > 0:
+                query = np.asarray(vector, dtype=np.float32)
+                query = query / (np.linalg.norm(query) or 1.0)
+                scores = self._vectors @ query
+                # Free and expired slots can never match.
+                scores[self._expires <= self._clock()] = -np.inf
+                slot = int(np.argmax(scores))
+                if scores[slot] >= 1.0 - self.distance:
+                    key = self._keys[slot]
+                    self._entries.move_to_end(key)
+                    self.vector_hits += 1
+                    return self._entries[key].value
+            self.misses += 1
+            return None
+
+    def put(self, text, vector, value, expires=None):
+        """Cache ``value`` for this query text and its inferred vector."""
+        key = normalize_text(text)
+        vector = np.asarray(vector, dtype=np.float32)
+        size = vector.nbytes + len(key) + len(json.dumps(value)) + ENTRY_OVERHEAD
+        with self._lock:
+            if key in self._entries:
+                self._evict(key)
+            slot = self._slot(len(vector))
+            self._vectors[slot] = vector / (np.linalg.norm(vector) or 1.0)
+            expires = expires or self._clock() + self.ttl
+            self._expires[slot] = expires
+            self._keys[slot] = key
+            self._entries[key] = _Entry(value, slot, expires, size)
+            self.bytes += size
+            while len(self._entries) > self.size or self.bytes > self.max_bytes:
+                self._evict(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            for key in list(self._entries):
+                self._evict(key)
+            self.generation += 1
+
+    def _slot(self, dim):
+        if self._vectors is None:
+            capacity = min(self.size, 1024)
+            self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+            self._expires = np.zeros(capacity)
+            self._keys = [None] * capacity
+            self._free = list(range(capacity - 1, -1, -1))
+        if not self._free:
+            # Grow geometrically; eviction keeps live entries at ``size``.
+            old = len(self._vectors)
+            new = min(max(old * 2, 1), self.size + 1)
+            self._vectors = np.resize(self._vectors, (new, dim))
+            self._vectors[old:] = 0
+            self._expires = np.concatenate([self._expires, np.zeros(new - old)])
+            self._keys.extend([None] * (new - old))
+            self._free = list(range(new - 1, old - 1, -1))
+        return self._free.pop()
+
+    def _evict(self, key):
+        entry = self._entries.pop(key)
+        self._expires[entry.slot] = 0
+        self._keys[entry.slot] = None
+        self._free.append(entry.slot)
+        self.bytes -= entry.size
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS query_cache ("
+            "query TEXT PRIMARY KEY, vector BLOB NOT NULL, "
+            "value TEXT NOT NULL, expires REAL NOT NULL, "
+            "position INTEGER NOT NULL);"
+        )
+        return conn
+
+    def load(self):
+        """Read unexpired entries from the SQLite file, if one is set."""
+        if not self.path:
+            return
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT query, vector, value, expires FROM query_cache "
+                "WHERE expires > ? ORDER BY position;",
+                (self._clock(),),
+            ).fetchall()
+        finally:
+            conn.close()
+        for query, vector, value, expires in rows:
+            vector = np.frombuffer(vector, dtype=np.float32)
+            self.put(query, vector, json.loads(value), expires=expires)
+
+    def save(self):
+        """Write the entries, in LRU order, to the SQLite file if one is set."""
+        if not self.path:
+            return
+        with self._lock:
+            rows = [
+                (
+                    key,
+                    self._vectors[entry.slot].tobytes(),
+                    json.dumps(entry.value),
+                    entry.expires,
+                    position,
+                )
+                for position, (key, entry) in enumerate(self._entries.items())
+            ]
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM query_cache;")
+                conn.executemany(
+                    "INSERT INTO query_cache VALUES (?, ?, ?, ?, ?);", rows
+                )
+        finally:
+            conn.close()
+
+    def stats(self):
+        """Cache metrics for the /metrics endpoint."""
+        lookups = self.exact_hits + self.vector_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "exact_hits": self.exact_hits,
+            "vector_hits": self.vector_hits,
+            "misses": self.misses,
+            "hit_ratio": (
+                (self.exact_hits + self.vector_hits) / lookups if lookups else 0.0
+            ),
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,207 @@
+"""Precomputed LLM rephrasings of FAQ answers.
+
+The rephrasing only depends on the FAQ answer and the prompt, so it is run
+once per answer by the job below and served from memory afterwards:
+
+    python -m utils.rephrase_store            # fill in missing answers
+    python -m utils.rephrase_store --force    # redo every answer
+
+The job creates the ``faq_rephrased`` table if needed, as does
+``chatbot/sql/faq_rephrased.sql``; serving processes only read it.
+"""
+
+import argparse
+import hashlib
+import os
+import threading
+
+from asyncpg import UndefinedTableError
+from utils.faq_store import connect_db, placeholder
+
+REPHRASE_REFRESH_SECONDS = float(os.getenv("REPHRASE_REFRESH_SECONDS", "300"))
+
+
+def answer_hash(answer: str) -> str:
+    """Content hash that keys a stored rephrasing."""
+    return hashlib.sha256(answer.encode()).hexdigest()
+
+
+class RephraseStore:
+    """Rephrased answers for one prompt version, held in a dict.
+
+    Rows live in the ``faq_rephrased`` table keyed by ``(answer_hash,
+    prompt_version)``; serving processes load the rows for their prompt
+    version and reload them every ``REPHRASE_REFRESH_SECONDS``.
+    """
+
+    def __init__(self, prompt_version, connect=connect_db):
+        self.prompt_version = prompt_version
+        self._connect = connect
+        self._texts = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._texts)
+
+    def create_table(self):
+        """Create ``faq_rephrased`` if it does not exist yet (job only)."""
+        conn = self._connect()
+        try:
+            cur = conn.cursor()
+            cur.execute(
+                "CREATE TABLE IF NOT EXISTS faq_rephrased ("
+                "answer_hash TEXT NOT NULL, "
+                "prompt_version TEXT NOT NULL, "
+                "rephrased TEXT NOT NULL, "
+                "PRIMARY KEY (answer_hash, prompt_version));"
+            )
+            conn.commit()
+            cur.close()
+        finally:
+            conn.close()
+
+    def load(self):
+        """Replace the in-memory rephrasings with the stored ones."""
+        conn = self._connect()
+        try:
+            cur = conn.cursor()
+            cur.execute(
+                "SELECT answer_hash, rephrased FROM faq_rephrased "
+                f"WHERE prompt_version = {placeholder(conn)};",
+                (self.prompt_version,),
+            )
+            texts = dict(cur.fetchall())
+            cur.close()
+        finally:
+            conn.close()
+        self._merge(texts)
+
+    async def load_async(self, pool):
+        """Like ``load`` but reads through the shared ``DatabasePool``.
+
+        Before the table exists the store stays empty and every answer goes
+        to the LLM; the background reload picks the table up once created.
+        """
+        try:
+            rows = await pool.fetch("rephrased", self.prompt_version)
+        except UndefinedTableError:
+            return
+        self._merge({row["answer_hash"]: row["rephrased"] for row in rows})
+
+    def _merge(self, texts):
+        # Keep rephrasings learned from live calls that are not stored yet.
+        self._texts = {**self._texts, **texts}
+
+    def get(self, answer):
+        """Return the stored rephrasing of ``answer``, or None on a miss."""
+        text = self._texts.get(answer_hash(answer))
+        if text is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return text
+
+    def remember(self, answer, text):
+        """Keep a live LLM result in memory for the rest of this process."""
+        self._texts[answer_hash(answer)] = text
+
+    def save(self, conn, answer, text):
+        """Upsert one rephrasing and keep it in memory."""
+        mark = placeholder(conn)
+        cur = conn.cursor()
+        cur.execute(
+            "INSERT INTO faq_rephrased (answer_hash, prompt_version, rephrased) "
+            f"VALUES ({mark}, {mark}, {mark}) "
+            "ON CONFLICT (answer_hash, prompt_version) "
+            "DO UPDATE SET rephrased = excluded.rephrased;",
+            (answer_hash(answer), self.prompt_version, text),
+        )
+        conn.commit()
+        cur.close()
+        self.remember(answer, text)
+
+    def build(self, answers, rephrase, force=False):
+        """Rephrase every answer not stored yet; return how many were written.
+
+        Each result is committed on its own, so an interrupted run keeps
+        its progress and the next run picks up where it stopped.
+        """
+        written = 0
+        conn = self._connect()
+        try:
+            for answer in dict.fromkeys(answers):
+                if not force and answer_hash(answer) in self._texts:
+                    continue
+                self.save(conn, answer, rephrase(answer))
+                written += 1
+        finally:
+            conn.close()
+        return written
+
+    def stats(self):
+        """Store metrics for the /metrics endpoint."""
+        return {
+            "prompt_version": self.prompt_version,
+            "answers": len(self._texts),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def _reload(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.load()
+            except Exception:
+                # Keep serving the rephrasings we already have.
+                pass
+
+    def start(self, interval=REPHRASE_REFRESH_SECONDS):
+        """Reload the stored rephrasings from a daemon thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._reload, args=(interval,), name="rephrase-store", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background reload."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+def main():
+    from db_access import NO_ANSWER
+    from utils.chat_model_work import PROMPT_VERSION, RefactorModel
+
+    parser = argparse.ArgumentParser(description="Precompute FAQ rephrasings.")
+    parser.add_argument("--force", action="store_true", help="redo stored answers")
+    args = parser.parse_args()
+
+    store = RephraseStore(PROMPT_VERSION)
+    store.create_table()
+    store.load()
+
+    conn = store._connect()
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT DISTINCT answer FROM faq;")
+        answers = [row[0] for row in cur.fetchall()]
+        cur.close()
+    finally:
+        conn.close()
+
+    # The fallback message is sent to the LLM just like a FAQ answer.
+    answers.append(NO_ANSWER)
+    written = store.build(answers, RefactorModel().rephrase, force=args.force)
+    print(f"prompt {PROMPT_VERSION}: wrote {written}, {len(store)} stored")
+
+
+if __name__ == "__main__":
+    main()
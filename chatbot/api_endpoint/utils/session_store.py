@@ -0,0 +1,135 @@
+"""Bounded state of the chat sessions served over ``ChatSession`` streams.
+
+A session spans the questions of one stream and, for
+``SESSION_TTL_SECONDS`` after its last question, reconnects that send its
+id again. It keeps the FAQ ids it matched most recently
+(``SESSION_HISTORY``) and the search results of its last
+``SESSION_CACHE_SIZE`` distinct questions, so a question asked again in
+the conversation skips inference and search. At most ``SESSION_MAX``
+sessions are kept; the least recently active one is dropped first.
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+from utils.query_cache import normalize_text
+
+SESSION_MAX = int(os.getenv("SESSION_MAX", "10000"))
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "1800"))
+SESSION_HISTORY = int(os.getenv("SESSION_HISTORY", "20"))
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "32"))
+
+
+class Session:
+    """One conversation: its recent matches and cached search results.
+
+    Cached results are tagged with the ``QueryCache`` generation they were
+    searched under and ignored once it changed, like the shared cache's.
+    """
+
+    def __init__(self, session_id, history=SESSION_HISTORY, cache=SESSION_CACHE_SIZE):
+        self.id = session_id
+        self.faq_ids = deque(maxlen=history)
+        self.questions = 0
+        self.cache_hits = 0
+        self.cache_size = cache
+        self.expires = 0.0
+        self._results = OrderedDict()
+
+    def search_result(self, query, generation):
+        """The cached search result for ``query``, or None."""
+        key = normalize_text(query)
+        cached = self._results.get(key)
+        if cached is None or cached[0] != generation:
+            return None
+        self._results.move_to_end(key)
+        self.cache_hits += 1
+        return cached[1]
+
+    def remember(self, query, generation, pre_dc):
+        """Cache the search result of ``query``, dropping the oldest."""
+        if self.cache_size <= 0:
+            return
+        key = normalize_text(query)
+        self._results[key] = (generation, pre_dc)
+        self._results.move_to_end(key)
+        while len(self._results) > self.cache_size:
+            self._results.popitem(last=False)
+
+    def matched(self, pre_dc):
+        """Count a question and record the FAQ id it matched."""
+        self.questions += 1
+        if pre_dc:
+            self.faq_ids.append(int(pre_dc[0][0]))
+
+
+class SessionStore:
+    """LRU of sessions by id, each expiring ``ttl`` seconds after use."""
+
+    def __init__(self, size=SESSION_MAX, ttl=SESSION_TTL_SECONDS, clock=time.monotonic):
+        self.size = size
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()
+        self.created = 0
+        self.resumed = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def open(self, session_id=""):
+        """The live session ``session_id``, or a new one with a fresh id.
+
+        Unknown and expired ids get a new session rather than one under the
+        id the client chose.
+        """
+        now = self._clock()
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(session_id) if session_id else None
+            if session is None:
+                session = Session(uuid.uuid4().hex)
+                self._sessions[session.id] = session
+                self.created += 1
+                while len(self._sessions) > self.size:
+                    self._sessions.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self.resumed += 1
+            self._touch(session, now)
+        return session
+
+    def touch(self, session):
+        """Keep ``session`` alive for another ``ttl`` seconds."""
+        with self._lock:
+            if self._sessions.get(session.id) is session:
+                self._touch(session, self._clock())
+
+    def _touch(self, session, now):
+        session.expires = now + self.ttl
+        self._sessions.move_to_end(session.id)
+
+    def _expire(self, now):
+        # Least recently touched first, so expired ones are at the front.
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session.expires > now:
+                return
+            self._sessions.popitem(last=False)
+            self.expired += 1
+
+    def stats(self):
+        """Session metrics for the /metrics endpoint."""
+        return {
+            "sessions": len(self._sessions),
+            "created": self.created,
+            "resumed": self.resumed,
+            "expired": self.expired,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,95 @@
+"""Coalesce identical in-flight calls into one.
+
+While a call for a key is running, further calls with the same key wait
+for it and share its result (or exception) instead of starting their own.
+Nothing is kept once the call finishes; caching is the stores' job.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+
+
+def request_key(**request) -> str:
+    """Stable key for an upstream request built from its arguments."""
+    body = json.dumps(request, sort_keys=True, default=str)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+class SingleFlight:
+    """One upstream call per key at a time, for threads and for coroutines.
+
+    ``do`` serves thread callers (sync handlers, gRPC executor threads);
+    ``do_async`` serves coroutines on the event loop. The two are tracked
+    separately, so a sync and an async caller never wait on each other.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._futures = {}
+        self._tasks = {}
+        self.calls = 0
+        self.upstream = 0
+        self.deduplicated = 0
+
+    def _count(self, leader):
+        with self._lock:
+            self.calls += 1
+            if leader:
+                self.upstream += 1
+            else:
+                self.deduplicated += 1
+
+    def do(self, key, fn):
+        """Return ``fn()``, sharing one execution among concurrent callers."""
+        with self._lock:
+            future = self._futures.get(key)
+            leader = future is None
+            if leader:
+                future = self._futures[key] = Future()
+        self._count(leader)
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._futures[key]
+
+    async def do_async(self, key, fn):
+        """Await ``fn()``, sharing one task among concurrent callers.
+
+        The shared task is shielded: a caller that is cancelled (client
+        disconnect, deadline) stops waiting without cancelling the others.
+        """
+        task = self._tasks.get(key)
+        leader = task is None
+        if leader:
+            task = self._tasks[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda done: self._finish(key, done))
+        self._count(leader)
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task):
+        self._tasks.pop(key, None)
+        if not task.cancelled():
+            # Mark the exception retrieved even if every waiter went away.
+            task.exception()
+
+    def stats(self):
+        """Coalescing metrics for the /metrics endpoint."""
+        return {
+            "calls": self.calls,
+            "upstream": self.upstream,
+            "deduplicated": self.deduplicated,
+            "in_flight": len(self._futures) + len(self._tasks),
+        }
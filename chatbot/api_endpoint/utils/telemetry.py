@@ -0,0 +1,242 @@
+"""Sampled request telemetry, exported to MLflow off the request path.
+
+A handler fills in a ``Record`` (input, matched FAQ id, stage timings,
+model output) and hands it to ``Telemetry.submit``. Submitting does not
+block: the record is sampled at ``TELEMETRY_SAMPLE_RATE`` (records with an
+error are always kept) and appended to a ring buffer of
+``TELEMETRY_BUFFER_SIZE`` records. When the buffer is full, the oldest
+record is dropped and counted. A daemon thread drains the buffer every
+``TELEMETRY_FLUSH_SECONDS``, or once ``TELEMETRY_BATCH_SIZE`` records are
+waiting, and exports them in batches.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from utils.db_pool import percentile
+
+TELEMETRY_SAMPLE_RATE = float(os.getenv("TELEMETRY_SAMPLE_RATE", "1"))
+TELEMETRY_BUFFER_SIZE = int(os.getenv("TELEMETRY_BUFFER_SIZE", "10000"))
+TELEMETRY_BATCH_SIZE = int(os.getenv("TELEMETRY_BATCH_SIZE", "500"))
+TELEMETRY_FLUSH_SECONDS = float(os.getenv("TELEMETRY_FLUSH_SECONDS", "10"))
+
+
+class Record:
+    """One request: its fields and the milliseconds spent in each stage."""
+
+    def __init__(self, kind, **fields):
+        self.fields = {"kind": kind, "time": time.time(), **fields}
+        self.timings = {}
+        self._start = time.perf_counter()
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    @contextmanager
+    def stage(self, name):
+        """Time the block as ``<name>_ms``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[f"{name}_ms"] = (time.perf_counter() - start) * 1000
+
+    def mark(self, name):
+        """Record ``<name>_ms``, the time since the request started."""
+        self.timings[f"{name}_ms"] = (time.perf_counter() - self._start) * 1000
+
+    def as_dict(self):
+        self.mark("total")
+        return {**self.fields, "timings": self.timings}
+
+
+class Telemetry:
+    """Ring buffer of sampled records and the thread that exports them.
+
+    ``exporter.export(records)`` receives each batch as a list of dicts; a
+    batch that fails to export is dropped, so a tracking server that is
+    down costs nothing but the lost records.
+    """
+
+    def __init__(
+        self,
+        exporter,
+        sample_rate=TELEMETRY_SAMPLE_RATE,
+        buffer_size=TELEMETRY_BUFFER_SIZE,
+        batch_size=TELEMETRY_BATCH_SIZE,
+    ):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.submitted = 0
+        self.sampled_out = 0
+        self.dropped = 0
+        self.exported = 0
+        self.batches = 0
+        self.failed = 0
+        self.error = None
+        self._buffer = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def submit(self, record):
+        """Queue ``record`` for export if it is sampled; never blocks."""
+        keep = "error" in record.fields or random.random() < self.sample_rate
+        with self._lock:
+            self.submitted += 1
+            if not keep:
+                self.sampled_out += 1
+                return
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(record.as_dict())
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        """Export everything buffered so far, one batch at a time."""
+        while True:
+            with self._lock:
+                count = min(self.batch_size, len(self._buffer))
+                batch = [self._buffer.popleft() for _ in range(count)]
+            if not batch:
+                return
+            try:
+                self.exporter.export(batch)
+            except Exception as e:
+                # The tracking server is down: lose this batch, keep serving.
+                self.failed += len(batch)
+                self.error = repr(e)
+            else:
+                self.exported += len(batch)
+                self.batches += 1
+
+    def _drain(self, interval):
+        # Connect to the tracking server here rather than at startup.
+        open_exporter = getattr(self.exporter, "open", None)
+        if open_exporter is not None:
+            try:
+                open_exporter()
+            except Exception as e:
+                self.error = repr(e)
+        while not self._stop.is_set():
+            self._wake.wait(interval)
+            self._wake.clear()
+            self.flush()
+
+    def start(self, interval=TELEMETRY_FLUSH_SECONDS):
+        """Drain the buffer from a daemon thread every ``interval`` seconds."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._drain, args=(interval,), name="telemetry", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the thread and export what is left."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+        close = getattr(self.exporter, "close", None)
+        if close is not None:
+            close()
+
+    def stats(self):
+        """Telemetry metrics for the /metrics endpoint."""
+        return {
+            "sample_rate": self.sample_rate,
+            "submitted": self.submitted,
+            "sampled_out": self.sampled_out,
+            "buffered": len(self._buffer),
+            "dropped": self.dropped,
+            "exported": self.exported,
+            "batches": self.batches,
+            "failed": self.failed,
+            "error": self.error,
+        }
+
+
+class MlflowExporter:
+    """Writes batches of records to one MLflow run per serving process.
+
+    Each batch becomes a JSON-lines artifact under ``requests/``, plus
+    metrics stepped by batch number: request, error and fallback counts
+    and the mean and p95 of every stage timing. The run is created on the
+    telemetry thread as it starts, after ``setup()`` configured the
+    tracking URI; if either fails the next export tries again.
+    """
+
+    def __init__(
+        self, experiment=None, run_name="API_Telemetry", tags=None, setup=None
+    ):
+        self.experiment = experiment
+        self.run_name = run_name
+        self.tags = tags or {}
+        self.step = 0
+        self._setup = setup
+        self._client = None
+        self._run_id = None
+
+    def open(self):
+        """Configure tracking and create the run, unless that is done."""
+        if self._run_id is None:
+            from mlflow.tracking import MlflowClient
+
+            if self._setup is not None:
+                self._setup()
+                self._setup = None
+            client = MlflowClient()
+            experiment_id = "0"
+            if self.experiment:
+                experiment = client.get_experiment_by_name(self.experiment)
+                if experiment is None:
+                    experiment_id = client.create_experiment(self.experiment)
+                else:
+                    experiment_id = experiment.experiment_id
+            run = client.create_run(
+                experiment_id, run_name=self.run_name, tags=self.tags
+            )
+            self._client, self._run_id = client, run.info.run_id
+        return self._client, self._run_id
+
+    def export(self, records):
+        from mlflow.entities import Metric
+
+        client, run_id = self.open()
+        self.step += 1
+        lines = "".join(json.dumps(r, default=str) + "\n" for r in records)
+        client.log_text(run_id, lines, f"requests/{self.step:06d}.jsonl")
+
+        values = {
+            "requests": len(records),
+            "errors": sum("error" in r for r in records),
+            "fallbacks": sum(r.get("path") == "fallback" for r in records),
+        }
+        for stage in sorted({name for r in records for name in r["timings"]}):
+            timings = [r["timings"][stage] for r in records if stage in r["timings"]]
+            values[f"{stage}_mean"] = sum(timings) / len(timings)
+            values[f"{stage}_p95"] = percentile(timings, 0.95)
+        now = int(time.time() * 1000)
+        client.log_batch(
+            run_id,
+            metrics=[Metric(k, float(v), now, self.step) for k, v in values.items()],
+        )
+
+    def close(self):
+        """Mark the run finished."""
+        if self._run_id is not None:
+            self._client.set_terminated(self._run_id)
+            self._run_id = None
@@ -0,0 +1,129 @@
+"""Inference settings and an LRU cache of inferred query vectors.
+
+Doc2Vec inference is a run of SGD epochs, so it dominates a cache miss.
+The NumPy runtime seeds it from the tokens, so a token sequence always
+infers to the same vector and can be cached. Set ``INFER_EPOCHS`` /
+``INFER_ALPHA`` / ``INFER_MIN_ALPHA`` to trade effort for stability
+(``0`` keeps the model's own value);
+``chatbot/benchmarks/bench_infer_epochs.py`` measures both.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+INFER_EPOCHS = int(os.getenv("INFER_EPOCHS", "0"))
+INFER_ALPHA = float(os.getenv("INFER_ALPHA", "0"))
+INFER_MIN_ALPHA = float(os.getenv("INFER_MIN_ALPHA", "0"))
+VECTOR_CACHE_SIZE = int(os.getenv("VECTOR_CACHE_SIZE", "10000"))
+
+
+class VectorCache:
+    """Bounded LRU of ``(model, token tuple)`` to the inferred vector.
+
+    Keys hold the model itself, so vectors of a swapped-out index are never
+    served for the new one; they age out, or ``clear`` drops them. Cached
+    vectors are read-only and shared by every caller. Set ``workers`` to an
+    ``InferenceWorkers`` to infer misses in worker processes.
+    """
+
+    def __init__(
+        self,
+        size=VECTOR_CACHE_SIZE,
+        epochs=INFER_EPOCHS,
+        alpha=INFER_ALPHA,
+        min_alpha=INFER_MIN_ALPHA,
+    ):
+        self.size = size
+        self.epochs = epochs or None
+        self.alpha = alpha or None
+        self.min_alpha = min_alpha or None
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.workers = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def infer(self, model, tokens):
+        """The vector of ``tokens``, inferred with ``model`` on a miss."""
+        [vector] = self.infer_many(model, [tokens])
+        if isinstance(vector, Exception):
+            raise vector
+        return vector
+
+    def infer_many(self, model, token_lists):
+        """Vectors of ``token_lists`` in order; a failed one is its exception.
+
+        The misses are inferred together, on ``workers`` when it is set.
+        """
+        keys = [(model, tuple(tokens)) for tokens in token_lists]
+        vectors = [self._get(key) for key in keys]
+        misses = [i for i, vector in enumerate(vectors) if vector is None]
+        if not misses:
+            return vectors
+        settings = {
+            "alpha": self.alpha,
+            "min_alpha": self.min_alpha,
+            "epochs": self.epochs,
+        }
+        if self.workers is not None:
+            inferred = self.workers.infer_many(
+                model, [keys[i][1] for i in misses], settings
+            )
+        else:
+            inferred = []
+            for i in misses:
+                try:
+                    inferred.append(model.infer_vector(list(keys[i][1]), **settings))
+                except Exception as e:
+                    inferred.append(e)
+        for i, vector in zip(misses, inferred):
+            if not isinstance(vector, Exception):
+                self._put(keys[i], vector)
+            vectors[i] = vector
+        return vectors
+
+    def _get(self, key):
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def _put(self, key, vector):
+        if self.size <= 0:
+            return
+        vector.flags.writeable = False
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every cached vector."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Cache metrics for the /metrics endpoint."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "epochs": self.epochs,
+        }
+
+
+vector_cache = VectorCache()
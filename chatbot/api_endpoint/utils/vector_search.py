@@ -0,0 +1,90 @@
+"""Exact top-k cosine search over a precomputed FAQ document matrix."""
+
+import os
+
+import numpy as np
+
+
+def normalize(vectors):
+    """Return ``vectors`` as contiguous float32 rows scaled to unit length."""
+    matrix = np.array(vectors, dtype=np.float32, ndmin=2, copy=True, order="C")
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+
+class VectorSearch:
+    """Rank documents with one matrix product and an ``argpartition`` top-k.
+
+    ``matrix`` holds one L2-normalized float32 row per document and ``tags``
+    the Doc2Vec tag of each row, i.e. the FAQ position it answers.
+    """
+
+    def __init__(self, matrix, tags):
+        self.matrix = matrix
+        self.tags = tags
+
+    def __len__(self):
+        return len(self.tags)
+
+    @classmethod
+    def from_model(cls, model):
+        """Build the search matrix from a Doc2Vec model's document vectors."""
+        tags = np.array([int(key) for key in model.dv.index_to_key], dtype=np.int64)
+        return cls(normalize(model.dv.vectors), tags)
+
+    def save(self, prefix):
+        """Write ``<prefix>.vectors.npy`` and ``<prefix>.tags.npy`` atomically."""
+        for suffix, array in (("vectors", self.matrix), ("tags", self.tags)):
+            path = f"{prefix}.{suffix}.npy"
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, prefix, mmap_mode="r"):
+        """Open a saved matrix, memory-mapped read-only by default."""
+        matrix = np.load(f"{prefix}.vectors.npy", mmap_mode=mmap_mode)
+        tags = np.load(f"{prefix}.tags.npy")
+        return cls(matrix, tags)
+
+    def search_batch(self, queries, k=1, threshold=None, exclude=None):
+        """Return the top-``k`` ``(tag, score)`` pairs for each query vector.
+
+        ``queries`` is a ``(batch, dim)`` array. Pairs are sorted by
+        descending cosine similarity; pairs below ``threshold`` are dropped,
+        so a query can come back with an empty list. Rows set in the
+        boolean mask ``exclude`` are never returned.
+        """
+        scores = normalize(queries) @ self.matrix.T
+        if exclude is not None:
+            scores[:, exclude] = -np.inf
+        k = min(k, scores.shape[1])
+        if k <= 0:
+            return [[] for _ in range(len(scores))]
+
+        if k < scores.shape[1]:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(k), scores.shape)
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        results = []
+        for rows, row_scores in zip(self.tags[top], top_scores):
+            if threshold is not None:
+                keep = row_scores >= threshold
+                rows, row_scores = rows[keep], row_scores[keep]
+            elif exclude is not None:
+                keep = row_scores > -np.inf
+                rows, row_scores = rows[keep], row_scores[keep]
+            results.append(list(zip(rows.tolist(), row_scores.tolist())))
+        return results
+
+    def search(self, query, k=1, threshold=None, exclude=None):
+        """Return the top-``k`` ``(tag, score)`` pairs for one query vector."""
+        return self.search_batch(np.asarray(query)[None, :], k, threshold, exclude)[0]
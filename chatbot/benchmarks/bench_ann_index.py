@@ -0,0 +1,68 @@
+"""Recall@k and latency of the IVF index vs exact search on a synthetic corpus.
+
+Run from the repository root:
+
+    python chatbot/benchmarks/bench_ann_index.py --docs 300000 --nlist 1024
+
+Documents are drawn around random topic centres so the corpus has the kind
+of cluster structure real Doc2Vec vectors have; uniform noise would be the
+worst case for any IVF index.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "api_endpoint"))
+)
+
+from utils.ann_index import IVFIndex, evaluate  # noqa: E402
+from utils.vector_search import VectorSearch, normalize  # noqa: E402
+
+
+def corpus(docs, dim, topics, rng):
+    """Unit vectors scattered around ``topics`` random centres."""
+    centres = rng.normal(size=(topics, dim)).astype(np.float32)
+    labels = rng.integers(0, topics, size=docs)
+    noise = rng.normal(scale=1.0, size=(docs, dim)).astype(np.float32)
+    return normalize(centres[labels] + noise)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=300000)
+    parser.add_argument("--dim", type=int, default=100)
+    parser.add_argument("--topics", type=int, default=2000)
+    parser.add_argument("--nlist", type=int, default=1024)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 64])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    matrix = corpus(args.docs, args.dim, args.topics, rng)
+    exact = VectorSearch(matrix, np.arange(args.docs))
+
+    start = time.perf_counter()
+    index = IVFIndex.build(matrix, exact.tags, nlist=args.nlist)
+    print(
+        f"docs={args.docs} dim={args.dim} nlist={index.nlist} "
+        f"build={time.perf_counter() - start:.1f}s"
+    )
+
+    picks = rng.choice(args.docs, size=args.queries, replace=False)
+    queries = matrix[picks] + rng.normal(scale=0.05, size=(args.queries, args.dim))
+    for row in evaluate(index, exact, queries, args.k, args.nprobe):
+        print(
+            f"nprobe={row['nprobe']!s:>5} recall@{args.k}={row['recall']:.3f} "
+            f"{row['ms_per_query']:.3f}ms/query"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Per-request answer lookup cost as the faq table grows.
+
+Run from the repository root against a scratch PostgreSQL database (the
+benchmark creates and drops its own ``faq_bench`` table):
+
+    DB_URI=postgresql://... python chatbot/benchmarks/bench_answer_fetch.py \
+        --sizes 1000 10000 100000
+
+Compares the three ways a request can get the answer of its top-k search
+hits:
+
+- ``full scan``: read every question and answer, then index the match
+  (what the gRPC server did for every request);
+- ``by id``: one prepared ``SELECT ... WHERE id = ANY($1)`` for the k ids;
+- ``store``: a dict lookup in the in-process ``FAQStore`` copy.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import asyncpg
+import numpy as np
+
+TABLE = "faq_bench"
+FULL = f"SELECT id, question, answer FROM {TABLE} ORDER BY id"
+BY_IDS = f"SELECT id, answer FROM {TABLE} WHERE id = ANY($1::bigint[])"
+
+
+async def fill(conn, size):
+    await conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    await conn.execute(
+        f"CREATE TABLE {TABLE} (id bigint PRIMARY KEY, question text, answer text)"
+    )
+    await conn.copy_records_to_table(
+        TABLE,
+        records=(
+            (i, f"question number {i} " * 4, f"answer number {i} " * 20)
+            for i in range(1, size + 1)
+        ),
+    )
+    await conn.execute(f"ANALYZE {TABLE}")
+
+
+async def timed(call, requests):
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await call()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def run(dsn, sizes, k, requests):
+    conn = await asyncpg.connect(dsn)
+    rng = np.random.default_rng(0)
+    try:
+        for size in sizes:
+            await fill(conn, size)
+            by_ids = await conn.prepare(BY_IDS)
+            full = await conn.prepare(FULL)
+
+            def hits():
+                return rng.integers(1, size + 1, size=k).tolist()
+
+            async def full_scan():
+                rows = await full.fetch()
+                answers = [row["answer"] for row in rows]
+                return [answers[i - 1] for i in hits()]
+
+            async def by_id():
+                rows = await by_ids.fetch(hits())
+                return {row["id"]: row["answer"] for row in rows}
+
+            store = {row["id"]: row["answer"] for row in await full.fetch()}
+
+            async def in_store():
+                return [store.get(i) for i in hits()]
+
+            scan_requests = max(3, min(requests, 2_000_000 // size))
+            print(
+                f"rows={size:>8} k={k}: "
+                f"full scan={await timed(full_scan, scan_requests):9.3f}ms  "
+                f"by id={await timed(by_id, requests):7.3f}ms  "
+                f"store={await timed(in_store, requests):7.4f}ms"
+            )
+    finally:
+        await conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        await conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", default=os.getenv("DB_URI"))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--k", type=int, default=1)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.dsn, args.sizes, args.k, args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""Throughput of a sync vs an async /ask handler under concurrent clients.
+
+Run from the repository root:
+
+    python chatbot/benchmarks/bench_async_ask.py --clients 50 200 1000 \
+        --llm-ms 1000 --epochs 20
+
+Each handler serves the same request path as ``main.py`` (Doc2Vec
+inference, vector search, LLM rephrase) against a local fake LLM that
+answers after ``--llm-ms``. The sync handler holds one of AnyIO's 40 worker
+threads for the whole request, so it tops out at 40 / LLM latency; the async
+one only uses a thread for the inference step and is bounded by the LLM
+connection pool and CPU. Rephrasings are never cached, so every request
+calls the LLM.
+
+The committed model infers with 1000 epochs (~25ms of CPU per query), which
+caps a single core at ~40 req/s whatever the handler; ``--epochs 20`` makes
+inference cheap so the handler's own concurrency limit shows.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing as mp
+import os
+import socket
+import statistics
+import sys
+import time
+
+import uvicorn
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+API_DIR = os.path.abspath(os.path.join(HERE, "..", "api_endpoint"))
+QUERY = "how can i log in to my banking account"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve_llm(port, llm_ms):
+    """Fake LLM process: every completion takes ``llm_ms``."""
+    from bench_streaming import fake_llm
+
+    app = fake_llm(tokens=1, first_ms=llm_ms, token_ms=0)
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def serve_app(mode, port, llm_port, connections, keepalive, epochs):
+    """Chatbot process with a ``sync`` or ``async`` /ask handler."""
+    os.environ["GROQ_BASE_URL"] = f"http://127.0.0.1:{llm_port}"
+    os.environ["LLM_MAX_CONNECTIONS"] = str(connections)
+    os.environ["LLM_MAX_KEEPALIVE"] = str(keepalive)
+    os.environ.setdefault("GROQ_API_KEY", "benchmark")
+    os.chdir(API_DIR)
+    sys.path.insert(0, API_DIR)
+
+    from db_access import RetrieveData
+    from fastapi import FastAPI
+    from schema import textRequest
+    from utils.chat_model_work import RefactorModel
+    from utils.inference_pool import InferencePool
+    from utils.model_registry import registry
+
+    doc2vec = registry.load()
+    search = registry.search()
+    answers = [f"answer {i}" for i in range(len(search))]
+    rephrase = RefactorModel()
+    db = RetrieveData()
+    app = FastAPI()
+
+    def retrieve(query):
+        # preprocessing_doc without NLTK's punkt, which may not be installed.
+        vector = doc2vec.infer_vector(query.lower().split(), epochs=epochs)
+        return search.search(vector, k=1)
+
+    if mode == "sync":
+
+        @app.post("/ask")
+        def ask(request: textRequest):
+            take_sim = db.most_sim(answers, retrieve(request.SQL_QUERY), 0.0)
+            return {"answer": rephrase.model_work(take_sim)}
+
+    else:
+        pool = InferencePool()
+
+        @app.post("/ask")
+        async def ask(request: textRequest):
+            pre_dc = await pool.run(retrieve, request.SQL_QUERY)
+            take_sim = db.most_sim(answers, pre_dc, 0.0)
+            return {"answer": await rephrase.amodel_work(take_sim)}
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", backlog=4096)
+
+
+def wait_for(port):
+    while True:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+
+
+async def post_loop(port, deadline, latencies):
+    """One keep-alive client sending /ask back to back until ``deadline``.
+
+    Raw asyncio streams: httpx's pool costs O(connections) per request, which
+    would make the load generator the bottleneck at 1000 clients.
+    """
+    body = json.dumps({"SQL_QUERY": QUERY}).encode()
+    request = (
+        f"POST /ask HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+    ).encode() + body
+    errors = 0
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = int(head.lower().split(b"content-length:")[1].split(b"\r\n")[0])
+            await reader.readexactly(length)
+            if not head.startswith(b"HTTP/1.1 200"):
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        writer.close()
+    return errors
+
+
+async def load(port, clients, seconds):
+    """``clients`` connections sending /ask back to back for ``seconds``."""
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(post_loop(port, deadline, latencies) for _ in range(clients)),
+        return_exceptions=True,
+    )
+    elapsed = time.perf_counter() - start
+    errors = sum(r if isinstance(r, int) else 1 for r in results)
+    return len(latencies) / elapsed, latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--llm-ms", type=float, default=300)
+    parser.add_argument("--llm-connections", type=int, default=100)
+    parser.add_argument("--llm-keepalive", type=int, default=20)
+    parser.add_argument("--modes", nargs="+", default=["sync", "async"])
+    parser.add_argument("--epochs", type=int, default=None, help="inference epochs")
+    args = parser.parse_args()
+
+    llm_port = free_port()
+    llm = mp.Process(target=serve_llm, args=(llm_port, args.llm_ms), daemon=True)
+    llm.start()
+    wait_for(llm_port)
+
+    print(
+        f"fake LLM latency={args.llm_ms:.0f}ms duration={args.seconds:.0f}s "
+        f"epochs={args.epochs or 'model'}"
+    )
+    for mode in args.modes:
+        port = free_port()
+        app = mp.Process(
+            target=serve_app,
+            args=(
+                mode,
+                port,
+                llm_port,
+                args.llm_connections,
+                args.llm_keepalive,
+                args.epochs,
+            ),
+            daemon=True,
+        )
+        app.start()
+        wait_for(port)
+        asyncio.run(load(port, 10, 2))  # warm up
+        for clients in args.clients:
+            rps, latencies, errors = asyncio.run(load(port, clients, args.seconds))
+            latencies.sort()
+            p99 = latencies[int(0.99 * (len(latencies) - 1))] if latencies else 0
+            print(
+                f"{mode:>5} clients={clients:>5}: {rps:7.1f} req/s  "
+                f"p50={statistics.median(latencies or [0]):7.1f}ms  "
+                f"p99={p99:7.1f}ms  errors={errors}"
+            )
+        app.terminate()
+        app.join()
+    llm.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Chat sessions as unary RPCs vs one bidirectional ChatSession stream.
+
+Run from the repository root:
+
+    python chatbot/benchmarks/bench_chat_session.py --sessions 20 \
+        --questions 8 --llm-ms 300
+
+Each of ``--sessions`` concurrent users asks ``--questions`` questions
+against the unified gRPC server (``bench_grpc_server.serve_unified``: the
+real model and search, FAQ answers in memory, a fake LLM answering after
+``--llm-ms``):
+
+- ``unary, new channel``: one ``AddChatRequest`` per question on a fresh
+  channel, as a mobile app that sets up every request does;
+- ``unary, one channel``: the questions one after another on a channel
+  kept open for the session;
+- ``streams, one channel``: the same with ``StreamChatRequest``;
+- ``session stream``: the questions sent on one ``ChatSession`` stream as
+  they are asked, answered up to ``SESSION_PIPELINE`` at a time.
+
+Reports the time until a session has all its answers and until its first
+answer starts streaming, plus questions answered per second overall.
+"""
+
+import argparse
+import asyncio
+import multiprocessing as mp
+import statistics
+import sys
+import time
+
+from bench_async_ask import free_port, serve_llm, wait_for
+from bench_grpc_server import API_DIR, QUERIES, serve_unified
+
+TARGET = "127.0.0.1:{port}"
+
+
+def questions(session, count):
+    return [QUERIES[(session + i) % len(QUERIES)] for i in range(count)]
+
+
+async def unary_new_channel(port, session, count, stubs):
+    import chatbot_pb2
+    import chatbot_pb2_grpc
+    import grpc
+
+    first = None
+    for question in questions(session, count):
+        async with grpc.aio.insecure_channel(TARGET.format(port=port)) as channel:
+            stub = chatbot_pb2_grpc.chatbot_serviceStub(channel)
+            await stub.AddChatRequest(chatbot_pb2.AddRequest(request=question))
+        first = first or time.perf_counter()
+    return first
+
+
+async def unary_one_channel(port, session, count, stubs):
+    import chatbot_pb2
+
+    first = None
+    stub = stubs[session % len(stubs)]
+    for question in questions(session, count):
+        await stub.AddChatRequest(chatbot_pb2.AddRequest(request=question))
+        first = first or time.perf_counter()
+    return first
+
+
+async def streams_one_channel(port, session, count, stubs):
+    import chatbot_pb2
+
+    first = None
+    stub = stubs[session % len(stubs)]
+    for question in questions(session, count):
+        request = chatbot_pb2.AddRequest(request=question)
+        async for _ in stub.StreamChatRequest(request):
+            first = first or time.perf_counter()
+    return first
+
+
+async def session_stream(port, session, count, stubs):
+    import chatbot_pb2
+
+    def requests():
+        for i, question in enumerate(questions(session, count), 1):
+            yield chatbot_pb2.SessionRequest(id=i, request=question)
+
+    first = None
+    done = 0
+    async for chunk in stubs[session % len(stubs)].ChatSession(requests()):
+        first = first or time.perf_counter()
+        if chunk.error:
+            raise RuntimeError(chunk.error)
+        done += chunk.done
+    assert done == count
+    return first
+
+
+async def run(mode, port, sessions, count, channels):
+    """``(seconds to all answers, seconds to the first)`` of every session."""
+    import chatbot_pb2_grpc
+    import grpc
+
+    options = [("grpc.use_local_subchannel_pool", 1)]
+    opened = [
+        grpc.aio.insecure_channel(TARGET.format(port=port), options=options)
+        for _ in range(channels)
+    ]
+    stubs = [chatbot_pb2_grpc.chatbot_serviceStub(channel) for channel in opened]
+
+    async def one(session):
+        start = time.perf_counter()
+        first = await mode(port, session, count, stubs)
+        return time.perf_counter() - start, first - start
+
+    start = time.perf_counter()
+    try:
+        timings = await asyncio.gather(*(one(s) for s in range(sessions)))
+    finally:
+        for channel in opened:
+            await channel.close()
+    return timings, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--questions", type=int, default=8)
+    parser.add_argument("--channels", type=int, default=4)
+    parser.add_argument("--llm-ms", type=float, default=300)
+    parser.add_argument("--admission-limit", type=int, default=64)
+    args = parser.parse_args()
+
+    spawn = mp.get_context("spawn")
+    llm_port = free_port()
+    llm = spawn.Process(target=serve_llm, args=(llm_port, args.llm_ms), daemon=True)
+    llm.start()
+    wait_for(llm_port)
+    port = free_port()
+    server = spawn.Process(
+        target=serve_unified,
+        args=(port, llm_port, args.admission_limit),
+        daemon=True,
+    )
+    server.start()
+    wait_for(port)
+    sys.path.insert(0, API_DIR)
+
+    print(
+        f"sessions={args.sessions} questions={args.questions} "
+        f"LLM latency={args.llm_ms:.0f}ms"
+    )
+    modes = {
+        "unary, new channel": unary_new_channel,
+        "unary, one channel": unary_one_channel,
+        "streams, one channel": streams_one_channel,
+        "session stream": session_stream,
+    }
+    asyncio.run(run(session_stream, port, 1, len(QUERIES), 1))  # warm up
+    for name, mode in modes.items():
+        timings, elapsed = asyncio.run(
+            run(mode, port, args.sessions, args.questions, args.channels)
+        )
+        total = statistics.median(t for t, _ in timings)
+        first = statistics.median(f for _, f in timings)
+        rate = args.sessions * args.questions / elapsed
+        print(
+            f"{name:>19}: session {total * 1000:7.0f}ms  "
+            f"first answer {first * 1000:6.0f}ms  {rate:6.1f} questions/s"
+        )
+    server.terminate()
+    llm.terminate()
+
+
+if __name__ == "__main__":
+    main()
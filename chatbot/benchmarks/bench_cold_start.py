@@ -0,0 +1,88 @@
+"""Cold-start import time of the REST app, checked against a budget.
+
+Run from the repository root:
+
+    python chatbot/benchmarks/bench_cold_start.py --runs 5 --budget-ms 1500
+
+Each run imports ``main`` in a fresh interpreter under ``python -X
+importtime``, with proxies pointing at a closed port so any network call
+fails instead of stalling. It prints the median cumulative import time and
+the slowest direct imports. It exits with status 1 when the import fails
+offline, when the median is over ``--budget-ms``, or when a module that
+must load lazily (NLTK, MLflow, DagsHub, the LLM SDKs, gensim, gRPC) was
+imported.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+API_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "api_endpoint"))
+
+# Loaded on first use or by background tasks, never by ``import main``.
+LAZY = ("dagshub", "gensim", "grpc", "groq", "mlflow", "nltk", "openai", "scipy")
+
+
+def import_profile(module="main"):
+    """``{name: (cumulative_us, depth)}`` of one ``import module``."""
+    env = dict(
+        os.environ,
+        GROQ_API_KEY=os.getenv("GROQ_API_KEY", "benchmark"),
+        HTTP_PROXY="http://127.0.0.1:9",
+        HTTPS_PROXY="http://127.0.0.1:9",
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=API_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode:
+        # Typically a network call at import time that the proxy refused.
+        tail = "\n".join(result.stderr.splitlines()[-5:])
+        sys.exit(f"FAIL: import {module} failed offline:\n{tail}")
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        profile[name.strip()] = (int(cumulative), depth)
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    import_profile()  # warm the OS page cache and bytecode caches
+    profiles = [import_profile() for _ in range(args.runs)]
+    totals = [p["main"][0] / 1000 for p in profiles]
+    median = statistics.median(totals)
+
+    last = profiles[-1]
+    direct = [(us, name) for name, (us, depth) in last.items() if depth == 1]
+    print(f"import main: median {median:.0f}ms over {args.runs} runs")
+    for us, name in sorted(direct, reverse=True)[: args.top]:
+        print(f"  {us / 1000:7.1f}ms  {name}")
+
+    eager = sorted({name.split(".")[0] for name in last} & set(LAZY))
+    failures = []
+    if median > args.budget_ms:
+        failures.append(f"over the {args.budget_ms:.0f}ms budget")
+    if eager:
+        failures.append(f"imported eagerly: {', '.join(eager)}")
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print(f"OK: within {args.budget_ms:.0f}ms, no eager heavy imports")
+
+
+if __name__ == "__main__":
+    main()
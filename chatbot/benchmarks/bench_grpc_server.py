@@ -0,0 +1,216 @@
+"""RPC throughput and latency of the grpc.aio server as clients are added.
+
+Run from the repository root:
+
+    python chatbot/benchmarks/bench_grpc_server.py --clients 50 200 \
+        --llm-ms 300 --seconds 10
+
+The server is ``chatbot/api_endpoint/grpc_service.py`` on one event loop,
+answering through ``main.model`` like the REST routes do (query cache,
+telemetry) with no rephrasings precomputed, so every answer calls the LLM.
+It runs the real Doc2Vec model and search; FAQ answers come from memory
+instead of Postgres, and the LLM is a local fake that answers after
+``--llm-ms``. Clients send ``AddChatRequest`` back to back over
+``--channels`` HTTP/2 connections, cycling through a few questions.
+"""
+
+import argparse
+import asyncio
+import multiprocessing as mp
+import os
+import statistics
+import sys
+import time
+
+from bench_async_ask import free_port, serve_llm, wait_for
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+API_DIR = os.path.abspath(os.path.join(HERE, "..", "api_endpoint"))
+QUERIES = [
+    "how can i log in to my banking account",
+    "how do i reset my password",
+    "what is programming",
+    "how do i open a savings account",
+    "how can i transfer money abroad",
+    "what are the card fees",
+]
+
+
+def use_app(path, llm_port, admission_limit):
+    """Import the app in ``path`` against the fake LLM."""
+    os.environ["GROQ_BASE_URL"] = f"http://127.0.0.1:{llm_port}"
+    # A fixed limit: the adaptive one reacts to the load generator as well.
+    for name in ("ADMISSION_LIMIT", "ADMISSION_MIN_LIMIT", "ADMISSION_MAX_LIMIT"):
+        os.environ[name] = str(admission_limit)
+    os.environ.setdefault("GROQ_API_KEY", "benchmark")
+    os.chdir(path)
+    sys.path.insert(0, path)
+
+
+class Answers:
+    """The FAQ answers, without a database."""
+
+    def __init__(self, count):
+        self.by_id = {i: f"answer {i}" for i in range(count)}
+
+
+class NullExporter:
+    def export(self, records):
+        pass
+
+
+def serve_unified(port, llm_port, admission_limit):
+    """``grpc_service.GrpcServer`` over an engine built like the lifespan's."""
+    use_app(API_DIR, llm_port, admission_limit)
+    import grpc_service
+    import main
+    from utils.admission import AdmissionController
+    from utils.chat_model_work import RefactorModel
+    from utils.index_build import ServingIndex
+    from utils.inference_pool import InferencePool
+    from utils.model_registry import registry
+    from utils.query_cache import QueryCache
+    from utils.telemetry import Telemetry
+
+    search = registry.search()
+    index = ServingIndex.from_positions(
+        registry.load(), search, list(range(len(search)))
+    )
+    telemetry = Telemetry(NullExporter())
+    telemetry.start()
+    main.model.update(
+        Admission=AdmissionController(),
+        FAQStore=Answers(len(search)),
+        Index=index,
+        InferencePool=InferencePool(),
+        QueryCache=QueryCache(),
+        RefactorModel=RefactorModel(),
+        Telemetry=telemetry,
+    )
+
+    async def run():
+        server = grpc_service.GrpcServer(port)
+        await server.start()
+        await server.wait_for_termination()
+
+    asyncio.run(run())
+
+
+def pushback_ms(error, default=100):
+    """The server's ``grpc-retry-pushback-ms`` hint on a refused RPC."""
+    for key, value in error.trailing_metadata() or ():
+        if key == "grpc-retry-pushback-ms":
+            return int(value)
+    return default
+
+
+async def call_loop(stub, request, deadline, latencies):
+    """One client sending ``AddChatRequest`` back to back until ``deadline``.
+
+    A refused RPC waits out the server's pushback like a well-behaved
+    client, a failed one 100ms. Returns the refused and failed counts.
+    """
+    import grpc
+
+    refused = errors = 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            await stub.AddChatRequest(request)
+        except grpc.aio.AioRpcError as e:
+            if e.code() == grpc.StatusCode.RESOURCE_EXHAUSTED:
+                refused += 1
+                await asyncio.sleep(pushback_ms(e) / 1000)
+            else:
+                errors += 1
+                await asyncio.sleep(0.1)
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+    return refused, errors
+
+
+async def load(port, clients, channels, seconds):
+    """``clients`` callers spread over ``channels`` connections."""
+    import chatbot_pb2
+    import chatbot_pb2_grpc
+    import grpc
+
+    # One connection per channel: by default channels to the same target
+    # share one, and its streams are capped by GRPC_MAX_CONCURRENT_STREAMS.
+    options = [("grpc.use_local_subchannel_pool", 1)]
+    opened = [
+        grpc.aio.insecure_channel(f"127.0.0.1:{port}", options=options)
+        for _ in range(channels)
+    ]
+    stubs = [chatbot_pb2_grpc.chatbot_serviceStub(channel) for channel in opened]
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    try:
+        counts = await asyncio.gather(
+            *(
+                call_loop(
+                    stubs[i % channels],
+                    chatbot_pb2.AddRequest(request=QUERIES[i % len(QUERIES)]),
+                    deadline,
+                    latencies,
+                )
+                for i in range(clients)
+            )
+        )
+    finally:
+        for channel in opened:
+            await channel.close()
+    rate = len(latencies) / (time.perf_counter() - start)
+    return rate, latencies, [sum(c) for c in zip(*counts)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--channels", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--llm-ms", type=float, default=300)
+    parser.add_argument("--admission-limit", type=int, default=64)
+    args = parser.parse_args()
+
+    # grpc must not be initialized before a fork.
+    spawn = mp.get_context("spawn")
+    llm_port = free_port()
+    llm = spawn.Process(target=serve_llm, args=(llm_port, args.llm_ms), daemon=True)
+    llm.start()
+    wait_for(llm_port)
+    # The client stubs.
+    sys.path.insert(0, API_DIR)
+    port = free_port()
+    server = spawn.Process(
+        target=serve_unified,
+        args=(port, llm_port, args.admission_limit),
+        daemon=True,
+    )
+    server.start()
+    wait_for(port)
+
+    print(
+        f"fake LLM latency={args.llm_ms:.0f}ms duration={args.seconds:.0f}s "
+        f"channels={args.channels} admission limit={args.admission_limit}"
+    )
+    asyncio.run(load(port, len(QUERIES), 1, 2))  # warm up the caches
+    for clients in args.clients:
+        rps, latencies, (refused, errors) = asyncio.run(
+            load(port, clients, args.channels, args.seconds)
+        )
+        latencies.sort()
+        p99 = latencies[int(0.99 * (len(latencies) - 1))] if latencies else 0
+        print(
+            f"clients={clients:>4}: {rps:7.1f} rpc/s  "
+            f"p50={statistics.median(latencies or [0]):7.1f}ms  "
+            f"p99={p99:7.1f}ms  refused={refused} errors={errors}"
+        )
+    server.terminate()
+    server.join()
+    llm.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Tail latency and cost of hedged LLM requests.
+
+Run from the repository root:
+
+    python chatbot/benchmarks/bench_hedging.py --requests 400 --tail-ratio 0.03
+
+Two local fakes of the OpenAI-compatible chat completions API stand in for
+Groq and LM Studio. The primary usually answers in ``--primary-ms`` but
+takes ``--tail-ms`` for a ``--tail-ratio`` share of requests; the hedge
+always takes ``--hedge-ms``. Each mode sends the same requests, a few at a
+time, and reports latency percentiles and completions sent per request.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+from bench_streaming import start_server
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+
+def tail_llm(ms, tail_ms=None, tail_ratio=0.0, seed=0):
+    """App whose completions take ``ms``, or ``tail_ms`` now and then."""
+    app = FastAPI()
+    app.state.completions = 0
+    rng = random.Random(seed)
+
+    @app.post("/openai/v1/chat/completions")
+    async def completions():
+        app.state.completions += 1
+        slow = tail_ms is not None and rng.random() < tail_ratio
+        await asyncio.sleep((tail_ms if slow else ms) / 1000)
+        return JSONResponse(
+            {
+                "id": "bench",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "bench",
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": "answer"},
+                        "finish_reason": "stop",
+                    }
+                ],
+            }
+        )
+
+    return app
+
+
+async def run(router, requests, concurrency):
+    """Milliseconds each of ``requests`` completions took."""
+    slots = asyncio.Semaphore(concurrency)
+    messages = [{"role": "user", "content": "answer"}]
+
+    async def one():
+        async with slots:
+            start = time.perf_counter()
+            await router.acomplete(messages)
+            return (time.perf_counter() - start) * 1000
+
+    return await asyncio.gather(*(one() for _ in range(requests)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--primary-ms", type=float, default=100)
+    parser.add_argument("--tail-ms", type=float, default=2000)
+    parser.add_argument("--tail-ratio", type=float, default=0.03)
+    parser.add_argument("--hedge-ms", type=float, default=300)
+    args = parser.parse_args()
+
+    primary_app = tail_llm(args.primary_ms, args.tail_ms, args.tail_ratio)
+    hedge_app = tail_llm(args.hedge_ms)
+    primary_port = start_server(primary_app)
+    hedge_port = start_server(hedge_app)
+    os.environ["GROQ_BASE_URL"] = f"http://127.0.0.1:{primary_port}"
+    os.environ["LM_STUDIO"] = f"http://127.0.0.1:{hedge_port}/openai/v1"
+    os.environ.setdefault("GROQ_API_KEY", "benchmark")
+    sys.path.insert(
+        0,
+        os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "api_endpoint")),
+    )
+    from utils.llm_provider import provider
+
+    groq, lm_studio = provider("groq"), provider("lm_studio")
+    print(
+        f"primary={args.primary_ms:.0f}ms ({args.tail_ratio:.0%} at "
+        f"{args.tail_ms:.0f}ms) hedge={args.hedge_ms:.0f}ms "
+        f"requests={args.requests} concurrency={args.concurrency}"
+    )
+    asyncio.run(compare(args, groq, lm_studio, primary_app, hedge_app))
+
+
+async def compare(args, groq, lm_studio, primary_app, hedge_app):
+    """Print latency and cost without and with hedging, in one event loop."""
+    from utils.db_pool import percentile
+    from utils.llm_provider import Router
+
+    # Warm up both connection pools and the primary's latency window.
+    await run(Router(groq), 200, args.concurrency)
+    await run(Router(lm_studio), args.concurrency, args.concurrency)
+
+    for name, router in (("single", Router(groq)), ("hedged", Router(groq, lm_studio))):
+        before = primary_app.state.completions + hedge_app.state.completions
+        samples = await run(router, args.requests, args.concurrency)
+        sent = primary_app.state.completions + hedge_app.state.completions - before
+        delay = router.primary.hedge_delay() * 1000 if router.hedge else None
+        print(
+            f"{name:>6}: p50={statistics.median(samples):7.1f}ms  "
+            f"p95={percentile(samples, 0.95):7.1f}ms  "
+            f"p99={percentile(samples, 0.99):7.1f}ms  "
+            f"completions/request={sent / args.requests:.2f}"
+            + (f"  hedge delay={delay:.0f}ms" if delay else "")
+        )
+
+
+if __name__ == "__main__":
+    main()
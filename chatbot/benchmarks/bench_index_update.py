@@ -0,0 +1,142 @@
+"""Cost of applying FAQ changes to a live index vs the corpus size.
+
+Run from the repository root:
+
+    python chatbot/benchmarks/bench_index_update.py --sizes 10000 100000 500000
+
+For each size a version is built from random vectors, with the committed
+Doc2Vec model as its model. The benchmark then reports:
+
+- the time to apply ``--changes`` edited rows to the live index (one
+  inference each);
+- search latency with an empty delta and with that many changes pending;
+- the time ``compact`` needs to fold them into a new version;
+- a full re-inference of the corpus, estimated from the per-row cost.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(
+    0,
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "api_endpoint")),
+)
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+from utils import index_build  # noqa: E402
+from utils.index_build import ServingIndex  # noqa: E402
+from utils.live_index import IndexUpdater, question_hash  # noqa: E402
+from utils.vector_search import normalize  # noqa: E402
+
+MODEL = os.path.join(os.path.dirname(__file__), "..", "api_endpoint", "utils")
+
+
+def write_version(out, model, size, dim, rng):
+    """A version of ``size`` random rows, written like ``build`` would."""
+    ids = np.arange(1, size + 1, dtype=np.int64)
+    questions = [f"question {i}" for i in ids]
+    tmp = os.path.join(out, "v1")
+    os.makedirs(tmp)
+    model.save(os.path.join(tmp, index_build.MODEL_FILE), sep_limit=0)
+    np.save(os.path.join(tmp, "vectors.npy"), normalize(rng.normal(size=(size, dim))))
+    np.save(os.path.join(tmp, "ids.npy"), ids)
+    hashes = np.array([question_hash(q) for q in questions], dtype=np.uint64)
+    np.save(os.path.join(tmp, "hashes.npy"), hashes)
+    meta = {
+        "format": index_build.FORMAT_VERSION,
+        "version": "v1",
+        "mode": "infer",
+        "count": size,
+        "checksum": index_build.checksum(tmp),
+    }
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    index_build.publish(out, "v1")
+    return list(zip(ids.tolist(), questions))
+
+
+def search_ms(index, queries):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search.search(query, k=1)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--changes", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    from gensim.models.doc2vec import Doc2Vec
+
+    model = Doc2Vec.load(os.path.join(MODEL, "doc2vec_model.model"))
+    rng = np.random.default_rng(0)
+    queries = rng.normal(size=(args.queries, model.vector_size))
+    print(f"changes={args.changes} model epochs={model.epochs}")
+    for size in args.sizes:
+        out = tempfile.mkdtemp()
+        try:
+            rows = write_version(out, model, size, model.vector_size, rng)
+            index = ServingIndex.load_current(out, verify=False)
+            before = search_ms(index, queries)
+
+            # Half edits of existing questions, half new rows, some deletes.
+            half = args.changes // 2
+            changed = [(i, f"edited question {i}") for i, _ in rows[:half]]
+            added = [(size + i, f"new question {i}") for i in range(half)]
+            updater = IndexUpdater(index, str.split)
+            start = time.perf_counter()
+            updater.update(changed + added, deleted=[rows[-1][0]])
+            update = time.perf_counter() - start
+            after = search_ms(index, queries)
+
+            table = changed + rows[half:-1] + added
+            start = time.perf_counter()
+            conn = FakeConnection(table)
+            index_build.compact(out, lambda: conn, keep=1, tokenize=str.split)
+            compact = time.perf_counter() - start
+
+            per_row = update / max(1, len(changed) + len(added))
+            print(
+                f"rows={size:>8}: update={update * 1000:8.1f}ms "
+                f"({per_row * 1000:.1f}ms/row)  search p50 "
+                f"{before:.3f}ms -> {after:.3f}ms  compact={compact:6.2f}s  "
+                f"full re-infer~{per_row * size:8.0f}s"
+            )
+        finally:
+            shutil.rmtree(out)
+
+
+class FakeConnection:
+    """Just enough of a DB-API connection for ``read_faq``."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql):
+        pass
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Inference epochs vs latency and top-1 stability, to choose INFER_EPOCHS.
+
+Run from the repository root:
+
+    python chatbot/benchmarks/bench_infer_epochs.py --epochs 5 20 50 100 1000
+
+Every query is inferred with ``--seeds`` different seeds at each epoch
+count, against the committed model, and searched at k=1. Per setting it
+reports:
+
+- p50 latency of one inference;
+- ``stable``: the share of (query, seed) pairs whose top-1 FAQ is the
+  query's most common top-1 at the largest epoch count;
+- ``flips``: the share of queries where seeds disagree on clearing the 0.8
+  answer threshold;
+- ``own``: the share of the FAQ questions themselves whose top-1 is their
+  own FAQ.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+sys.path.insert(
+    0,
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "api_endpoint")),
+)
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+from utils.doc2vec_runtime import Doc2VecRuntime, initial_vector  # noqa: E402
+from utils.vector_search import VectorSearch  # noqa: E402
+
+RUNTIME = os.path.join(
+    os.path.dirname(__file__), "..", "api_endpoint", "utils", "doc2vec_model.runtime"
+)
+THRESHOLD = 0.8
+# The FAQ questions the committed model was trained on, in tag order.
+FAQ = [
+    "how do i open a mobile banking account ?",
+    "can i have multiple accounts linked to the same app ?",
+    "how do i reset my password ?",
+    "is mobile banking safe to use ?",
+    "what should i do if i suspect fraudulent activity ?",
+    "does the app store my card details ?",
+    "how do i transfer money to another bank account ?",
+    "is there a transfer limit ?",
+    "can i schedule recurring payments ?",
+    "does the app work without internet ?",
+    "how do i update the app ?",
+    "can i use the app on multiple devices ?",
+    "what should i do if the app crashes ?",
+    "why am i not receiving otps ?",
+    "how can i contact customer support ?",
+]
+PARAPHRASES = [
+    "how can i open an account ?",
+    "i want to reset my password",
+    "how to transfer money to another bank ?",
+    "is the app safe ?",
+    "the app crashes what should i do ?",
+    "i am not receiving otps",
+    "how do i contact support ?",
+    "can i use the app without internet ?",
+    "is there a limit on transfers ?",
+    "can i link multiple accounts ?",
+]
+
+
+def top1(runtime, search, words, epochs, seed):
+    vector = runtime.infer_vector(
+        words,
+        epochs=epochs,
+        rng=np.random.RandomState(seed),
+        init=initial_vector(runtime.vector_size, seed),
+    )
+    return search.search(vector, k=1)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--epochs", type=int, nargs="+", default=[5, 10, 20, 50, 100, 200, 500, 1000]
+    )
+    parser.add_argument("--seeds", type=int, default=10)
+    args = parser.parse_args()
+
+    runtime = Doc2VecRuntime.load(RUNTIME)
+    search = VectorSearch.from_model(runtime)
+    queries = [q.split() for q in FAQ + PARAPHRASES]
+    seeds = range(args.seeds)
+
+    runs = {}
+    for epochs in sorted(args.epochs):
+        times, results = [], []
+        for words in queries:
+            row = []
+            for seed in seeds:
+                start = time.perf_counter()
+                row.append(top1(runtime, search, words, epochs, seed))
+                times.append((time.perf_counter() - start) * 1000)
+            results.append(row)
+        runs[epochs] = (statistics.median(times), results)
+
+    # Reference answer of each query: its most common top-1 at the most epochs.
+    reference = [
+        Counter(tag for tag, _ in row).most_common(1)[0][0]
+        for row in runs[max(runs)][1]
+    ]
+    print(f"{len(queries)} queries x {args.seeds} seeds, model epochs {runtime.epochs}")
+    for epochs, (p50, results) in runs.items():
+        stable = np.mean(
+            [tag == ref for row, ref in zip(results, reference) for tag, _ in row]
+        )
+        flips = np.mean(
+            [len({score >= THRESHOLD for _, score in row}) > 1 for row in results]
+        )
+        own = np.mean([row[0][0] == tag for tag, row in enumerate(results[: len(FAQ)])])
+        print(
+            f"epochs={epochs:>5}: p50 {p50:7.2f}ms  stable {stable:6.1%}  "
+            f"flips {flips:6.1%}  own {own:6.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
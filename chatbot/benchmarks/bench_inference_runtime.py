@@ -0,0 +1,115 @@
+"""gensim vs the NumPy runtime: cold start, memory and per-query latency.
+
+Run from the repository root:
+
+    python chatbot/benchmarks/bench_inference_runtime.py --runs 5
+
+Each cold start is a fresh interpreter that imports the library, loads the
+committed model (``doc2vec_model.model`` or its ``doc2vec_model.runtime``
+export) and infers one vector; it reports the wall time of those steps and
+the process's peak RSS. A bare ``import numpy`` interpreter is the
+baseline. Latency is the median ``infer_vector`` time in this process at
+the model's own epochs.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+UTILS = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "api_endpoint", "utils")
+)
+MODEL = os.path.join(UTILS, "doc2vec_model.model")
+RUNTIME = os.path.join(UTILS, "doc2vec_model.runtime")
+QUESTIONS = [
+    "how can i login to the app ?",
+    "how do i open an account",
+    "what is programming",
+    "how can i transfer money to my friend",
+]
+
+# utils/__init__ pulls in the LLM clients; load the runtime module on its own.
+LOAD_RUNTIME = f"""
+import importlib.util
+spec = importlib.util.spec_from_file_location(
+    "doc2vec_runtime", {os.path.join(UTILS, "doc2vec_runtime.py")!r}
+)
+doc2vec_runtime = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(doc2vec_runtime)
+model = doc2vec_runtime.Doc2VecRuntime.load({RUNTIME!r})
+"""
+LOAD_GENSIM = f"""
+from gensim.models.doc2vec import Doc2Vec
+model = Doc2Vec.load({MODEL!r})
+"""
+COLD = """
+import json, resource, time
+start = time.perf_counter()
+import numpy
+{load}
+if {infer}:
+    model.infer_vector("how can i login to the app ?".split())
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}}))
+"""
+
+
+def cold_start(load, infer, runs):
+    samples = []
+    for _ in range(runs):
+        code = COLD.format(load=load, infer=infer)
+        out = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return (
+        statistics.median(s["seconds"] for s in samples) * 1000,
+        statistics.median(s["rss_mb"] for s in samples),
+    )
+
+
+def latency(model, repeats):
+    samples = []
+    for _ in range(repeats):
+        for question in QUESTIONS:
+            start = time.perf_counter()
+            model.infer_vector(question.split())
+            samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=25)
+    args = parser.parse_args()
+
+    seconds, rss = cold_start("", False, args.runs)
+    print(f"{'numpy only':>14}: start {seconds:7.1f}ms  peak RSS {rss:6.1f}MB")
+    for name, load in (("gensim", LOAD_GENSIM), ("numpy runtime", LOAD_RUNTIME)):
+        seconds, rss = cold_start(load, True, args.runs)
+        print(f"{name:>14}: start {seconds:7.1f}ms  peak RSS {rss:6.1f}MB")
+
+    from gensim.models.doc2vec import Doc2Vec
+
+    sys.path.insert(0, os.path.dirname(UTILS))
+    os.environ.setdefault("GROQ_API_KEY", "benchmark")
+    from utils.doc2vec_runtime import Doc2VecRuntime
+
+    model = Doc2Vec.load(MODEL)
+    runtime = Doc2VecRuntime.load(RUNTIME)
+    print(
+        f"infer_vector p50 at {model.epochs} epochs: "
+        f"gensim {latency(model, args.repeats):.2f}ms  "
+        f"numpy runtime {latency(runtime, args.repeats):.2f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
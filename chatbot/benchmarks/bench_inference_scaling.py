@@ -0,0 +1,93 @@
+"""Inference throughput by thread and worker-process count.
+
+Run from the repository root:
+
+    python chatbot/benchmarks/bench_inference_scaling.py --counts 1 2 4 8 16
+
+For each count ``n`` the same query batches go through
+``VectorCache.infer_many`` from ``n`` client threads, first with inference
+in those threads, then with ``n`` ``InferenceWorkers`` processes doing it.
+The cache is disabled so every query is inferred. It reports queries per
+second and the speedup and per-core efficiency over ``n=1``; near-linear
+scaling needs at least ``n`` free cores.
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(
+    0,
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "api_endpoint")),
+)
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+from utils.doc2vec_runtime import Doc2VecRuntime  # noqa: E402
+from utils.inference_workers import InferenceWorkers  # noqa: E402
+from utils.vector_cache import VectorCache  # noqa: E402
+
+RUNTIME = os.path.join(
+    os.path.dirname(__file__), "..", "api_endpoint", "utils", "doc2vec_model.runtime"
+)
+QUESTIONS = [
+    "how can i login to the app ?",
+    "how do i open an account",
+    "how can i transfer money to my friend",
+    "i am not receiving otps",
+    "is there a limit on transfers ?",
+    "how do i contact support ?",
+]
+
+
+def throughput(cache, model, batches, clients):
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        start = time.perf_counter()
+        for vectors in pool.map(lambda b: cache.infer_many(model, b), batches):
+            assert not any(isinstance(v, Exception) for v in vectors)
+        elapsed = time.perf_counter() - start
+    return sum(len(batch) for batch in batches) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--queries", type=int, default=960)
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--epochs", type=int, default=0, help="0: the model's own")
+    args = parser.parse_args()
+
+    model = Doc2VecRuntime.load(RUNTIME)
+    # A number per query changes its seed, so no two are the same inference.
+    queries = [
+        QUESTIONS[i % len(QUESTIONS)].split() + [str(i)] for i in range(args.queries)
+    ]
+    batches = [queries[i : i + args.batch] for i in range(0, len(queries), args.batch)]
+    cache = VectorCache(size=0, epochs=args.epochs)
+    print(
+        f"{args.queries} queries in batches of {args.batch}, "
+        f"{os.cpu_count()} CPUs, epochs {cache.epochs or model.epochs}"
+    )
+
+    base = {}
+    for n in sorted(args.counts):
+        cache.workers = None
+        threads = throughput(cache, model, batches, n)
+        cache.workers = InferenceWorkers(processes=n)
+        try:
+            processes = throughput(cache, model, batches, n)
+        finally:
+            cache.workers.shutdown()
+        base.setdefault("threads", threads)
+        base.setdefault("processes", processes)
+        speedup = processes / base["processes"]
+        print(
+            f"n={n:>3}: threads {threads:8.1f} q/s ({threads / base['threads']:4.2f}x)"
+            f"  processes {processes:8.1f} q/s ({speedup:4.2f}x,"
+            f" {speedup / n:4.0%} per core)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Exact and lexical matching before Doc2Vec vs always inferring.
+
+Run from the repository root:
+
+    python chatbot/benchmarks/bench_lexical_match.py --sizes 1000 10000 100000
+
+For each faq table size the questions are 4-10 words drawn with Zipf
+frequencies from the committed model's vocabulary, most frequent first,
+followed by ``--vocab`` made-up rare terms (the model knows only a few
+dozen words; Doc2Vec ignores the others). The search matrix is random,
+only its cost matters here. Queries are a mix of:
+
+- ``verbatim``: copies of a row with other casing and punctuation;
+- ``reworded``: a row with its words shuffled, or one dropped or replaced
+  by a frequent word;
+- ``novel``: words that make up no row.
+
+``always infer`` runs the real tokenizer, ``infer_vector`` and a top-1
+search for every query. ``lexical first`` tries ``LexicalIndex.match``
+and infers only on a miss. Reports how often each path answered,
+latency per path, and how many lexical answers were the row the query
+came from.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+API_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "api_endpoint"))
+sys.path.insert(0, API_DIR)
+
+from utils.index_build import tokenize  # noqa: E402
+from utils.lexical_index import LexicalIndex  # noqa: E402
+from utils.model_registry import registry  # noqa: E402
+from utils.vector_search import VectorSearch, normalize  # noqa: E402
+
+
+def sentence(words, rng):
+    """4-10 words; their ranks follow a Zipf law like real text."""
+    weights = 1.0 / np.arange(1, len(words) + 1)
+    return " ".join(
+        rng.choice(words, size=rng.integers(4, 11), p=weights / weights.sum())
+    )
+
+
+def faq_rows(words, size, rng):
+    return [(i, sentence(words, rng)) for i in range(size)]
+
+
+def make_queries(rows, words, count, rng):
+    """``(kind, query, source faq id)`` in equal parts."""
+    queries = []
+    for n in range(count):
+        faq_id, question = rows[rng.integers(len(rows))]
+        kind = ("verbatim", "reworded", "novel")[n % 3]
+        if kind == "verbatim":
+            text = question.capitalize() + rng.choice(["?", "", " ?", "!"])
+        elif kind == "reworded":
+            parts = question.split()
+            edit = rng.integers(3)
+            if edit == 0:
+                rng.shuffle(parts)
+            elif edit == 1:
+                parts.pop(rng.integers(len(parts)))
+            else:
+                parts[rng.integers(len(parts))] = words[rng.integers(20)]
+            text = " ".join(parts)
+        else:
+            text = sentence(words, rng)
+            faq_id = None
+        queries.append((kind, text, faq_id))
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--vocab", type=int, default=5000)
+    parser.add_argument("--min-score", type=float, default=None)
+    args = parser.parse_args()
+
+    os.chdir(API_DIR)
+    model = registry.load()
+    # The NumPy runtime or gensim, whichever the registry serves.
+    vocab = getattr(model, "wv", model).index_to_key
+    words = [word for word in vocab if word.isalnum()]
+    known = len(words)
+    words += [f"term{i}" for i in range(args.vocab)]
+    dim = model.vector_size
+    rng = np.random.default_rng(0)
+    tokenize("warm up")
+    print(
+        f"vocabulary={known} model words + {args.vocab} rare terms, "
+        f"{args.queries} queries per size"
+    )
+
+    for size in args.sizes:
+        rows = faq_rows(words, size, rng)
+        start = time.perf_counter()
+        settings = {} if args.min_score is None else {"min_score": args.min_score}
+        lexical = LexicalIndex(**settings)
+        lexical.update(rows, full=True)
+        build_ms = (time.perf_counter() - start) * 1000
+        search = VectorSearch(
+            normalize(rng.normal(size=(size, dim)).astype(np.float32)),
+            np.arange(size),
+        )
+
+        def infer(text):
+            return search.search(model.infer_vector(tokenize(text)), k=1)
+
+        baseline, paths, right = [], {}, {"exact": 0, "lexical": 0}
+        kinds = {}
+        for kind, text, source in make_queries(rows, words, args.queries, rng):
+            start = time.perf_counter()
+            infer(text)
+            baseline.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            matched = lexical.match(text)
+            if matched is None:
+                path = "vector"
+                infer(text)
+            else:
+                path, pre_dc = matched
+                right[path] += pre_dc[0][0] == source
+            paths.setdefault(path, []).append((time.perf_counter() - start) * 1000)
+            kinds.setdefault(kind, []).append(path)
+
+        total = sum(map(len, paths.values()))
+        fast = sum(sum(samples) for samples in paths.values())
+        print(
+            f"\nrows={size}: lexical index built in {build_ms:.0f}ms, "
+            f"always infer p50={statistics.median(baseline):.2f}ms "
+            f"mean={statistics.mean(baseline):.2f}ms, "
+            f"lexical first mean={fast / total:.2f}ms"
+        )
+        for path in ("exact", "lexical", "vector"):
+            samples = paths.get(path, [])
+            if not samples:
+                continue
+            correct = (
+                f"  right row {right[path]}/{len(samples)}" if path in right else ""
+            )
+            print(
+                f"  {path:>7}: {len(samples) / total:6.1%} of queries  "
+                f"p50={statistics.median(samples):8.3f}ms  "
+                f"p99={sorted(samples)[int(0.99 * (len(samples) - 1))]:8.3f}ms"
+                f"{correct}"
+            )
+        for kind, taken in kinds.items():
+            hits = sum(path != "vector" for path in taken)
+            print(
+                f"  {kind:>9} queries answered without inference: {hits / len(taken):.0%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Per-request latency and per-worker memory: Doc2Vec.load per request vs registry.
+
+Run from the repository root:
+
+    python chatbot/benchmarks/bench_model_registry.py --requests 200 --workers 4
+
+``--synthetic-docs`` trains a throwaway model with that many documents so the
+memory effect of mmap is visible; the committed FAQ model is only ~60KB.
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# utils/__init__ builds the Groq client on import; no request reaches it here.
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "api_endpoint"))
+)
+
+from gensim.models.doc2vec import Doc2Vec, TaggedDocument  # noqa: E402
+from utils.model_registry import ModelRegistry  # noqa: E402
+
+QUERY = "how can i log in to my banking account"
+
+
+def memory_kb():
+    """Return (RSS, PSS) of the current process in kB."""
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key] = int(rest.split()[0])
+    return values.get("Rss", 0), values.get("Pss", 0)
+
+
+def answer(model):
+    """Run the request-path work that depends on the model."""
+    vector = model.infer_vector(QUERY.split())
+    return model.dv.most_similar([vector], topn=len(model.dv))
+
+
+def run(mode, path, requests):
+    """Serve ``requests`` queries and return per-request latencies in ms."""
+    registry = ModelRegistry()
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        model = Doc2Vec.load(path) if mode == "before" else registry.load(path)
+        answer(model)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def worker(mode, path, requests, barrier, queue):
+    """One serving worker; reports memory while all workers are alive."""
+    latencies = run(mode, path, requests)
+    barrier.wait()
+    queue.put((latencies, memory_kb()))
+    barrier.wait()
+
+
+def synthetic_model(docs, directory):
+    """Train a small-epoch model over ``docs`` random documents."""
+    import random
+
+    rng = random.Random(0)
+    vocab = [f"w{i}" for i in range(20000)]
+    corpus = [
+        TaggedDocument([rng.choice(vocab) for _ in range(12)], [str(i)])
+        for i in range(docs)
+    ]
+    model = Doc2Vec(corpus, vector_size=100, window=2, min_count=1, epochs=1)
+    path = os.path.join(directory, "synthetic.model")
+    model.save(path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--model", default="chatbot/api_endpoint/utils/doc2vec_model.model"
+    )
+    parser.add_argument("--synthetic-docs", type=int, default=0)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.model
+        if args.synthetic_docs:
+            path = synthetic_model(args.synthetic_docs, tmp)
+
+        print(f"model={path} size={os.path.getsize(path) / 1024:.0f}kB")
+        ctx = mp.get_context("spawn")
+        for mode in ("before", "after"):
+            barrier = ctx.Barrier(args.workers + 1)
+            queue = ctx.Queue()
+            procs = [
+                ctx.Process(
+                    target=worker, args=(mode, path, args.requests, barrier, queue)
+                )
+                for _ in range(args.workers)
+            ]
+            for p in procs:
+                p.start()
+            barrier.wait()
+            results = [queue.get() for _ in procs]
+            barrier.wait()
+            for p in procs:
+                p.join()
+
+            latencies = sorted(ms for lat, _ in results for ms in lat[1:])
+            rss = statistics.mean(kb for _, (kb, _) in results) / 1024
+            pss = statistics.mean(kb for _, (_, kb) in results) / 1024
+            p95 = latencies[int(len(latencies) * 0.95) - 1]
+            print(
+                f"{mode:>6}: p50={statistics.median(latencies):7.2f}ms "
+                f"p95={p95:7.2f}ms rss/worker={rss:6.1f}MB pss/worker={pss:6.1f}MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Time to first byte vs total latency of streamed and buffered LLM answers.
+
+Run from the repository root:
+
+    python chatbot/benchmarks/bench_streaming.py --tokens 200 --token-ms 15
+
+A local fake of the OpenAI-compatible chat completions API stands in for
+Groq: it waits ``--first-ms`` before the first token and ``--token-ms``
+between tokens, so the numbers only depend on generation speed.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+def fake_llm(tokens, first_ms, token_ms):
+    """App serving ``/openai/v1/chat/completions`` with synthetic tokens."""
+    app = FastAPI()
+
+    def chunk(delta, finish=None):
+        return {
+            "id": "bench",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "bench",
+            "choices": [
+                {"index": 0, "delta": delta, "finish_reason": finish},
+            ],
+        }
+
+    @app.post("/openai/v1/chat/completions")
+    async def completions(request: Request):
+        body = await request.json()
+        words = [f"word{i} " for i in range(tokens)]
+        if not body.get("stream"):
+            await asyncio.sleep((first_ms + token_ms * (tokens - 1)) / 1000)
+            return JSONResponse(
+                {
+                    "id": "bench",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": "bench",
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {
+                                "role": "assistant",
+                                "content": "".join(words),
+                            },
+                            "finish_reason": "stop",
+                        }
+                    ],
+                }
+            )
+
+        async def events():
+            await asyncio.sleep(first_ms / 1000)
+            for i, word in enumerate(words):
+                if i:
+                    await asyncio.sleep(token_ms / 1000)
+                yield f"data: {json.dumps(chunk({'content': word}))}\n\n"
+            yield f"data: {json.dumps(chunk({}, 'stop'))}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def start_server(app):
+    """Run ``app`` on a free local port in a daemon thread."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return port
+
+
+def measure(call):
+    """Return (ms to the first piece of text, ms to the whole answer)."""
+    start = time.perf_counter()
+    first = None
+    for _ in call():
+        if first is None:
+            first = time.perf_counter()
+    end = time.perf_counter()
+    return (first - start) * 1000, (end - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=200)
+    parser.add_argument("--first-ms", type=float, default=150)
+    parser.add_argument("--token-ms", type=float, default=15)
+    parser.add_argument("--requests", type=int, default=10)
+    args = parser.parse_args()
+
+    port = start_server(fake_llm(args.tokens, args.first_ms, args.token_ms))
+    os.environ["GROQ_BASE_URL"] = f"http://127.0.0.1:{port}"
+    os.environ.setdefault("GROQ_API_KEY", "benchmark")
+    sys.path.insert(
+        0,
+        os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "api_endpoint")),
+    )
+    from utils.chat_model_work import RefactorModel
+
+    model = RefactorModel()
+    modes = {
+        "buffered": lambda: [model.model_work("answer")],
+        "streamed": lambda: model.stream_work("answer"),
+    }
+    print(
+        f"tokens={args.tokens} first={args.first_ms:.0f}ms "
+        f"per-token={args.token_ms:.0f}ms requests={args.requests}"
+    )
+    for name, call in modes.items():
+        measure(call)  # warm up the connection
+        samples = [measure(call) for _ in range(args.requests)]
+        ttfb = statistics.median(s[0] for s in samples)
+        total = statistics.median(s[1] for s in samples)
+        print(f"{name:>8}: ttfb p50={ttfb:7.1f}ms  total p50={total:7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Request overhead of MLflow tracking: per-request runs vs sampled telemetry.
+
+Run from the repository root:
+
+    python chatbot/benchmarks/bench_telemetry.py --requests 500 --concurrency 20
+
+Each simulated request awaits ``--work-ms`` (the LLM call) and is then
+tracked the way ``/ask`` used to (an MLflow run with its params, started
+on a worker thread after the response) or the way it does now (a record
+submitted to ``utils/telemetry.py`` and exported in batches by a
+background thread). Both write to a fresh file-based MLflow store in a
+temporary directory. Throughput and per-request latency include the
+tracking, since the old run held a server thread until it finished.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+
+def log_run(mlflow, run_name, **params):
+    """What ``main.log_run`` did for every request before telemetry."""
+    with mlflow.start_run(run_name=run_name, nested=True):
+        mlflow.log_params(params)
+
+
+async def serve(track, requests, concurrency, work_ms):
+    """Requests per second and per-request milliseconds under ``track``."""
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with slots:
+            start = time.perf_counter()
+            await asyncio.sleep(work_ms / 1000)
+            await track(i)
+            return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    samples = await asyncio.gather(*(one(i) for i in range(requests)))
+    return requests / (time.perf_counter() - start), samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--work-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    # Recent MLflow releases only allow the file store when asked to.
+    os.environ.setdefault("MLFLOW_ALLOW_FILE_STORE", "true")
+    sys.path.insert(
+        0,
+        os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "api_endpoint")),
+    )
+    import mlflow
+    from utils.telemetry import MlflowExporter, Record, Telemetry
+
+    store = tempfile.mkdtemp(prefix="bench-telemetry-")
+    mlflow.set_tracking_uri(f"file://{store}")
+    mlflow.set_experiment("bench-telemetry")
+
+    async def untracked(i):
+        pass
+
+    async def per_request_run(i):
+        await asyncio.to_thread(
+            log_run,
+            mlflow,
+            "API_Request_Run",
+            input_query=f"question {i}",
+            model_output="answer",
+            path="llm",
+        )
+
+    def sampled(telemetry):
+        async def track(i):
+            record = Record("ask", input_query=f"question {i}")
+            with record.stage("llm"):
+                pass
+            record.set(faq_id=i, model_output="answer", path="llm")
+            telemetry.submit(record)
+
+        return track
+
+    print(
+        f"requests={args.requests} concurrency={args.concurrency} "
+        f"work={args.work_ms:.0f}ms store={store}"
+    )
+    modes = [("none", untracked, None), ("per-request run", per_request_run, None)]
+    for rate in (1.0, 0.1):
+        telemetry = Telemetry(MlflowExporter("bench-telemetry"), sample_rate=rate)
+        modes.append((f"telemetry {rate:.0%}", sampled(telemetry), telemetry))
+
+    for name, track, telemetry in modes:
+        if telemetry is not None:
+            telemetry.start()
+        rate, samples = asyncio.run(
+            serve(track, args.requests, args.concurrency, args.work_ms)
+        )
+        line = (
+            f"{name:>16}: {rate:7.1f} req/s  "
+            f"p50={statistics.median(samples):7.1f}ms  "
+            f"p99={sorted(samples)[int(len(samples) * 0.99)]:7.1f}ms"
+        )
+        if telemetry is not None:
+            start = time.perf_counter()
+            telemetry.stop()
+            stats = telemetry.stats()
+            line += (
+                f"  exported={stats['exported']} in {stats['batches']} batches "
+                f"(drained {time.perf_counter() - start:.2f}s after the load)"
+            )
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
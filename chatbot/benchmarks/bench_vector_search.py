@@ -0,0 +1,69 @@
+"""Query latency vs FAQ corpus size: full most_similar sort vs top-k VectorSearch.
+
+Run from the repository root:
+
+    python chatbot/benchmarks/bench_vector_search.py --sizes 100 1000 10000 100000 1000000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "api_endpoint"))
+)
+
+from gensim.models import KeyedVectors  # noqa: E402
+from utils.vector_search import VectorSearch, normalize  # noqa: E402
+
+
+def timed(fn, repeat):
+    """Median wall time of ``fn`` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000, 1000000]
+    )
+    parser.add_argument("--dim", type=int, default=100)
+    parser.add_argument("--batch", type=int, default=32)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    queries = rng.normal(size=(args.batch, args.dim)).astype(np.float32)
+    print(
+        f"{'docs':>9} {'most_similar(all)':>18} {'top1':>9} {'top10':>9} "
+        f"{f'batch{args.batch} top1/q':>15}"
+    )
+    for size in args.sizes:
+        vectors = rng.normal(size=(size, args.dim)).astype(np.float32)
+        kv = KeyedVectors(args.dim)
+        kv.add_vectors([str(i) for i in range(size)], vectors)
+        kv.fill_norms()
+        search = VectorSearch(normalize(vectors), np.arange(size))
+        repeat = 3 if size >= 100000 else 20
+
+        before = timed(lambda: kv.most_similar([queries[0]], topn=size), repeat)
+        top1 = timed(lambda: search.search(queries[0], k=1, threshold=0.8), repeat)
+        top10 = timed(lambda: search.search(queries[0], k=10), repeat)
+        batch = timed(lambda: search.search_batch(queries, k=1), repeat) / args.batch
+        print(
+            f"{size:>9} {before:>16.2f}ms {top1:>7.2f}ms {top10:>7.2f}ms "
+            f"{batch:>13.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,14 @@
-import chatbot_pb2
-import chatbot_pb2_grpc
-import grpc
+import os
+import sys
+
+# The generated stubs live next to the server, in chatbot/api_endpoint.
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api_endpoint")
+)
+
+import chatbot_pb2  # noqa: E402
+import chatbot_pb2_grpc  # noqa: E402
+import grpc  # noqa: E402
 
 channel = grpc.insecure_channel("localhost:50051")
 stub = chatbot_pb2_grpc.chatbot_serviceStub(channel)
@@ -9,3 +17,26 @@ text = "How can i log in to banking account?"
 request1 = chatbot_pb2.AddRequest(request=text)
 response = stub.AddChatRequest(request1)
 print(response.response)
+
+for chunk in stub.StreamChatRequest(request1):
+    print(chunk.delta, end="", flush=True)
+print()
+
+batch = chatbot_pb2.BatchRequest(requests=[text, "How do I reset my password?"])
+for item in stub.BatchChatRequest(batch).responses:
+    print(item.error or item.response)
+
+
+def session_questions():
+    """One chat session: questions as the user types them."""
+    questions = [text, "How do I reset my password?", "How can I open an account?"]
+    for i, question in enumerate(questions, 1):
+        yield chatbot_pb2.SessionRequest(id=i, request=question)
+
+
+# Answers may interleave.
+answers = {}
+for chunk in stub.ChatSession(session_questions()):
+    answers[chunk.id] = answers.get(chunk.id, "") + chunk.delta
+    if chunk.done:
+        print(f"[{chunk.id}] {chunk.error or answers[chunk.id]}")
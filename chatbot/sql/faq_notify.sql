@@ -0,0 +1,21 @@
+-- Notify the chatbot FAQ store (utils/faq_store.py) about every faq change.
+-- Payload: {"op": "INSERT" | "UPDATE" | "DELETE", "id": <faq.id>}
+
+CREATE OR REPLACE FUNCTION faq_notify() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify(
+        'faq_changed',
+        json_build_object(
+            'op', TG_OP,
+            'id', CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END
+        )::text
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS faq_notify ON faq;
+
+CREATE TRIGGER faq_notify
+AFTER INSERT OR UPDATE OR DELETE ON faq
+FOR EACH ROW EXECUTE FUNCTION faq_notify();
@@ -0,0 +1,9 @@
+-- Precomputed LLM rephrasings of FAQ answers (utils/rephrase_store.py).
+-- Apply once before the first deploy; serving processes only read it.
+
+CREATE TABLE IF NOT EXISTS faq_rephrased (
+    answer_hash TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    rephrased TEXT NOT NULL,
+    PRIMARY KEY (answer_hash, prompt_version)
+);
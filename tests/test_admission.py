@@ -0,0 +1,159 @@
+"""
+Unit tests for admission control, overloaded by a slow LLM stand-in.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(
+    0,
+    os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "chatbot", "api_endpoint")
+    ),
+)
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+from utils.admission import AdmissionController, Overloaded  # noqa: E402
+
+
+class SlowLLM:
+    """Stands in for the rephrase call; ``seconds`` can change under load."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.calls = 0
+
+    async def rephrase(self, answer):
+        self.calls += 1
+        await asyncio.sleep(self.seconds)
+        return f"polite: {answer}"
+
+    def rephrase_sync(self, answer):
+        self.calls += 1
+        time.sleep(self.seconds)
+        return f"polite: {answer}"
+
+
+async def handler(admission, llm):
+    """What /ask does around the LLM: hold a slot, or fail fast."""
+    start = time.perf_counter()
+    try:
+        async with admission.admit_async():
+            return await llm.rephrase("answer")
+    except Overloaded as e:
+        return e, time.perf_counter() - start
+
+
+class TestAdmission(unittest.TestCase):
+    """Tests for shedding, queueing and the adaptive limit."""
+
+    def test_excess_requests_are_rejected_at_once(self):
+        """Past the limit and the queue, requests fail fast with a retry hint."""
+        admission = AdmissionController(limit=2, queue_size=2, queue_timeout=5)
+        llm = SlowLLM(0.2)
+
+        async def burst():
+            return await asyncio.gather(*(handler(admission, llm) for _ in range(10)))
+
+        results = asyncio.run(burst())
+        rejected = [r for r in results if isinstance(r, tuple)]
+        self.assertEqual(llm.calls, 4)
+        self.assertEqual(len(rejected), 6)
+        for error, seconds in rejected:
+            self.assertLess(seconds, 0.1)
+            self.assertGreaterEqual(error.retry_after, 1)
+        stats = admission.stats()
+        self.assertEqual((stats["admitted"], stats["rejected"]), (4, 6))
+        self.assertGreater(stats["queue_ms_p99"], 100)
+        self.assertEqual(stats["in_flight"], 0)
+
+    def test_queued_requests_give_up_after_the_timeout(self):
+        """Queue age is bounded: a request waits at most ``queue_timeout``."""
+        admission = AdmissionController(limit=1, queue_size=10, queue_timeout=0.05)
+        llm = SlowLLM(0.3)
+
+        async def scenario():
+            first = asyncio.ensure_future(handler(admission, llm))
+            await asyncio.sleep(0.01)
+            self.assertEqual(admission.stats()["queued"], 0)
+            waiting = asyncio.ensure_future(handler(admission, llm))
+            await asyncio.sleep(0.02)
+            self.assertGreater(admission.stats()["queue_age_ms"], 0)
+            return await first, await waiting
+
+        served, (error, seconds) = asyncio.run(scenario())
+        self.assertEqual(served, "polite: answer")
+        self.assertIsInstance(error, Overloaded)
+        self.assertLess(seconds, 0.2)
+        self.assertEqual(admission.stats()["timed_out"], 1)
+
+    def test_limit_shrinks_when_the_llm_slows_down(self):
+        """Latency over twice the baseline cuts the limit, down to the minimum."""
+        admission = AdmissionController(
+            limit=8,
+            min_limit=2,
+            max_limit=8,
+            queue_size=100,
+            queue_timeout=10,
+            window=8,
+        )
+        llm = SlowLLM(0.01)
+
+        async def wave():
+            await asyncio.gather(*(handler(admission, llm) for _ in range(8)))
+
+        asyncio.run(wave())
+        self.assertEqual(admission.limit, 8)
+        llm.seconds = 0.05
+        for _ in range(10):
+            asyncio.run(wave())
+        self.assertEqual(admission.limit, 2)
+
+    def test_limit_grows_back_while_saturated(self):
+        """Steady latency at the limit raises it by one per window."""
+        admission = AdmissionController(limit=2, queue_size=100, window=2)
+        llm = SlowLLM(0.01)
+
+        async def wave():
+            await asyncio.gather(*(handler(admission, llm) for _ in range(6)))
+
+        asyncio.run(wave())
+        self.assertGreater(admission.limit, 2)
+
+    def test_threads_are_shed_the_same_way(self):
+        """Threads use ``admit`` with the same limits."""
+        admission = AdmissionController(limit=1, queue_size=0)
+        llm = SlowLLM(0.2)
+        errors = []
+
+        def call():
+            try:
+                with admission.admit():
+                    llm.rephrase_sync("answer")
+            except Overloaded as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual((llm.calls, len(errors)), (1, 3))
+
+    def test_zero_limit_admits_everything(self):
+        """``ADMISSION_LIMIT=0`` turns shedding off."""
+        admission = AdmissionController(limit=0, queue_size=0)
+        llm = SlowLLM(0.01)
+
+        async def burst():
+            return await asyncio.gather(*(handler(admission, llm) for _ in range(20)))
+
+        self.assertEqual(asyncio.run(burst()), ["polite: answer"] * 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Unit tests for the IVF approximate nearest-neighbour index.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(
+    0,
+    os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "chatbot", "api_endpoint")
+    ),
+)
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+from utils.ann_index import IVFIndex, recall_at_k  # noqa: E402
+from utils.vector_search import VectorSearch, normalize  # noqa: E402
+
+
+class TestIVFIndex(unittest.TestCase):
+    """Tests for building, persisting and querying the IVF index."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        centres = rng.normal(size=(20, 16))
+        labels = rng.integers(0, 20, size=2000)
+        self.matrix = normalize(
+            centres[labels] + rng.normal(scale=0.3, size=(2000, 16))
+        )
+        self.tags = np.arange(2000) + 100
+        self.exact = VectorSearch(self.matrix, self.tags)
+        self.index = IVFIndex.build(self.matrix, self.tags, nlist=20)
+        self.queries = self.matrix[:50] + rng.normal(scale=0.05, size=(50, 16))
+
+    def test_lists_cover_every_vector(self):
+        """Each vector lands in exactly one inverted list."""
+        self.assertEqual(self.index.offsets[-1], 2000)
+        self.assertEqual(sorted(self.index.tags.tolist()), self.tags.tolist())
+
+    def test_probing_every_list_is_exact(self):
+        """With nprobe == nlist the index returns the exact top-k."""
+        recall = recall_at_k(self.index, self.exact, self.queries, k=10, nprobe=20)
+        self.assertEqual(recall, 1.0)
+
+    def test_recall_grows_with_nprobe(self):
+        """Probing more lists never lowers recall."""
+        low = recall_at_k(self.index, self.exact, self.queries, k=10, nprobe=1)
+        high = recall_at_k(self.index, self.exact, self.queries, k=10, nprobe=5)
+        self.assertLessEqual(low, high)
+        self.assertGreater(high, 0.9)
+
+    def test_threshold_and_tags(self):
+        """Results carry the original tags and respect the threshold."""
+        results = self.index.search(self.matrix[3], k=5, threshold=0.999, nprobe=20)
+        self.assertEqual(results[0][0], 103)
+        self.assertTrue(all(score >= 0.999 for _, score in results))
+        exclude = np.asarray(self.index.tags) == 103
+        results = self.index.search(self.matrix[3], k=5, nprobe=20, exclude=exclude)
+        self.assertNotIn(103, [tag for tag, _ in results])
+
+    def test_save_and_load_memory_mapped(self):
+        """A saved index is reopened with read-only memory-mapped vectors."""
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp, "ann_index")
+            self.index.save(path)
+            loaded = IVFIndex.load(path, nprobe=4)
+            self.assertFalse(loaded.vectors.flags.writeable)
+            self.assertEqual(
+                loaded.search_batch(self.queries, k=5),
+                self.index.search_batch(self.queries, k=5, nprobe=4),
+            )
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_save_keeps_the_old_version_until_the_new_one_is_written(self):
+        """A failed save leaves the previous index loadable."""
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp, "ann_index")
+            self.index.save(path)
+            with mock.patch("numpy.save", side_effect=OSError("disk full")):
+                with self.assertRaises(OSError):
+                    self.index.save(path)
+            self.assertEqual(len(IVFIndex.load(path)), len(self.index))
+            self.index.save(path)
+            self.assertEqual(sorted(os.listdir(path)), ["CURRENT", "v2"])
+        finally:
+            shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Unit tests for the LLM circuit breaker.
+"""
+
+import asyncio
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(
+    0,
+    os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "chatbot", "api_endpoint")
+    ),
+)
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+from utils.circuit_breaker import CircuitBreaker, CircuitOpen  # noqa: E402
+
+
+def fail(breaker):
+    try:
+        with breaker.guard():
+            raise ConnectionError("provider down")
+    except ConnectionError:
+        pass
+
+
+def succeed(breaker):
+    with breaker.guard():
+        return "ok"
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Tests for opening, refusing and recovering."""
+
+    def test_opens_after_consecutive_failures(self):
+        """``failures`` errors in a row open it; calls are then refused."""
+        breaker = CircuitBreaker("llm", failures=3, reset=60)
+        fail(breaker)
+        fail(breaker)
+        succeed(breaker)
+        fail(breaker)
+        fail(breaker)
+        self.assertEqual(breaker.state, "closed")
+        fail(breaker)
+        self.assertEqual(breaker.state, "open")
+        with self.assertRaises(CircuitOpen):
+            succeed(breaker)
+        self.assertEqual(breaker.stats()["refused"], 1)
+
+    def test_one_trial_call_after_the_reset(self):
+        """Half-open lets a single call through; its success closes it."""
+        breaker = CircuitBreaker("llm", failures=1, reset=0.05)
+        fail(breaker)
+        time.sleep(0.06)
+        with breaker.guard():
+            self.assertEqual(breaker.state, "half_open")
+            with self.assertRaises(CircuitOpen):
+                succeed(breaker)
+        self.assertEqual(breaker.state, "closed")
+
+    def test_failed_trial_opens_it_again(self):
+        """A failing trial restarts the reset period."""
+        breaker = CircuitBreaker("llm", failures=5, reset=0.05)
+        for _ in range(5):
+            fail(breaker)
+        time.sleep(0.06)
+        fail(breaker)
+        self.assertEqual(breaker.state, "open")
+        self.assertEqual(breaker.stats()["opened"], 2)
+
+    def test_cancelled_call_counts_as_neither(self):
+        """A caller that went away frees the trial without a verdict."""
+        breaker = CircuitBreaker("llm", failures=1, reset=0.05)
+        fail(breaker)
+        time.sleep(0.06)
+
+        async def cancelled():
+            with breaker.guard():
+                await asyncio.sleep(10)
+
+        async def scenario():
+            task = asyncio.ensure_future(cancelled())
+            await asyncio.sleep(0.01)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        asyncio.run(scenario())
+        self.assertEqual(breaker.state, "half_open")
+        self.assertEqual(succeed(breaker), "ok")
+        self.assertEqual(breaker.state, "closed")
+
+
+if __name__ == "__main__":
+    unittest.main()
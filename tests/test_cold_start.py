@@ -0,0 +1,59 @@
+"""
+Unit tests for an offline-safe cold start of the REST app.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+API_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "chatbot", "api_endpoint")
+)
+sys.path.insert(0, API_DIR)
+
+from utils import index_build  # noqa: E402
+
+LAZY = ("dagshub", "gensim", "grpc", "groq", "mlflow", "nltk", "openai", "scipy")
+
+
+class TestColdStart(unittest.TestCase):
+    """Tests that importing the app does no network I/O or heavy imports."""
+
+    def test_import_main_is_lazy_and_offline(self):
+        """``import main`` succeeds with the network unreachable."""
+        code = (
+            "import json, sys, main; "
+            "print(json.dumps(sorted({m.split('.')[0] for m in sys.modules})))"
+        )
+        env = dict(
+            os.environ,
+            GROQ_API_KEY="test",
+            HTTP_PROXY="http://127.0.0.1:9",
+            HTTPS_PROXY="http://127.0.0.1:9",
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=API_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        loaded = set(json.loads(result.stdout.splitlines()[-1]))
+        self.assertEqual(loaded & set(LAZY), set())
+        self.assertNotIn("nltk_data", result.stderr)
+
+    def test_tokenizer_needs_no_download(self):
+        """Single questions tokenize the same with or without punkt data."""
+        self.assertIn(index_build.load_tokenizer(), ("punkt", "treebank"))
+        self.assertEqual(
+            index_build.tokenize("How do I reset my password?"),
+            ["how", "do", "i", "reset", "my", "password", "?"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Unit tests for request deadlines and the LLM fallback they drive.
+"""
+
+import asyncio
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(
+    0,
+    os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "chatbot", "api_endpoint")
+    ),
+)
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+from utils import chat_model_work  # noqa: E402
+from utils.chat_model_work import RefactorModel  # noqa: E402
+from utils.circuit_breaker import CircuitBreaker, CircuitOpen  # noqa: E402
+from utils.deadline import Deadline, DeadlineExceeded  # noqa: E402
+from utils.llm_provider import llm_timeout  # noqa: E402
+
+
+class Completions:
+    """Stands in for the provider's ``async_client.chat.completions``."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.timeouts = []
+
+    async def create(self, timeout=None, **args):
+        self.timeouts.append(timeout)
+        await asyncio.sleep(self.seconds)
+        message = type("Message", (), {"content": "polite"})
+        choice = type("Choice", (), {"message": message})
+        return type("Completion", (), {"choices": [choice]})
+
+
+class TestDeadline(unittest.TestCase):
+    """Tests for the budget and how the LLM stage uses it."""
+
+    def setUp(self):
+        self.provider = chat_model_work.llm.primary
+        self.connect = self.provider._connect
+        self.breaker = self.provider.breaker
+        self.provider.breaker = CircuitBreaker("test", failures=1, reset=60)
+
+    def tearDown(self):
+        self.provider._connect = self.connect
+        self.provider.breaker = self.breaker
+
+    def use_llm(self, seconds):
+        completions = Completions(seconds)
+        chat = type("Chat", (), {"completions": completions})
+        client = type("Client", (), {"chat": chat})
+        self.provider._connect = lambda provider, asynchronous: client
+        return completions
+
+    def test_stage_gets_what_is_left(self):
+        """Timeouts shrink as the budget is spent, capped per stage."""
+        deadline = Deadline(0.5)
+        self.assertAlmostEqual(deadline.timeout("llm"), 0.5, delta=0.05)
+        self.assertEqual(deadline.timeout("database", cap=0.1), 0.1)
+        self.assertLessEqual(llm_timeout(deadline), 0.5)
+        time.sleep(0.5)
+        with self.assertRaises(DeadlineExceeded) as caught:
+            deadline.timeout("llm")
+        self.assertEqual(caught.exception.stage, "llm")
+
+    def test_slow_stage_raises_deadline_exceeded(self):
+        """``run`` stops waiting when the budget runs out."""
+        deadline = Deadline(0.05)
+        start = time.perf_counter()
+        with self.assertRaises(DeadlineExceeded):
+            asyncio.run(deadline.run("inference", asyncio.sleep(1)))
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+    def test_llm_call_is_bounded_by_the_deadline(self):
+        """The completion gets the remaining budget as its timeout."""
+        completions = self.use_llm(0.0)
+        answer = asyncio.run(RefactorModel().amodel_work("a", Deadline(2)))
+        self.assertEqual(answer, "polite")
+        self.assertLessEqual(completions.timeouts[0], 2)
+
+    def test_slow_llm_misses_the_deadline(self):
+        """The caller gives up at the deadline, not when the LLM answers."""
+        self.use_llm(1.0)
+        start = time.perf_counter()
+        with self.assertRaises(DeadlineExceeded):
+            asyncio.run(RefactorModel().amodel_work("b", Deadline(0.1)))
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+    def test_open_circuit_refuses_without_calling(self):
+        """After a failure (``failures=1``) the LLM is not called again."""
+        completions = self.use_llm(0.0)
+        completions.create = None  # calling it raises TypeError
+        with self.assertRaises(TypeError):
+            asyncio.run(RefactorModel().amodel_work("c"))
+        with self.assertRaises(CircuitOpen):
+            asyncio.run(RefactorModel().amodel_work("c"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Unit tests for the NumPy Doc2Vec inference runtime.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+CHATBOT_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "chatbot", "api_endpoint")
+)
+sys.path.insert(0, CHATBOT_DIR)
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+from gensim.models.doc2vec import Doc2Vec, TaggedDocument  # noqa: E402
+from gensim.models.keyedvectors import pseudorandom_weak_vector  # noqa: E402
+from utils.doc2vec_runtime import Doc2VecRuntime, export  # noqa: E402
+from utils.model_registry import ModelRegistry  # noqa: E402
+
+MODEL = os.path.join(CHATBOT_DIR, "utils", "doc2vec_model.model")
+EXPORTS = [os.path.join(CHATBOT_DIR, "utils", "doc2vec_model.runtime")]
+QUESTIONS = [
+    "how can i login to the app ?",
+    "how do i open an account",
+    "transfer money to my friend",
+    "words the model never saw",
+]
+
+
+class TestDoc2VecRuntime(unittest.TestCase):
+    """Tests for parity with gensim, determinism and the export format."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.model = Doc2Vec.load(MODEL)
+        cls.runtime = Doc2VecRuntime.from_model(cls.model)
+
+    def test_matches_gensim_infer_vector(self):
+        """Given gensim's random draws, inference reproduces its vectors."""
+        for question in QUESTIONS:
+            words = question.split()
+            self.model.random = np.random.RandomState(7)
+            expected = self.model.infer_vector(words)
+            init = pseudorandom_weak_vector(
+                self.model.vector_size, seed_string=" ".join(words)
+            )
+            vector = self.runtime.infer_vector(
+                words, rng=np.random.RandomState(7), init=init
+            )
+            np.testing.assert_allclose(vector, expected, atol=1e-4)
+
+    def test_inference_is_deterministic(self):
+        """The same words always give the same vector."""
+        words = QUESTIONS[0].split()
+        first = self.runtime.infer_vector(words, epochs=50)
+        self.runtime.infer_vector(QUESTIONS[1].split(), epochs=50)
+        np.testing.assert_array_equal(
+            first, self.runtime.infer_vector(words, epochs=50)
+        )
+
+    def test_committed_exports_match_the_model(self):
+        """The exported runtimes are current with doc2vec_model.model."""
+        for path in EXPORTS:
+            exported = Doc2VecRuntime.load(path)
+            self.assertEqual(exported.config, self.runtime.config)
+            self.assertEqual(exported.index_to_key, self.runtime.index_to_key)
+            np.testing.assert_array_equal(exported.syn1neg, self.runtime.syn1neg)
+            np.testing.assert_array_equal(exported.dv.vectors, self.runtime.dv.vectors)
+
+    def test_export_round_trip_through_the_registry(self):
+        """An exported directory is served read-only by the registry."""
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        path = export(self.model, os.path.join(tmp, "model.runtime"))
+        registry = ModelRegistry()
+        loaded = registry.load(path)
+        self.assertIsInstance(loaded, Doc2VecRuntime)
+        self.assertFalse(loaded.word_vectors.flags.writeable)
+        words = QUESTIONS[1].split()
+        np.testing.assert_array_equal(
+            loaded.infer_vector(words, epochs=20),
+            self.runtime.infer_vector(words, epochs=20),
+        )
+        search = registry.search(path)
+        self.assertEqual(len(search), len(self.model.dv))
+        # Exported with the model, so serving only maps it.
+        self.assertFalse(search.matrix.flags.writeable)
+
+    def test_only_pv_dm_negative_sampling_is_exported(self):
+        """Model types the runtime does not implement are refused."""
+        documents = [
+            TaggedDocument(q.split(), [str(i)]) for i, q in enumerate(QUESTIONS)
+        ]
+        dbow = Doc2Vec(documents, dm=0, vector_size=8, min_count=1, epochs=1)
+        with self.assertRaises(ValueError):
+            Doc2VecRuntime.from_model(dbow)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Unit tests for the in-memory FAQ store, using SQLite as the database.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(
+    0,
+    os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "chatbot", "api_endpoint")
+    ),
+)
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+from utils.faq_store import FAQStore  # noqa: E402
+
+
+class TestFAQStore(unittest.TestCase):
+    """Tests for loading and refreshing the FAQ store."""
+
+    def setUp(self):
+        """Create a small faq table in a temporary SQLite file."""
+        fd, self.path = tempfile.mkstemp(suffix=".sqlite")
+        os.close(fd)
+        self.execute(
+            "CREATE TABLE faq (id INTEGER PRIMARY KEY, question TEXT, "
+            "answer TEXT, updated_at INTEGER)"
+        )
+        self.execute(
+            "INSERT INTO faq VALUES (2, 'q2', 'a2', 1), (1, 'q1', 'a1', 1), "
+            "(3, 'q3', 'a3', 1)"
+        )
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def connect(self):
+        return sqlite3.connect(self.path)
+
+    def execute(self, sql, params=()):
+        conn = self.connect()
+        with conn:
+            conn.execute(sql, params)
+        conn.close()
+
+    def test_load_orders_rows_by_id(self):
+        """Positions follow the primary key, not the scan order."""
+        store = FAQStore(self.connect)
+        store.load()
+        self.assertEqual(store.ids.tolist(), [1, 2, 3])
+        self.assertEqual(store.answers, ["a1", "a2", "a3"])
+
+    def test_refresh_is_noop_without_changes(self):
+        """An unchanged table costs one fingerprint query."""
+        store = FAQStore(self.connect)
+        store.load()
+        self.assertFalse(store.refresh())
+
+    def test_polling_without_version_column_sees_edits(self):
+        """Edits keep the row count and max id; the content digest changes."""
+        store = FAQStore(self.connect)
+        store.load()
+        self.execute("UPDATE faq SET answer = 'a2 new' WHERE id = 2")
+        self.assertTrue(store.refresh())
+        self.assertEqual(store.answers, ["a1", "a2 new", "a3"])
+        self.assertFalse(store.refresh())
+
+    def test_incremental_refresh_with_version_column(self):
+        """Only rows newer than the last version are applied."""
+        store = FAQStore(self.connect, version_column="updated_at")
+        store.load()
+        self.execute("UPDATE faq SET answer = 'a2 new', updated_at = 2 WHERE id = 2")
+        self.execute("INSERT INTO faq VALUES (4, 'q4', 'a4', 2)")
+        self.assertTrue(store.refresh())
+        self.assertEqual(store.answers, ["a1", "a2 new", "a3", "a4"])
+        self.assertEqual(store.ids.tolist(), [1, 2, 3, 4])
+
+    def test_refresh_reloads_after_delete(self):
+        """Deletes are picked up by the row count in the fingerprint."""
+        store = FAQStore(self.connect, version_column="updated_at")
+        store.load()
+        self.execute("DELETE FROM faq WHERE id = 1")
+        self.assertTrue(store.refresh())
+        self.assertEqual(store.answers, ["a2", "a3"])
+        self.assertEqual(store.by_id, {2: "a2", 3: "a3"})
+
+    def test_notifications_update_and_tombstone(self):
+        """NOTIFY payloads upsert single rows and tombstone deletes."""
+        store = FAQStore(self.connect)
+        store.load()
+        self.execute("UPDATE faq SET answer = 'a3 new' WHERE id = 3")
+        conn = self.connect()
+        store.apply_notification(conn, json.dumps({"op": "UPDATE", "id": 3}))
+        store.apply_notification(conn, json.dumps({"op": "DELETE", "id": 1}))
+        conn.close()
+        self.assertEqual(store.answers, [None, "a2", "a3 new"])
+        self.assertEqual(store.by_id, {2: "a2", 3: "a3 new"})
+
+    def test_polls_after_notifications_stay_incremental(self):
+        """A change applied from NOTIFY does not look new to the next poll."""
+        store = FAQStore(self.connect, version_column="updated_at")
+        store.load()
+        changes = []
+        store.on_change = lambda rows, deleted, full: changes.append(full)
+        self.execute("UPDATE faq SET question = 'q3 new', updated_at = 2 WHERE id = 3")
+        self.execute("DELETE FROM faq WHERE id = 1")
+        conn = self.connect()
+        store.apply_notification(conn, json.dumps({"op": "UPDATE", "id": 3}))
+        store.apply_notification(conn, json.dumps({"op": "DELETE", "id": 1}))
+        conn.close()
+        self.assertFalse(store.refresh())
+        self.assertEqual((changes, store.refreshes), ([False, False], 1))
+        self.execute("INSERT INTO faq VALUES (4, 'q4', 'a4', 3)")
+        self.assertTrue(store.refresh())
+        self.assertEqual(changes, [False, False, False])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,377 @@
+"""
+Unit tests for the grpc.aio service over the REST app's shared engine.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+import numpy as np
+from pydantic import ValidationError
+
+sys.path.insert(
+    0,
+    os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "chatbot", "api_endpoint")
+    ),
+)
+os.environ.setdefault("GROQ_API_KEY", "test")
+PROTO_DIR = os.path.join(os.path.dirname(__file__), "..", "chatbot", "gRPC")
+
+import chatbot_pb2  # noqa: E402
+import chatbot_pb2_grpc  # noqa: E402
+import grpc  # noqa: E402
+import grpc_service  # noqa: E402
+import main  # noqa: E402
+import schema  # noqa: E402
+from utils.admission import AdmissionController  # noqa: E402
+from utils.deadline import Deadline, DeadlineExceeded  # noqa: E402
+from utils.inference_pool import InferencePool  # noqa: E402
+from utils.lexical_index import LexicalIndex, MatchPaths  # noqa: E402
+from utils.query_cache import QueryCache  # noqa: E402
+from utils.telemetry import Telemetry  # noqa: E402
+
+ANSWER = "Use the reset link on the login page."
+
+
+class Doc2Vec:
+    def infer_vector(self, tokens, **settings):
+        if "boom" in tokens:
+            raise ValueError("cannot infer")
+        if "slow" in tokens:
+            time.sleep(0.2)
+        return np.ones(4, dtype=np.float32)
+
+
+class Search:
+    def search(self, vector, k=1):
+        return [(1, 0.9)]
+
+    def search_batch(self, matrix, k=1):
+        return [[(1, 0.9)] for _ in matrix]
+
+
+class Index:
+    model = Doc2Vec()
+    search = Search()
+    by_id = True
+    version = "test"
+    lexical = None
+
+
+class FAQs:
+    by_id = {1: ANSWER}
+
+
+class Rephraser:
+    """Stands in for ``RefactorModel``; ``fail`` makes the LLM raise.
+
+    Streams wait ``delays[i]`` seconds before the answer to call ``i``.
+    """
+
+    def __init__(self, fail=False, delays=()):
+        self.fail = fail
+        self.delays = list(delays)
+
+    async def amodel_work(self, answer, deadline=None):
+        if self.fail:
+            raise ConnectionError("LLM down")
+        return f"Kindly: {answer}"
+
+    async def astream_work(self, answer, deadline=None):
+        if self.fail:
+            raise ConnectionError("LLM down")
+        if self.delays:
+            await asyncio.sleep(self.delays.pop(0))
+        for word in ["Kindly: ", answer]:
+            yield word
+
+
+class ListExporter:
+    def __init__(self):
+        self.records = []
+
+    def export(self, records):
+        self.records.extend(records)
+
+
+class TestGrpcService(unittest.TestCase):
+    """Tests for the RPCs served from ``main.model``."""
+
+    def setUp(self):
+        self.exporter = ListExporter()
+        self.servicer = grpc_service.ChatbotService()
+        main.model.update(
+            Admission=AdmissionController(limit=1, max_limit=1, queue_size=0),
+            FAQStore=FAQs(),
+            Index=Index(),
+            InferencePool=InferencePool(1),
+            QueryCache=QueryCache(),
+            RefactorModel=Rephraser(),
+            Telemetry=Telemetry(self.exporter),
+        )
+
+    def tearDown(self):
+        main.model["InferencePool"].shutdown()
+        main.model.clear()
+
+    def call(self, rpc):
+        """Run ``rpc(stub)`` against a server on a free port."""
+
+        async def run():
+            server = grpc_service.GrpcServer(port=0)
+            server.servicer = self.servicer
+            await server.start()
+            try:
+                async with grpc.aio.insecure_channel(
+                    f"localhost:{server.port}"
+                ) as channel:
+                    return await rpc(chatbot_pb2_grpc.chatbot_serviceStub(channel))
+            finally:
+                await server.stop(grace=0)
+
+        return asyncio.run(run())
+
+    def exported(self):
+        main.model["Telemetry"].flush()
+        return self.exporter.records
+
+    def test_unary_answers_from_the_shared_engine(self):
+        """The answer comes from main's index, FAQ store and rephraser."""
+        request = chatbot_pb2.AddRequest(request="How do I reset my password?")
+        response = self.call(lambda stub: stub.AddChatRequest(request))
+        self.assertEqual(
+            (response.response, response.path), (f"Kindly: {ANSWER}", "llm")
+        )
+        [record] = self.exported()
+        self.assertEqual((record["transport"], record["faq_id"]), ("grpc", 1))
+        self.assertEqual(main.model["Admission"].in_flight, 0)
+
+    def test_faq_questions_skip_inference(self):
+        """A copy of an FAQ question is matched by its text alone."""
+        index = main.model["Index"]
+        index.lexical = LexicalIndex()
+        index.lexical.update([(1, "How do I reset my password?")])
+        main.model["MatchPaths"] = MatchPaths()
+        for query in ["how do I reset my password", "password help"]:
+            request = chatbot_pb2.AddRequest(request=query)
+            response = self.call(lambda stub: stub.AddChatRequest(request))
+            self.assertEqual(response.response, f"Kindly: {ANSWER}")
+        paths = [(r["match_path"], r["faq_id"]) for r in self.exported()]
+        self.assertEqual(paths, [("exact", 1), ("vector", 1)])
+        self.assertEqual(main.model["MatchPaths"].stats()["exact"]["count"], 1)
+
+    def test_stream_falls_back_before_the_first_delta(self):
+        """Deltas arrive in order; a failed LLM streams the FAQ answer."""
+        request = chatbot_pb2.AddRequest(request="reset password")
+
+        async def chunks(stub):
+            return [(c.delta, c.path) async for c in stub.StreamChatRequest(request)]
+
+        self.assertEqual(self.call(chunks), [("Kindly: ", "llm"), (ANSWER, "llm")])
+        main.model["RefactorModel"] = Rephraser(fail=True)
+        self.assertEqual(self.call(chunks), [(ANSWER, "fallback")])
+
+    def test_batch_keeps_order_and_limits_size(self):
+        """Every question gets an item; oversized batches are refused."""
+        batch = chatbot_pb2.BatchRequest(requests=["a", "b", "a"])
+        response = self.call(lambda stub: stub.BatchChatRequest(batch))
+        self.assertEqual(
+            [(item.response, item.path) for item in response.responses],
+            [(f"Kindly: {ANSWER}", "llm")] * 3,
+        )
+        self.assertEqual(main.model["Admission"].in_flight, 0)
+        limit = grpc_service.BATCH_MAX_SIZE
+        grpc_service.BATCH_MAX_SIZE = 2
+        try:
+            with self.assertRaises(grpc.aio.AioRpcError) as caught:
+                self.call(lambda stub: stub.BatchChatRequest(batch))
+        finally:
+            grpc_service.BATCH_MAX_SIZE = limit
+        self.assertEqual(caught.exception.code(), grpc.StatusCode.INVALID_ARGUMENT)
+
+    def test_batch_errors_and_fallbacks_are_per_item(self):
+        """A failed question or LLM call only affects its own item."""
+        main.model["RefactorModel"] = Rephraser(fail=True)
+        batch = chatbot_pb2.BatchRequest(requests=["a", "boom", "b"])
+        response = self.call(lambda stub: stub.BatchChatRequest(batch))
+        items = [(i.response, i.path, i.error) for i in response.responses]
+        self.assertEqual(
+            items,
+            [
+                (ANSWER, "fallback", ""),
+                ("", "", "cannot infer"),
+                (ANSWER, "fallback", ""),
+            ],
+        )
+        rest = asyncio.run(
+            main.request_text_batch(schema.batchRequest(SQL_QUERIES=["boom", "a"]))
+        )
+        self.assertEqual(
+            json.loads(rest.body)["results"],
+            [{"error": "cannot infer"}, {"answer": ANSWER, "path": "fallback"}],
+        )
+        self.assertEqual(self.exported()[-1]["item_errors"], 1)
+        with self.assertRaises(ValidationError):
+            schema.batchRequest(SQL_QUERIES=["a"] * (schema.BATCH_MAX_SIZE + 1))
+
+    def test_batch_past_its_deadline_fails_per_item(self):
+        """Questions left to infer when time runs out get DeadlineExceeded."""
+        main.model["Index"].lexical = LexicalIndex()
+        main.model["Index"].lexical.update([(1, "a")])
+        matched = asyncio.run(main.match_batch(["a", "b"], Deadline(0)))
+        self.assertEqual(matched[0], ANSWER)
+        self.assertIsInstance(matched[1], DeadlineExceeded)
+        self.assertEqual(
+            asyncio.run(main.rephrase_batch(matched, Deadline(0))),
+            [(f"Kindly: {ANSWER}", "llm"), matched[1]],
+        )
+
+    def test_batch_keeps_the_chunks_finished_in_time(self):
+        """Chunks answered before the deadline survive a later timeout."""
+        size = main.BATCH_CHUNK_SIZE
+        main.BATCH_CHUNK_SIZE = 1
+        try:
+            queries = [f"slow {i}" for i in range(6)]
+            matched = asyncio.run(main.match_batch(queries, Deadline(0.5)))
+        finally:
+            main.BATCH_CHUNK_SIZE = size
+        self.assertEqual(matched[:2], [ANSWER, ANSWER])
+        self.assertIsInstance(matched[-1], DeadlineExceeded)
+        self.assertGreater(
+            Deadline.for_batch(5000).seconds, Deadline.for_batch(1).seconds
+        )
+
+    def test_batch_needs_an_admission_slot(self):
+        """A batch waits for admission like a single question."""
+        ticket = main.model["Admission"].acquire()
+        try:
+            with self.assertRaises(grpc.aio.AioRpcError) as caught:
+                self.call(
+                    lambda stub: stub.BatchChatRequest(
+                        chatbot_pb2.BatchRequest(requests=["a"])
+                    )
+                )
+        finally:
+            main.model["Admission"].release(ticket)
+        self.assertEqual(caught.exception.code(), grpc.StatusCode.RESOURCE_EXHAUSTED)
+
+    def test_overload_is_refused_with_pushback(self):
+        """With no slot free the RPC fails at once with a retry hint.
+
+        In a session only the question is refused, not the stream.
+        """
+        ticket = main.model["Admission"].acquire()
+        try:
+            with self.assertRaises(grpc.aio.AioRpcError) as caught:
+                self.call(
+                    lambda stub: stub.AddChatRequest(
+                        chatbot_pb2.AddRequest(request="x")
+                    )
+                )
+            [chunk], _ = self.session("x")
+            self.assertTrue(chunk.done)
+            self.assertIn("overloaded", chunk.error)
+        finally:
+            main.model["Admission"].release(ticket)
+        error = caught.exception
+        self.assertEqual(error.code(), grpc.StatusCode.RESOURCE_EXHAUSTED)
+        self.assertEqual(error.trailing_metadata()["grpc-retry-pushback-ms"], "1000")
+
+    def session(self, *questions, session_id=""):
+        """``(chunks, session ids)`` of one ChatSession stream."""
+
+        def requests():
+            for i, question in enumerate(questions, 1):
+                yield chatbot_pb2.SessionRequest(
+                    session_id=session_id, id=i, request=question
+                )
+
+        async def chunks(stub):
+            return [chunk async for chunk in stub.ChatSession(requests())]
+
+        received = self.call(chunks)
+        return received, {chunk.session_id for chunk in received}
+
+    def test_session_answers_stream_back_as_they_are_ready(self):
+        """A slow first answer does not hold back the second one."""
+        main.model["Admission"] = AdmissionController(limit=2)
+        main.model["RefactorModel"] = Rephraser(delays=[0.3, 0])
+        chunks, _ = self.session("reset password", "log in")
+        done = [(chunk.id, chunk.error) for chunk in chunks if chunk.done]
+        self.assertEqual(done, [(2, ""), (1, "")])
+        first = "".join(chunk.delta for chunk in chunks if chunk.id == 1)
+        self.assertEqual(first, f"Kindly: {ANSWER}")
+        self.assertEqual({chunk.faq_id for chunk in chunks if chunk.done}, {1})
+
+    def test_session_state_survives_reconnects(self):
+        """A repeat skips the search; the session id resumes the state."""
+        _, [session_id] = self.session("Reset password")
+        _, ids = self.session("reset password?", session_id=session_id)
+        self.assertEqual(ids, {session_id})
+        records = self.exported()
+        self.assertEqual([r.get("session_hit") for r in records], [None, True])
+        self.assertEqual([r["turn"] for r in records], [1, 2])
+        session = self.servicer.sessions.open(session_id)
+        self.assertEqual(list(session.faq_ids), [1, 1])
+
+        _, [fresh] = self.session("x", session_id="made-up")
+        self.assertNotEqual(fresh, "made-up")
+
+    def test_keepalive_and_stream_limits_are_configurable(self):
+        """Server options carry the tuning; unset RPC limit follows admission."""
+        options = dict(
+            grpc_service.server_options(
+                max_concurrent_streams=8, keepalive_time_ms=1000
+            )
+        )
+        self.assertEqual(options["grpc.max_concurrent_streams"], 8)
+        self.assertEqual(options["grpc.keepalive_time_ms"], 1000)
+        self.assertEqual(options["grpc.keepalive_permit_without_calls"], 1)
+
+        async def stats():
+            server = grpc_service.GrpcServer(port=0)
+            await server.start()
+            await server.stop(grace=0)
+            return server.stats()
+
+        self.assertEqual(asyncio.run(stats())["max_concurrent_rpcs"], 1)
+
+
+class TestStubs(unittest.TestCase):
+    """The checked-in stubs are generated from ``chatbot/gRPC/chatbot.proto``."""
+
+    def test_stubs_match_the_proto(self):
+        """Regenerate the stubs after every change to the proto."""
+        try:
+            from grpc_tools import protoc
+        except ImportError:
+            self.skipTest("grpcio-tools is not installed")
+        from google.protobuf import descriptor_pb2
+
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, "chatbot.pb")
+            status = protoc.main(
+                ["protoc", f"-I{PROTO_DIR}", f"--descriptor_set_out={out}"]
+                + ["chatbot.proto"]
+            )
+            self.assertEqual(status, 0)
+            with open(out, "rb") as f:
+                [expected] = descriptor_pb2.FileDescriptorSet.FromString(f.read()).file
+        generated = descriptor_pb2.FileDescriptorProto.FromString(
+            chatbot_pb2.DESCRIPTOR.serialized_pb
+        )
+        # Descriptor sets spell out json_name; generated modules omit it.
+        for proto in (expected, generated):
+            for message in proto.message_type:
+                for field in message.field:
+                    field.ClearField("json_name")
+        self.assertEqual(generated, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+Unit tests for versioned index builds and hot swapping.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(
+    0,
+    os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "chatbot", "api_endpoint")
+    ),
+)
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+from utils import index_build  # noqa: E402
+from utils.index_build import IndexWatcher, ServingIndex  # noqa: E402
+from utils.live_index import question_hash  # noqa: E402
+from utils.vector_search import VectorSearch, normalize  # noqa: E402
+
+ROWS = [
+    (3, "how do i reset my password"),
+    (7, "how can i open a savings account"),
+    (12, "what is the interest rate on loans"),
+    (20, "how do i report a lost card"),
+]
+TRAIN = {"tokenize": str.split, "epochs": 20, "vector_size": 16, "workers": 1}
+
+
+class TestIndexBuild(unittest.TestCase):
+    """Tests for building, publishing and swapping index versions."""
+
+    def setUp(self):
+        self.out = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.out)
+
+    def test_trained_version_is_keyed_by_faq_id(self):
+        """Search tags are the faq ids, not row positions."""
+        version = index_build.build(ROWS, self.out, **TRAIN)
+        index = ServingIndex.load(os.path.join(self.out, version))
+        self.assertTrue(index.by_id)
+        self.assertEqual(sorted(index.search.tags.tolist()), [3, 7, 12, 20])
+        self.assertEqual(index.meta["mode"], "train")
+        self.assertFalse(index.search.base.matrix.flags.writeable)
+        vector = index.model.dv["12"]
+        self.assertEqual(index.search.search(vector, k=1)[0][0], 12)
+
+    def test_infer_mode_reuses_the_given_model(self):
+        """With a model, vectors are inferred and the model is copied in."""
+        model = index_build.train_model(ROWS, **TRAIN)
+        version = index_build.build(ROWS, self.out, model=model, tokenize=str.split)
+        index = ServingIndex.load(os.path.join(self.out, version))
+        self.assertEqual(index.meta["mode"], "infer")
+        self.assertEqual(index.meta["count"], len(ROWS))
+        self.assertEqual(index.model.vector_size, model.vector_size)
+
+    def test_positional_model_is_pinned_to_ids(self):
+        """Notebook tags become FAQ ids; tags beyond the table never match."""
+        search = VectorSearch(normalize(np.eye(3)), np.array([0, 1, 2]))
+        index = ServingIndex.from_positions(None, search, [10, 20])
+        self.assertTrue(index.by_id)
+        self.assertEqual(index.search.base.tags.tolist(), [10, 20, -1])
+        self.assertEqual(index.search.ids(), {10, 20})
+        self.assertEqual(search.tags.tolist(), [0, 1, 2])
+        self.assertEqual(index.search.search(np.array([0, 1, 0]))[0][0], 20)
+
+    def test_repeated_questions_share_a_position(self):
+        """Like the notebook, a repeated question is one tag, its last row."""
+        rows = [(10, "a"), (20, "b"), (30, "a"), (40, "c")]
+        search = VectorSearch(normalize(np.eye(3)), np.array([0, 1, 2]))
+        index = ServingIndex.from_rows(None, search, rows)
+        self.assertEqual(index.search.base.tags.tolist(), [30, 20, 40])
+        self.assertEqual(index.search.hash_of(30), question_hash("a"))
+        self.assertEqual(index.search.search(np.array([0, 0, 1]))[0][0], 40)
+
+    def test_checksum_mismatch_is_rejected(self):
+        """A corrupted version never loads."""
+        version = index_build.build(ROWS, self.out, **TRAIN)
+        with open(os.path.join(self.out, version, "ids.npy"), "ab") as f:
+            f.write(b"junk")
+        with self.assertRaises(ValueError):
+            ServingIndex.load(os.path.join(self.out, version))
+
+    def test_publish_moves_current_atomically(self):
+        """CURRENT names the published version and only existing ones."""
+        self.assertIsNone(index_build.current_version(self.out))
+        version = index_build.build(ROWS, self.out, **TRAIN)
+        self.assertIsNone(index_build.current_version(self.out))
+        index_build.publish(self.out, version)
+        self.assertEqual(index_build.current_version(self.out), version)
+        with self.assertRaises(FileNotFoundError):
+            index_build.publish(self.out, "missing")
+        self.assertEqual(index_build.current_version(self.out), version)
+
+    def test_watcher_swaps_to_new_version(self):
+        """A newly published version is handed over once; bad ones are skipped."""
+        first = index_build.build(ROWS, self.out, **TRAIN)
+        index_build.publish(self.out, first)
+        swapped = []
+        watcher = IndexWatcher(self.out, swapped.append, first)
+        self.assertFalse(watcher.check())
+
+        second = index_build.build(ROWS[:2], self.out, **TRAIN)
+        index_build.publish(self.out, second)
+        self.assertTrue(watcher.check())
+        self.assertFalse(watcher.check())
+        self.assertEqual([index.version for index in swapped], [second])
+        self.assertEqual(len(swapped[0].search), 2)
+
+        with open(os.path.join(self.out, first, "vectors.npy"), "ab") as f:
+            f.write(b"junk")
+        index_build.publish(self.out, first)
+        self.assertFalse(watcher.check())
+        self.assertEqual(watcher.stats()["failures"], 1)
+        self.assertEqual(watcher.version, second)
+
+    def test_prune_keeps_newest_and_current(self):
+        """Old versions are removed, but never the one being served."""
+        versions = [index_build.build(ROWS, self.out, **TRAIN) for _ in range(3)]
+        index_build.publish(self.out, versions[0])
+        index_build.prune(self.out, keep=1)
+        left = sorted(
+            name
+            for name in os.listdir(self.out)
+            if name != index_build.CURRENT and not name.startswith(".")
+        )
+        self.assertEqual(left, sorted({versions[0], max(versions)}))
+
+
+if __name__ == "__main__":
+    unittest.main()
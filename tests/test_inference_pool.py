@@ -0,0 +1,63 @@
+"""
+Unit tests for the bounded inference executor.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(
+    0,
+    os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "chatbot", "api_endpoint")
+    ),
+)
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+from utils.inference_pool import InferencePool  # noqa: E402
+
+
+class TestInferencePool(unittest.TestCase):
+    """Tests for running blocking calls off the event loop."""
+
+    def setUp(self):
+        self.pool = InferencePool(workers=2)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_returns_result_from_worker_thread(self):
+        """The call runs on an inference thread, not the loop's thread."""
+        name = asyncio.run(self.pool.run(lambda: threading.current_thread().name))
+        self.assertTrue(name.startswith("inference"))
+
+    def test_concurrency_is_bounded_by_workers(self):
+        """No more than ``workers`` calls run at the same time."""
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def work():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.02)
+            with lock:
+                running.pop()
+
+        async def burst():
+            await asyncio.gather(*(self.pool.run(work) for _ in range(8)))
+
+        asyncio.run(burst())
+        self.assertEqual(max(peak), 2)
+        stats = self.pool.stats()
+        self.assertEqual(stats["completed"], 8)
+        self.assertEqual(stats["pending"], 0)
+        self.assertGreater(stats["queue_ms_p99"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
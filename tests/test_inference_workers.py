@@ -0,0 +1,104 @@
+"""
+Unit tests for Doc2Vec inference in worker processes.
+"""
+
+import os
+import signal
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(
+    0,
+    os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "chatbot", "api_endpoint")
+    ),
+)
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+from utils.doc2vec_runtime import Doc2VecRuntime  # noqa: E402
+from utils.inference_workers import InferenceWorkers  # noqa: E402
+from utils.vector_cache import VectorCache  # noqa: E402
+
+RUNTIME = os.path.join(
+    os.path.dirname(__file__),
+    "..",
+    "chatbot",
+    "api_endpoint",
+    "utils",
+    "doc2vec_model.runtime",
+)
+QUERIES = [
+    "how do i reset my password ?".split(),
+    "is there a transfer limit ?".split(),
+    "how can i contact customer support ?".split(),
+]
+
+
+class TestInferenceWorkers(unittest.TestCase):
+    """Tests for worker inference against the committed runtime export."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.workers = InferenceWorkers(processes=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.workers.shutdown()
+
+    def test_workers_infer_what_the_parent_would(self):
+        """Inference is seeded by the tokens, so the process does not matter."""
+        runtime = Doc2VecRuntime.load(RUNTIME)
+        vectors = self.workers.infer_many(runtime, QUERIES, {"epochs": 20})
+        for words, vector in zip(QUERIES, vectors):
+            np.testing.assert_array_equal(
+                vector, runtime.infer_vector(words, epochs=20)
+            )
+
+    def test_failed_item_gets_its_exception(self):
+        """Every item of a failed batch comes back as an exception."""
+        runtime = Doc2VecRuntime.load(RUNTIME)
+        vectors = self.workers.infer_many(runtime, QUERIES, {"epochs": "x"})
+        self.assertTrue(all(isinstance(v, Exception) for v in vectors))
+
+    def test_model_without_path_is_inferred_locally(self):
+        """An in-memory model cannot be opened by a worker."""
+        runtime = Doc2VecRuntime.load(RUNTIME)
+        runtime.path = None
+        before = self.workers.stats()["local"]
+        [vector] = self.workers.infer_many(runtime, QUERIES[:1], {})
+        self.assertEqual(vector.shape, (runtime.vector_size,))
+        self.assertEqual(self.workers.stats()["local"], before + 1)
+
+    def test_pool_is_rebuilt_after_a_worker_dies(self):
+        """A killed worker breaks the pool once; later batches still infer."""
+        workers = InferenceWorkers(processes=1)
+        self.addCleanup(workers.shutdown)
+        runtime = Doc2VecRuntime.load(RUNTIME)
+        [worker] = workers._executor._processes.values()
+        os.kill(worker.pid, signal.SIGKILL)
+        worker.join()
+        vectors = workers.infer_many(runtime, QUERIES, {"epochs": 20})
+        np.testing.assert_array_equal(
+            vectors[0], runtime.infer_vector(QUERIES[0], epochs=20)
+        )
+        self.assertEqual(workers.stats()["restarts"], 1)
+        self.assertEqual(len(workers.infer_many(runtime, QUERIES, {})), 3)
+        self.assertEqual(workers.stats()["local"], 0)
+
+    def test_cache_sends_only_misses_to_workers(self):
+        """Cached token lists never reach the workers."""
+        runtime = Doc2VecRuntime.load(RUNTIME)
+        cache = VectorCache()
+        cache.workers = self.workers
+        cache.infer(runtime, QUERIES[0])
+        before = self.workers.stats()["submitted"]
+        vectors = cache.infer_many(runtime, QUERIES)
+        self.assertEqual(self.workers.stats()["submitted"], before + 2)
+        self.assertEqual(len(vectors), len(QUERIES))
+        self.assertFalse(vectors[1].flags.writeable)
+
+
+if __name__ == "__main__":
+    unittest.main()
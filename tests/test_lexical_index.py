@@ -0,0 +1,126 @@
+"""
+Unit tests for the exact and lexical match before Doc2Vec inference.
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(
+    0,
+    os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "chatbot", "api_endpoint")
+    ),
+)
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+from utils.index_build import ServingIndex  # noqa: E402
+from utils.lexical_index import LexicalIndex, MatchPaths  # noqa: E402
+from utils.live_index import IndexUpdater  # noqa: E402
+from utils.query_cache import QueryCache  # noqa: E402
+from utils.vector_search import VectorSearch  # noqa: E402
+
+ROWS = [
+    (3, "How do I reset my password?"),
+    (7, "How can I open a savings account?"),
+    (12, "What is the interest rate on loans?"),
+    (20, "How do I report a lost card?"),
+    (25, "How do I report a stolen card?"),
+]
+
+
+class TestLexicalIndex(unittest.TestCase):
+    """Tests for the question hash, BM25 matching and reranking."""
+
+    def setUp(self):
+        self.lexical = LexicalIndex()
+        self.lexical.update(ROWS, full=True)
+
+    def test_exact_match_ignores_case_and_punctuation(self):
+        """A copy of a question is found by its normalized text."""
+        self.assertEqual(
+            self.lexical.match("how do i RESET my password"), ("exact", [(3, 1.0)])
+        )
+        self.lexical.update([(9, "how do i reset my password")])
+        self.assertEqual(self.lexical.match("How do I reset my password")[1][0][0], 9)
+
+    def test_lexical_match_needs_most_of_the_query(self):
+        """Reordered words match; a query sharing only part of a row does not."""
+        path, [(faq_id, score)] = self.lexical.match("my password how do i reset")
+        self.assertEqual((path, faq_id), ("lexical", 3))
+        self.assertAlmostEqual(score, 1.0)
+        self.assertIsNone(self.lexical.match("report card"))
+        self.assertIsNone(self.lexical.match("how do i reset my pin"))
+        self.assertIsNone(self.lexical.match("?!"))
+        stats = self.lexical.stats()
+        self.assertEqual((stats["lexical_hits"], stats["misses"]), (1, 3))
+        self.assertEqual(stats["rows"], 5)
+
+    def test_edits_and_deletes_change_the_matches(self):
+        """Edited questions are re-indexed; deleted and missing rows dropped."""
+        self.assertEqual(self.lexical.update([(3, "how do i reset my password")]), 0)
+        self.assertEqual(self.lexical.update([(3, "how do i change my pin")]), 1)
+        self.assertIsNone(self.lexical.match("how do i reset my password"))
+        self.assertEqual(self.lexical.match("how do i change my pin")[0], "exact")
+        self.lexical.update(deleted=[7])
+        self.assertIsNone(self.lexical.match("how can i open a savings account"))
+        self.assertEqual(self.lexical.update(ROWS[2:4], full=True), 2)
+        self.assertEqual(len(self.lexical), 2)
+        self.assertNotIn("pin", self.lexical._postings)
+
+    def test_rerank_breaks_near_ties_lexically(self):
+        """Of vector results within the margin, the best BM25 comes first."""
+        pairs = [(20, 0.91), (25, 0.90), (3, 0.5)]
+        self.assertEqual(self.lexical.rerank("stolen card", pairs)[0], (25, 0.90))
+        far = [(20, 0.91), (25, 0.80)]
+        self.assertEqual(self.lexical.rerank("stolen card", far), far)
+        self.assertEqual(self.lexical.rerank("unrelated words", pairs), pairs)
+        self.assertEqual(self.lexical.stats()["reranked"], 1)
+
+    def test_updater_fills_the_lexical_index(self):
+        """Rows reach the index's lexical index, and changes clear caches."""
+        cleared = []
+        index = ServingIndex(object(), object(), "v1", by_id=True)
+        updater = IndexUpdater(index, str.split, on_change=lambda: cleared.append(1))
+        updater.update(ROWS, full=True)
+        self.assertEqual(index.lexical.match("how do i report a lost card")[0], "exact")
+        updater.update(ROWS[1:], full=True)
+        self.assertEqual(len(cleared), 1)
+        self.assertIsNone(ServingIndex(object(), object(), "v1").lexical)
+
+    def test_startup_fill_keeps_the_persisted_cache(self):
+        """Filling the empty index at startup clears no cached result."""
+        cache = QueryCache(path="")
+        cache.put("how do i log in", np.ones(4, dtype=np.float32), [(3, 0.9)])
+        index = ServingIndex(object(), object(), "v1", by_id=True)
+        updater = IndexUpdater(index, str.split, on_change=cache.clear)
+        updater.update(ROWS, full=True)
+        self.assertEqual(len(cache), 1)
+        updater.update([(3, "how do i change my pin")])
+        self.assertEqual(len(cache), 0)
+
+    def test_repeated_questions_answer_alike_on_every_path(self):
+        """The exact match and the vector tags pick the same row of a repeat."""
+        rows = ROWS + [(30, ROWS[0][1])]
+        search = VectorSearch(np.eye(5, dtype=np.float32), np.arange(5))
+        index = ServingIndex.from_rows(object(), search, rows)
+        index.lexical.update(rows, full=True)
+        vector_id = index.search.base.tags[0]
+        self.assertEqual(vector_id, 30)
+        self.assertEqual(index.lexical.match(ROWS[0][1])[1], [(vector_id, 1.0)])
+
+    def test_match_paths_report_ratios_and_latency(self):
+        """Every path reports its share of queries and latency percentiles."""
+        paths = MatchPaths()
+        for path, ms in [("exact", 0.1), ("exact", 0.2), ("vector", 30.0)]:
+            paths.observe(path, ms)
+        stats = paths.stats()
+        self.assertAlmostEqual(stats["exact"]["ratio"], 2 / 3)
+        self.assertEqual(stats["vector"]["ms_p50"], 30.0)
+        self.assertEqual(stats["lexical"]["count"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+"""
+Unit tests for incremental index updates and compaction.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(
+    0,
+    os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "chatbot", "api_endpoint")
+    ),
+)
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+from utils import index_build, live_index  # noqa: E402
+from utils.index_build import ServingIndex  # noqa: E402
+from utils.vector_search import VectorSearch, normalize  # noqa: E402
+
+ROWS = [
+    (3, "how do i reset my password"),
+    (7, "how can i open a savings account"),
+    (12, "what is the interest rate on loans"),
+    (20, "how do i report a lost card"),
+]
+TRAIN = {"tokenize": str.split, "epochs": 20, "vector_size": 16, "workers": 1}
+
+
+class CountingModel:
+    """Stands in for Doc2Vec: one fixed vector per question, counted."""
+
+    def __init__(self, dim=8):
+        self.dim = dim
+        self.calls = 0
+
+    def infer_vector(self, words):
+        self.calls += 1
+        seed = live_index.question_hash(" ".join(words)) % 2**32
+        return np.random.default_rng(seed).normal(size=self.dim)
+
+
+def build_live(model, rows):
+    ids = [faq_id for faq_id, _ in rows]
+    vectors = [model.infer_vector(q.split()) for _, q in rows]
+    hashes = [live_index.question_hash(q) for _, q in rows]
+    return live_index.LiveIndex(
+        VectorSearch(normalize(vectors), np.array(ids)), ids, hashes
+    )
+
+
+class TestLiveIndex(unittest.TestCase):
+    """Tests for the delta segment, tombstones and the updater."""
+
+    def setUp(self):
+        self.model = CountingModel()
+        self.search = build_live(self.model, ROWS)
+        self.index = ServingIndex(self.model, self.search, "v1", by_id=True)
+        self.model.calls = 0
+
+    def top(self, question):
+        return self.search.search(self.model.infer_vector(question.split()))[0][0]
+
+    def test_new_and_edited_rows_are_searchable(self):
+        """Added rows land in the delta; edits supersede the built vector."""
+        updater = live_index.IndexUpdater(self.index, str.split)
+        updater.update([(30, "can i change my pin", "a30")])
+        updater.update([(7, "where is the nearest branch", "a7")])
+        self.assertEqual(self.model.calls, 2)
+        self.assertEqual(self.top("can i change my pin"), 30)
+        self.assertEqual(self.top("where is the nearest branch"), 7)
+        self.assertEqual(self.search.stats()["delta_rows"], 2)
+        self.assertEqual(len(self.search), 5)
+
+    def test_answer_only_edits_are_free(self):
+        """A row whose question did not change is not re-inferred."""
+        updater = live_index.IndexUpdater(self.index, str.split)
+        updater.update([(3, "how do i reset my password", "new answer")])
+        self.assertEqual(self.model.calls, 0)
+        self.assertEqual(self.search.stats()["delta_rows"], 0)
+
+    def test_deleted_rows_are_never_returned(self):
+        """Tombstoned ids drop out even when they score highest."""
+        updater = live_index.IndexUpdater(self.index, str.split)
+        updater.update(deleted=[12])
+        vector = self.model.infer_vector("what is the interest rate on loans".split())
+        tags = [tag for tag, _ in self.search.search(vector, k=4)]
+        self.assertEqual(sorted(tags), [3, 7, 20])
+
+    def test_tombstones_are_skipped_inside_the_search(self):
+        """Deletes never shrink or widen what the base search returns."""
+        calls = []
+        search_batch = self.search.base.search_batch
+
+        def spy(queries, k=1, threshold=None, exclude=None):
+            calls.append(k)
+            return search_batch(queries, k, threshold, exclude)
+
+        self.search.base.search_batch = spy
+        self.search.delete([3, 7, 12])
+        vector = self.model.infer_vector("how do i reset my password".split())
+        self.assertEqual([tag for tag, _ in self.search.search(vector, k=2)], [20])
+        self.assertEqual(calls, [2])
+        self.assertEqual(self.search.stats()["tombstones"], 3)
+
+    def test_positional_model_picks_up_new_rows(self):
+        """A notebook model served by id gets inserts without a rebuild."""
+        ids = [faq_id for faq_id, _ in ROWS]
+        vectors = [self.model.infer_vector(q.split()) for _, q in ROWS]
+        search = VectorSearch(normalize(vectors), np.arange(len(ROWS)))
+        hashes = [live_index.question_hash(q) for _, q in ROWS]
+        index = ServingIndex.from_positions(self.model, search, ids, hashes=hashes)
+        self.model.calls = 0
+        updater = live_index.IndexUpdater(index, str.split)
+        updater.update(ROWS + [(30, "can i change my pin")], full=True)
+        self.assertEqual(self.model.calls, 1)
+        vector = self.model.infer_vector("can i change my pin".split())
+        self.assertEqual(index.search.search(vector)[0][0], 30)
+
+    def test_full_sync_only_touches_differences(self):
+        """A full snapshot costs one inference per changed row."""
+        changed = []
+        updater = live_index.IndexUpdater(
+            self.index, str.split, on_change=lambda: changed.append(1)
+        )
+        rows = ROWS[1:] + [(40, "how do i close my account")]
+        updater.update(rows, full=True)
+        self.assertEqual(self.model.calls, 1)
+        self.assertEqual(self.search.ids(), {7, 12, 20, 40})
+        self.assertEqual(changed, [1])
+        updater.update(rows, full=True)
+        self.assertEqual(self.model.calls, 1)
+        self.assertEqual(changed, [1])
+
+    def test_swap_catches_up_before_install(self):
+        """A swapped-in index already has the rows changed since its build."""
+        updater = live_index.IndexUpdater(self.index, str.split)
+        rows = ROWS + [(50, "is online banking free")]
+        newer = ServingIndex(self.model, build_live(self.model, ROWS), "v2", True)
+        installed = []
+        updater.swap(newer, lambda: rows, installed.append)
+        self.assertEqual(installed, [newer])
+        self.assertIs(updater.index, newer)
+        self.assertIn(50, newer.search.ids())
+
+
+class TestCompaction(unittest.TestCase):
+    """Tests for folding table changes into a new version."""
+
+    def setUp(self):
+        self.out = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.out)
+
+    def test_compaction_infers_only_changed_rows(self):
+        """Vectors of unchanged questions are copied from the last version."""
+        first = index_build.build(ROWS, self.out, **TRAIN)
+        previous = os.path.join(self.out, first)
+        rows = ROWS[:3] + [(20, "my card was stolen"), (21, "how do i pay a bill")]
+        model = ServingIndex.load(previous).model
+        version = index_build.build(
+            rows, self.out, model=model, tokenize=str.split, previous=previous
+        )
+        index = ServingIndex.load(os.path.join(self.out, version))
+        self.assertEqual(index.meta["inferred"], 2)
+        self.assertEqual(sorted(index.search.ids()), [3, 7, 12, 20, 21])
+        old = np.load(os.path.join(previous, "vectors.npy"))
+        new = np.load(os.path.join(self.out, version, "vectors.npy"))
+        np.testing.assert_allclose(old[:3], new[:3], rtol=1e-6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,201 @@
+"""
+Unit tests for the LLM provider layer: pooled clients, timeouts and hedging.
+"""
+
+import asyncio
+import os
+import sys
+import time
+import unittest
+from types import SimpleNamespace
+
+sys.path.insert(
+    0,
+    os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "chatbot", "api_endpoint")
+    ),
+)
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+from utils import llm_provider  # noqa: E402
+from utils.deadline import Deadline  # noqa: E402
+from utils.llm_provider import Provider, Router  # noqa: E402
+
+
+def completion(text):
+    message = SimpleNamespace(content=text)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class Backend:
+    """Stands in for one provider's API; every completion takes ``seconds``."""
+
+    def __init__(self, name, seconds, error=None):
+        self.name = name
+        self.seconds = seconds
+        self.error = error
+        self.clients = []
+        self.calls = []
+        self.cancelled = 0
+
+    def connect(self, provider, asynchronous):
+        backend = self
+
+        class Completions:
+            def create(self, timeout=None, **args):
+                backend.calls.append(timeout)
+                time.sleep(backend.seconds)
+                if backend.error:
+                    raise backend.error
+                return completion(backend.name)
+
+        class AsyncCompletions:
+            async def create(self, timeout=None, **args):
+                backend.calls.append(timeout)
+                try:
+                    await asyncio.sleep(backend.seconds)
+                except asyncio.CancelledError:
+                    backend.cancelled += 1
+                    raise
+                if backend.error:
+                    raise backend.error
+                return completion(backend.name)
+
+        completions = AsyncCompletions() if asynchronous else Completions()
+        client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        self.clients.append(asynchronous)
+        return client
+
+
+def provider(backend, samples=()):
+    """A ``Provider`` for ``backend`` with ``samples`` as past latencies."""
+    result = Provider(backend.name, f"{backend.name}-model", backend.connect)
+    result.latencies.extend(samples)
+    return result
+
+
+class TestProvider(unittest.TestCase):
+    """Tests for one provider's clients, timeouts and latency window."""
+
+    def test_clients_are_built_once_and_reused(self):
+        """Calls share one sync client and one async client per event loop."""
+        backend = Backend("groq", 0)
+        groq = provider(backend)
+
+        async def three():
+            return [await groq.acomplete([]) for _ in range(3)]
+
+        for _ in range(3):
+            self.assertEqual(groq.complete([]), "groq")
+        self.assertEqual(asyncio.run(three()), ["groq"] * 3)
+        self.assertEqual(backend.clients, [False, True])
+        self.assertEqual(groq.stats()["completions"], 6)
+
+    def test_async_state_belongs_to_the_running_loop(self):
+        """A new loop gets its own client and semaphore, built in that loop."""
+        groq = provider(Backend("groq", 0))
+
+        async def state():
+            await groq.acomplete([])
+            return groq.async_client, groq.slots
+
+        first, second = asyncio.run(state()), asyncio.run(state())
+        self.assertIsNot(first[0], second[0])
+        self.assertIsNot(first[1], second[1])
+        with self.assertRaises(RuntimeError):
+            groq.async_client
+
+    def test_warm_builds_clients_without_calling_the_llm(self):
+        """``Router.warm`` connects the primary and the hedge, nothing more."""
+        primary, hedge = Backend("groq", 0), Backend("lm_studio", 0)
+        router = Router(provider(primary), provider(hedge))
+
+        async def warm():
+            router.warm()
+
+        asyncio.run(warm())
+        self.assertEqual((primary.clients, hedge.clients), ([True], [True]))
+        self.assertEqual(primary.calls + hedge.calls, [])
+
+    def test_timeout_is_capped_per_provider(self):
+        """``<NAME>_TIMEOUT`` caps the call; a shorter deadline wins."""
+        os.environ["SLOW_TIMEOUT"] = "5"
+        try:
+            backend = Backend("slow", 0)
+            slow = provider(backend)
+        finally:
+            del os.environ["SLOW_TIMEOUT"]
+        slow.complete([])
+        slow.complete([], Deadline(1))
+        self.assertEqual(backend.calls[0], 5)
+        self.assertLessEqual(backend.calls[1], 1)
+
+    def test_hedge_delay_follows_recent_p95(self):
+        """The default delay is used until there are enough latencies."""
+        few = provider(Backend("few", 0), [0.1] * 5)
+        self.assertEqual(few.hedge_delay(), llm_provider.LLM_HEDGE_DELAY)
+        many = provider(Backend("many", 0), [0.1] * 95 + [1.0] * 5)
+        self.assertEqual(many.hedge_delay(), 1.0)
+        many.latencies.extend([0.1] * 100)
+        self.assertEqual(many.hedge_delay(), 0.1)
+
+
+class TestRouter(unittest.TestCase):
+    """Tests for hedging a slow primary with a second provider."""
+
+    def test_fast_primary_is_not_hedged(self):
+        """Answers within the hedge delay never reach the hedge."""
+        hedge = Backend("lm_studio", 0)
+        router = Router(provider(Backend("groq", 0.01), [0.1] * 20), provider(hedge))
+        self.assertEqual(asyncio.run(router.acomplete([])), "groq")
+        self.assertEqual(router.complete([]), "groq")
+        self.assertEqual(hedge.calls, [])
+        self.assertEqual(router.stats()["hedged"], 0)
+
+    def test_slow_primary_loses_to_the_hedge(self):
+        """Past the p95 delay the hedge runs too; the loser is cancelled."""
+        primary = Backend("groq", 1.0)
+        router = Router(
+            provider(primary, [0.05] * 20), provider(Backend("lm_studio", 0.01))
+        )
+        start = time.perf_counter()
+        self.assertEqual(asyncio.run(router.acomplete([])), "lm_studio")
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(primary.cancelled, 1)
+        stats = router.stats()
+        self.assertEqual((stats["hedged"], stats["hedge_wins"]), (1, 1))
+
+    def test_threads_are_hedged_the_same_way(self):
+        """The sync path races the two providers on worker threads."""
+        router = Router(
+            provider(Backend("groq", 0.5), [0.05] * 20),
+            provider(Backend("lm_studio", 0.01)),
+        )
+        start = time.perf_counter()
+        self.assertEqual(router.complete([]), "lm_studio")
+        self.assertLess(time.perf_counter() - start, 0.4)
+
+    def test_failed_primary_fails_over(self):
+        """A primary error sends the request to the hedge at once."""
+        router = Router(
+            provider(Backend("groq", 0, ConnectionError("down"))),
+            provider(Backend("lm_studio", 0)),
+        )
+        self.assertEqual(asyncio.run(router.acomplete([])), "lm_studio")
+        self.assertEqual(router.complete([]), "lm_studio")
+        self.assertEqual(router.stats()["failovers"], 2)
+
+    def test_primary_error_when_both_fail(self):
+        """If neither answers, the primary's error is raised."""
+        router = Router(
+            provider(Backend("groq", 0, ConnectionError("groq down"))),
+            provider(Backend("lm_studio", 0, RuntimeError("lm studio down"))),
+        )
+        with self.assertRaises(ConnectionError):
+            asyncio.run(router.acomplete([]))
+        with self.assertRaises(ConnectionError):
+            router.complete([])
+
+
+if __name__ == "__main__":
+    unittest.main()
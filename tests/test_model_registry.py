@@ -0,0 +1,70 @@
+"""
+Unit tests for the chatbot Doc2Vec model registry.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+CHATBOT_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "chatbot", "api_endpoint")
+)
+sys.path.insert(0, CHATBOT_DIR)
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+from utils.model_registry import ModelRegistry, prepare  # noqa: E402
+
+
+class TestModelRegistry(unittest.TestCase):
+    """Tests for loading the shared, memory-mapped model."""
+
+    def setUp(self):
+        """Copy the committed model so ``prepare`` writes to a temp dir."""
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "doc2vec_model.model")
+        shutil.copy(
+            os.path.join(CHATBOT_DIR, "utils", "doc2vec_model.model"), self.path
+        )
+        self.registry = ModelRegistry()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_serving_writes_nothing_next_to_the_model(self):
+        """Without ``prepare`` the model and matrix are loaded into memory."""
+        model = self.registry.load(self.path)
+        search = self.registry.search(self.path)
+        self.assertEqual(os.listdir(self.tmp), ["doc2vec_model.model"])
+        self.assertNotEqual(type(model.dv.vectors).__name__, "memmap")
+        self.assertEqual(len(search), len(model.dv))
+
+    def test_load_returns_same_instance(self):
+        """Every caller gets the model loaded on first use."""
+        self.assertIs(self.registry.load(self.path), self.registry.load(self.path))
+
+    def test_arrays_are_read_only_memory_maps(self):
+        """After ``prepare`` the large arrays are shared mmaps, not copies."""
+        prepare(self.path)
+        model = self.registry.load(self.path)
+        self.assertEqual(type(model.dv.vectors).__name__, "memmap")
+        self.assertFalse(model.dv.vectors.flags.writeable)
+
+    def test_inference_on_shared_model(self):
+        """Inference works against the read-only arrays."""
+        model = self.registry.load(self.path)
+        vector = model.infer_vector(["login", "account"])
+        self.assertEqual(vector.shape, (model.vector_size,))
+
+    def test_search_is_shared_and_memory_mapped(self):
+        """The search matrix written by ``prepare`` is shared and memory-mapped."""
+        prepare(self.path)
+        search = self.registry.search(self.path)
+        self.assertIs(search, self.registry.search(self.path))
+        self.assertFalse(search.matrix.flags.writeable)
+        self.assertEqual(len(search), len(self.registry.load(self.path).dv))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+"""
+Unit tests for the semantic query cache.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(
+    0,
+    os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "chatbot", "api_endpoint")
+    ),
+)
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+from utils.query_cache import QueryCache, normalize_text  # noqa: E402
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestQueryCache(unittest.TestCase):
+    """Tests for the exact and vector tiers, eviction and persistence."""
+
+    def setUp(self):
+        self.clock = Clock()
+        self.cache = QueryCache(
+            size=3, ttl=60, distance=0.05, path="", clock=self.clock
+        )
+        self.rng = np.random.default_rng(0)
+
+    def vector(self):
+        return self.rng.normal(size=16).astype(np.float32)
+
+    def test_exact_tier_ignores_case_and_punctuation(self):
+        """Rephrasings that only differ in case or spacing hit the exact tier."""
+        self.assertEqual(normalize_text("  How do I LOG in?"), "how do i log in")
+        self.cache.put("How do I log in?", self.vector(), [(3, 0.9)])
+        self.assertEqual(self.cache.get("how do i  log in"), [(3, 0.9)])
+        self.assertIsNone(self.cache.get("how do i log out"))
+        self.assertEqual(self.cache.stats()["exact_hits"], 1)
+
+    def test_normalizing_keeps_combining_marks(self):
+        """Myanmar vowel signs tell questions apart; its punctuation does not."""
+        keys = {normalize_text(word) for word in ["မှု", "မူ", "မိ", "မ"]}
+        self.assertEqual(len(keys), 4)
+        self.assertNotEqual(normalize_text("ကို"), normalize_text("ကု"))
+        self.assertEqual(normalize_text("ငွေလွှဲနည်း။"), "ငွေလွှဲနည်း")
+        self.cache.put("မှု", self.vector(), [(3, 0.9)])
+        self.assertIsNone(self.cache.get("မူ"))
+
+    def test_vector_tier_uses_cosine_distance(self):
+        """A nearby vector reuses the cached result; a distant one misses."""
+        vector = self.vector()
+        self.cache.put("log in", vector, [(3, 0.9)])
+        near = vector + 0.01 * self.vector()
+        self.assertEqual(self.cache.get_similar(near), [(3, 0.9)])
+        self.assertIsNone(self.cache.get_similar(self.vector()))
+        stats = self.cache.stats()
+        self.assertEqual((stats["vector_hits"], stats["misses"]), (1, 1))
+
+    def test_lru_eviction(self):
+        """The least recently used entry goes first when the cache is full."""
+        vectors = [self.vector() for _ in range(4)]
+        for i, text in enumerate("abc"):
+            self.cache.put(text, vectors[i], [(i, 1.0)])
+        self.cache.get("a")
+        self.cache.put("d", vectors[3], [(3, 1.0)])
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNone(self.cache.get_similar(vectors[1]))
+        self.assertEqual(self.cache.get("a"), [(0, 1.0)])
+        self.assertEqual(len(self.cache), 3)
+
+    def test_ttl_expiry(self):
+        """Expired entries are not served by either tier."""
+        vector = self.vector()
+        self.cache.put("a", vector, [(0, 1.0)])
+        self.clock.now += 61
+        self.assertIsNone(self.cache.get_similar(vector))
+        self.assertIsNone(self.cache.get("a"))
+
+    def test_memory_cap(self):
+        """Entries are evicted to stay under max_bytes."""
+        cache = QueryCache(size=100, max_bytes=2000, path="", clock=self.clock)
+        for i in range(20):
+            cache.put(f"query {i}", self.vector(), [(i, 1.0)])
+        self.assertLessEqual(cache.bytes, 2000)
+        self.assertGreater(cache.stats()["evictions"], 0)
+        self.assertIsNotNone(cache.get("query 19"))
+
+    def test_sqlite_persistence(self):
+        """Saved entries survive a restart; expired ones are dropped."""
+        fd, path = tempfile.mkstemp(suffix=".sqlite")
+        os.close(fd)
+        try:
+            vector = self.vector()
+            cache = QueryCache(size=10, ttl=60, path=path, clock=self.clock)
+            cache.put("a", vector, [(1, 0.9)])
+            cache.put("b", self.vector(), [(2, 0.8)])
+            cache.save()
+
+            self.clock.now += 30
+            restored = QueryCache(size=10, ttl=60, path=path, clock=self.clock)
+            restored.load()
+            self.assertEqual(restored.get("a"), [[1, 0.9]])
+            self.assertEqual(restored.get_similar(vector), [[1, 0.9]])
+
+            self.clock.now += 31
+            expired = QueryCache(size=10, ttl=60, path=path, clock=self.clock)
+            expired.load()
+            self.assertEqual(len(expired), 0)
+        finally:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
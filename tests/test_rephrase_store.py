@@ -0,0 +1,137 @@
+"""
+Unit tests for the precomputed rephrased-answer store, using SQLite.
+"""
+
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+import asyncpg
+
+sys.path.insert(
+    0,
+    os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "chatbot", "api_endpoint")
+    ),
+)
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+from utils.chat_model_work import RefactorModel  # noqa: E402
+from utils.rephrase_store import RephraseStore, answer_hash  # noqa: E402
+
+
+class CountingModel(RefactorModel):
+    """RefactorModel whose LLM call is replaced by a counter."""
+
+    calls = 0
+
+    def rephrase(self, result_data, deadline=None):
+        self.calls += 1
+        return f"polite: {result_data}"
+
+    async def arephrase(self, result_data, deadline=None):
+        return self.rephrase(result_data)
+
+    def rephrase_stream(self, result_data, deadline=None):
+        self.calls += 1
+        yield "polite: "
+        yield result_data
+
+
+class RowPool:
+    """Stands in for ``DatabasePool``: ``fetch`` returns ``rows`` or raises."""
+
+    def __init__(self, rows=(), error=None):
+        self.rows = list(rows)
+        self.error = error
+
+    async def fetch(self, name, *args, timeout=None):
+        if self.error is not None:
+            raise self.error
+        return self.rows
+
+
+class TestRephraseStore(unittest.TestCase):
+    """Tests for building and serving stored rephrasings."""
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".sqlite")
+        os.close(fd)
+        self.store = self.make_store("v1")
+        self.store.create_table()
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def make_store(self, version):
+        return RephraseStore(version, connect=lambda: sqlite3.connect(self.path))
+
+    def test_build_rephrases_each_answer_once(self):
+        """Duplicates and already stored answers are not sent again."""
+        model = CountingModel()
+        self.assertEqual(self.store.build(["a", "b", "a"], model.rephrase), 2)
+        self.assertEqual(self.store.build(["a", "b", "c"], model.rephrase), 1)
+        self.assertEqual(model.calls, 3)
+
+    def test_serving_process_loads_stored_rows(self):
+        """A fresh store sees what the job wrote for its prompt version."""
+        self.store.build(["a"], CountingModel().rephrase)
+        serving = self.make_store("v1")
+        serving.load()
+        self.assertEqual(serving.get("a"), "polite: a")
+        self.assertIsNone(serving.get("b"))
+        self.assertEqual(serving.stats()["hits"], 1)
+        self.assertEqual(serving.stats()["misses"], 1)
+
+    def test_serving_process_loads_through_the_pool(self):
+        """Startup reads the rows asynchronously and never creates the table."""
+        serving = self.make_store("v1")
+        rows = [{"answer_hash": answer_hash("a"), "rephrased": "polite: a"}]
+        asyncio.run(serving.load_async(RowPool(rows)))
+        self.assertEqual(serving.get("a"), "polite: a")
+        missing = self.make_store("v1")
+        error = asyncpg.UndefinedTableError('relation "faq_rephrased" does not exist')
+        asyncio.run(missing.load_async(RowPool(error=error)))
+        self.assertEqual(len(missing), 0)
+
+    def test_prompt_versions_are_separate(self):
+        """Changing the prompt version invalidates earlier rephrasings."""
+        self.store.build(["a"], CountingModel().rephrase)
+        other = self.make_store("v2")
+        other.load()
+        self.assertIsNone(other.get("a"))
+
+    def test_model_only_calls_llm_on_miss(self):
+        """RefactorModel serves hits from the store and remembers misses."""
+        self.store.build(["a"], CountingModel().rephrase)
+        model = CountingModel(self.store)
+        self.assertEqual(model.model_work("a"), "polite: a")
+        self.assertEqual(model.calls, 0)
+        model.model_work("b")
+        model.model_work("b")
+        self.assertEqual(model.calls, 1)
+
+    def test_stream_serves_hits_whole_and_remembers_misses(self):
+        """A stored answer is one piece; a streamed miss is stored joined."""
+        self.store.build(["a"], CountingModel().rephrase)
+        model = CountingModel(self.store)
+        self.assertEqual(list(model.stream_work("a")), ["polite: a"])
+        self.assertEqual(list(model.stream_work("b")), ["polite: ", "b"])
+        self.assertEqual(list(model.stream_work("b")), ["polite: b"])
+        self.assertEqual(model.calls, 1)
+
+    def test_async_model_work_uses_store(self):
+        """amodel_work serves hits and remembers misses like model_work."""
+        self.store.build(["a"], CountingModel().rephrase)
+        model = CountingModel(self.store)
+        self.assertEqual(asyncio.run(model.amodel_work("a")), "polite: a")
+        asyncio.run(model.amodel_work("b"))
+        self.assertEqual(model.model_work("b"), "polite: b")
+        self.assertEqual(model.calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
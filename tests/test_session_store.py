@@ -0,0 +1,75 @@
+"""
+Unit tests for the bounded store of chat session state.
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(
+    0,
+    os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "chatbot", "api_endpoint")
+    ),
+)
+
+from utils.session_store import Session, SessionStore  # noqa: E402
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSessionStore(unittest.TestCase):
+    """Tests for session lifetime, bounds and cached search results."""
+
+    def test_sessions_resume_until_they_expire(self):
+        """An id resumes its session within the TTL, not after it."""
+        clock = Clock()
+        store = SessionStore(ttl=10, clock=clock)
+        session = store.open()
+        clock.now = 8
+        self.assertIs(store.open(session.id), session)
+        clock.now = 17  # the resume above extended it to 18
+        store.touch(session)
+        clock.now = 30
+        self.assertIsNot(store.open(session.id), session)
+        self.assertEqual(store.stats()["expired"], 1)
+
+    def test_unknown_ids_get_a_new_session(self):
+        """Clients cannot pick the id of a session."""
+        store = SessionStore()
+        session = store.open("chosen-by-client")
+        self.assertNotEqual(session.id, "chosen-by-client")
+        self.assertEqual(store.stats()["created"], 1)
+
+    def test_least_recently_active_session_is_evicted(self):
+        """The store never holds more than ``size`` sessions."""
+        store = SessionStore(size=2)
+        first, second = store.open(), store.open()
+        store.touch(first)
+        store.open()
+        self.assertEqual(len(store), 2)
+        self.assertIs(store.open(first.id), first)
+        self.assertIsNot(store.open(second.id), second)
+        self.assertEqual(store.stats()["evictions"], 2)
+
+    def test_cached_results_are_bounded_and_generation_checked(self):
+        """Old questions drop out; a cleared query cache invalidates all."""
+        session = Session("s", history=2, cache=2)
+        for i, query in enumerate(["Reset password", "log in", "fees"]):
+            session.remember(query, 0, [(i, 0.9)])
+            session.matched([(i, 0.9)])
+        self.assertIsNone(session.search_result("reset password", 0))
+        self.assertEqual(session.search_result("Log in!", 0), [(1, 0.9)])
+        self.assertIsNone(session.search_result("log in", 1))
+        self.assertEqual(list(session.faq_ids), [1, 2])
+        self.assertEqual((session.questions, session.cache_hits), (3, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Unit tests for coalescing identical in-flight calls.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(
+    0,
+    os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "chatbot", "api_endpoint")
+    ),
+)
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+from utils.single_flight import SingleFlight, request_key  # noqa: E402
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Tests for sharing one upstream call among concurrent callers."""
+
+    def setUp(self):
+        self.flights = SingleFlight()
+        self.upstream = 0
+
+    def wait_for_callers(self, count):
+        while self.flights.calls < count:
+            time.sleep(0.001)
+
+    def test_threads_share_one_call(self):
+        """Concurrent thread callers with the same key get one result."""
+        release = threading.Event()
+
+        def call():
+            self.upstream += 1
+            release.wait()
+            return "polite"
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(self.flights.do, "k", call) for _ in range(8)]
+            self.wait_for_callers(8)
+            release.set()
+            results = [f.result() for f in futures]
+
+        self.assertEqual(results, ["polite"] * 8)
+        self.assertEqual(self.upstream, 1)
+        self.assertEqual(self.flights.stats()["deduplicated"], 7)
+        self.assertEqual(self.flights.stats()["in_flight"], 0)
+
+    def test_errors_reach_every_waiter(self):
+        """An upstream failure is raised in each caller, then forgotten."""
+        release = threading.Event()
+
+        def call():
+            release.wait()
+            raise RuntimeError("rate limited")
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [pool.submit(self.flights.do, "k", call) for _ in range(3)]
+            self.wait_for_callers(3)
+            release.set()
+            for future in futures:
+                self.assertRaises(RuntimeError, future.result)
+        self.assertEqual(self.flights.do("k", lambda: "retried"), "retried")
+
+    def test_coroutines_share_one_call(self):
+        """Concurrent coroutines share a task; other keys run on their own."""
+
+        async def call():
+            self.upstream += 1
+            await asyncio.sleep(0.01)
+            return "polite"
+
+        async def burst():
+            return await asyncio.gather(
+                *(self.flights.do_async("a", call) for _ in range(5)),
+                self.flights.do_async("b", call),
+            )
+
+        self.assertEqual(asyncio.run(burst()), ["polite"] * 6)
+        self.assertEqual(self.upstream, 2)
+        self.assertEqual(self.flights.stats()["deduplicated"], 4)
+
+    def test_cancelled_waiter_does_not_cancel_others(self):
+        """A caller that gives up leaves the shared call running."""
+
+        async def call():
+            await asyncio.sleep(0.02)
+            return "polite"
+
+        async def scenario():
+            first = asyncio.ensure_future(self.flights.do_async("k", call))
+            second = asyncio.ensure_future(self.flights.do_async("k", call))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        self.assertEqual(asyncio.run(scenario()), "polite")
+
+    def test_request_key_ignores_argument_order(self):
+        """Keys depend on the request content only."""
+        self.assertEqual(
+            request_key(model="m", messages=[1]), request_key(messages=[1], model="m")
+        )
+        self.assertNotEqual(request_key(model="m"), request_key(model="n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+"""
+Unit tests for sampled, batched request telemetry.
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(
+    0,
+    os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "chatbot", "api_endpoint")
+    ),
+)
+
+from utils.telemetry import MlflowExporter, Record, Telemetry  # noqa: E402
+
+HAS_MLFLOW = importlib.util.find_spec("mlflow") is not None
+
+
+class ListExporter:
+    """Keeps exported batches; ``gate`` holds every export until it is set."""
+
+    def __init__(self, gate=None, error=None):
+        self.batches = []
+        self.gate = gate
+        self.error = error
+
+    def export(self, records):
+        if self.gate is not None:
+            self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        self.batches.append(records)
+
+
+def record(query="q", **fields):
+    record = Record("ask", input_query=query, **fields)
+    with record.stage("match"):
+        pass
+    return record
+
+
+class TestTelemetry(unittest.TestCase):
+    """Tests for sampling, the ring buffer and the export thread."""
+
+    def test_records_are_exported_in_batches(self):
+        """Flushing sends full batches and a last partial one."""
+        exporter = ListExporter()
+        telemetry = Telemetry(exporter, sample_rate=1, batch_size=4)
+        for i in range(10):
+            telemetry.submit(record(str(i), faq_id=i))
+        telemetry.flush()
+        self.assertEqual([len(b) for b in exporter.batches], [4, 4, 2])
+        first = exporter.batches[0][0]
+        self.assertEqual((first["input_query"], first["faq_id"]), ("0", 0))
+        self.assertIn("match_ms", first["timings"])
+        self.assertIn("total_ms", first["timings"])
+        self.assertEqual(telemetry.stats()["exported"], 10)
+
+    def test_sampling_keeps_errors(self):
+        """At rate 0 only records with an error are kept."""
+        exporter = ListExporter()
+        telemetry = Telemetry(exporter, sample_rate=0)
+        for _ in range(5):
+            telemetry.submit(record())
+        telemetry.submit(record(error="Traceback ..."))
+        telemetry.flush()
+        self.assertEqual(len(exporter.batches[0]), 1)
+        self.assertEqual(telemetry.stats()["sampled_out"], 5)
+
+    def test_full_buffer_drops_oldest_without_blocking(self):
+        """A stuck exporter never slows submitters; old records are dropped."""
+        gate = threading.Event()
+        exporter = ListExporter(gate)
+        telemetry = Telemetry(exporter, sample_rate=1, buffer_size=5, batch_size=2)
+        telemetry.start(interval=0.01)
+        try:
+            telemetry.submit(record("stuck"))
+            telemetry.submit(record("stuck"))
+            time.sleep(0.05)  # the thread now waits in export()
+            start = time.perf_counter()
+            for i in range(100):
+                telemetry.submit(record(str(i)))
+            self.assertLess(time.perf_counter() - start, 0.1)
+            self.assertEqual(telemetry.stats()["dropped"], 95)
+        finally:
+            gate.set()
+            telemetry.stop()
+        queries = [r["input_query"] for b in exporter.batches for r in b]
+        self.assertEqual(queries, ["stuck", "stuck", "95", "96", "97", "98", "99"])
+
+    def test_failed_export_is_counted_not_raised(self):
+        """A tracking server that is down only loses the batch."""
+        telemetry = Telemetry(ListExporter(error=ConnectionError("down")))
+        telemetry.submit(record())
+        telemetry.flush()
+        stats = telemetry.stats()
+        self.assertEqual((stats["failed"], stats["exported"]), (1, 0))
+        self.assertIn("down", stats["error"])
+
+    @unittest.skipUnless(HAS_MLFLOW, "mlflow is not installed")
+    def test_mlflow_exporter_writes_one_run(self):
+        """Batches land in a single run as artifacts and stepped metrics."""
+        import mlflow
+        from mlflow.tracking import MlflowClient
+
+        os.environ.setdefault("MLFLOW_ALLOW_FILE_STORE", "true")
+        with tempfile.TemporaryDirectory() as store:
+            uri = f"file://{store}"
+            previous = mlflow.get_tracking_uri()
+            mlflow.set_tracking_uri(uri)
+            try:
+                exporter = MlflowExporter("telemetry-test", tags={"repo": "test"})
+                telemetry = Telemetry(exporter, sample_rate=1, batch_size=2)
+                for i in range(3):
+                    telemetry.submit(record(str(i), path="fallback"))
+                telemetry.stop()
+
+                client = MlflowClient(uri)
+                [run] = client.search_runs(
+                    [client.get_experiment_by_name("telemetry-test").experiment_id]
+                )
+                self.assertEqual(run.data.tags["repo"], "test")
+                self.assertEqual(run.info.status, "FINISHED")
+                history = client.get_metric_history(run.info.run_id, "requests")
+                self.assertEqual([m.value for m in history], [2, 1])
+                self.assertEqual(run.data.metrics["fallbacks"], 1)
+                path = client.download_artifacts(
+                    run.info.run_id, "requests/000001.jsonl", store
+                )
+                with open(path) as f:
+                    lines = [json.loads(line) for line in f]
+                self.assertEqual([r["input_query"] for r in lines], ["0", "1"])
+            finally:
+                mlflow.set_tracking_uri(previous)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+Unit tests for the inferred-vector cache.
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(
+    0,
+    os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "chatbot", "api_endpoint")
+    ),
+)
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+from utils.vector_cache import VectorCache  # noqa: E402
+
+
+class RecordingModel:
+    """Stands in for Doc2Vec and records every inference call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def infer_vector(self, words, alpha=None, min_alpha=None, epochs=None):
+        self.calls.append((words, alpha, min_alpha, epochs))
+        return np.full(4, float(len(self.calls)), dtype=np.float32)
+
+
+class TestVectorCache(unittest.TestCase):
+    """Tests for hits, eviction and the inference settings."""
+
+    def test_repeated_tokens_are_inferred_once(self):
+        """A hit returns the cached, read-only vector."""
+        model = RecordingModel()
+        cache = VectorCache(size=10)
+        first = cache.infer(model, ["reset", "password"])
+        again = cache.infer(model, ("reset", "password"))
+        self.assertIs(first, again)
+        self.assertFalse(first.flags.writeable)
+        self.assertEqual(len(model.calls), 1)
+        self.assertEqual(cache.stats()["hit_ratio"], 0.5)
+
+    def test_settings_are_passed_to_inference(self):
+        """Configured epochs and alpha override the model; 0 keeps its own."""
+        model = RecordingModel()
+        VectorCache(epochs=50, alpha=0.05).infer(model, ["a"])
+        VectorCache(epochs=0, alpha=0, min_alpha=0).infer(model, ["a"])
+        self.assertEqual(model.calls[0][1:], (0.05, None, 50))
+        self.assertEqual(model.calls[1][1:], (None, None, None))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Over ``size`` entries, the oldest unused one goes first."""
+        model = RecordingModel()
+        cache = VectorCache(size=2)
+        cache.infer(model, ["a"])
+        cache.infer(model, ["b"])
+        cache.infer(model, ["a"])
+        cache.infer(model, ["c"])
+        self.assertEqual(cache.stats()["evictions"], 1)
+        cache.infer(model, ["a"])
+        self.assertEqual(len(model.calls), 3)
+        cache.infer(model, ["b"])
+        self.assertEqual(len(model.calls), 4)
+
+    def test_entries_are_per_model(self):
+        """A swapped-in model never gets the old model's vectors."""
+        old, new = RecordingModel(), RecordingModel()
+        cache = VectorCache()
+        cache.infer(old, ["a"])
+        cache.infer(new, ["a"])
+        self.assertEqual((len(old.calls), len(new.calls)), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Unit tests for the top-k FAQ vector search.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+CHATBOT_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "chatbot", "api_endpoint")
+)
+sys.path.insert(0, CHATBOT_DIR)
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+from gensim.models.doc2vec import Doc2Vec  # noqa: E402
+from utils.vector_search import VectorSearch, normalize  # noqa: E402
+
+
+class TestVectorSearch(unittest.TestCase):
+    """Tests for exact top-k search against brute-force ranking."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.vectors = rng.normal(size=(500, 16)).astype(np.float32)
+        self.queries = rng.normal(size=(8, 16)).astype(np.float32)
+        self.search = VectorSearch(normalize(self.vectors), np.arange(500))
+
+    def brute_force(self, query, k):
+        scores = normalize(self.vectors) @ normalize(query)[0]
+        return np.argsort(-scores)[:k].tolist()
+
+    def test_matrix_is_normalized_float32(self):
+        """The document matrix is contiguous unit-length float32."""
+        self.assertEqual(self.search.matrix.dtype, np.float32)
+        self.assertTrue(self.search.matrix.flags.c_contiguous)
+        np.testing.assert_allclose(
+            np.linalg.norm(self.search.matrix, axis=1), 1.0, rtol=1e-5
+        )
+
+    def test_top_k_matches_full_sort(self):
+        """Top-k selection returns the same ranking as sorting everything."""
+        for query in self.queries:
+            tags = [tag for tag, _ in self.search.search(query, k=10)]
+            self.assertEqual(tags, self.brute_force(query, 10))
+
+    def test_batch_matches_single_queries(self):
+        """A batch call gives the same answers as one call per query."""
+        batch = self.search.search_batch(self.queries, k=3)
+        single = [self.search.search(query, k=3) for query in self.queries]
+        self.assertEqual(
+            [[tag for tag, _ in row] for row in batch],
+            [[tag for tag, _ in row] for row in single],
+        )
+
+    def test_threshold_drops_low_scores(self):
+        """Results under the threshold are not returned."""
+        query = self.vectors[7]
+        results = self.search.search(query, k=5, threshold=0.99)
+        self.assertEqual([tag for tag, _ in results], [7])
+
+    def test_k_larger_than_corpus(self):
+        """Asking for more results than documents returns the whole corpus."""
+        self.assertEqual(len(self.search.search(self.queries[0], k=1000)), 500)
+
+    def test_from_model_agrees_with_gensim(self):
+        """Top-1 over the committed model matches Doc2Vec.most_similar."""
+        model = Doc2Vec.load(os.path.join(CHATBOT_DIR, "utils", "doc2vec_model.model"))
+        search = VectorSearch.from_model(model)
+        for query in self.queries:
+            query = np.resize(query, model.vector_size)
+            expected = int(model.dv.most_similar([query], topn=1)[0][0])
+            self.assertEqual(search.search(query, k=1)[0][0], expected)
+
+    def test_save_and_load_memory_mapped(self):
+        """A saved matrix is opened as a read-only memory map."""
+        tmp = tempfile.mkdtemp()
+        try:
+            prefix = os.path.join(tmp, "dv_normed")
+            self.search.save(prefix)
+            loaded = VectorSearch.load(prefix)
+            self.assertFalse(loaded.matrix.flags.writeable)
+            self.assertEqual(
+                loaded.search(self.queries[0], k=5),
+                self.search.search(self.queries[0], k=5),
+            )
+        finally:
+            shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    unittest.main()